@@ -0,0 +1,117 @@
+"""
+Checkout pipeline benchmark.
+
+Measures end-to-end server-side checkout time and Stripe call count for
+the previous setup-intent + create-subscription sequence and for the
+current pipelines, against a stub HTTP client with fixed latency.
+
+Usage:
+    python -m backend.benchmarks.checkout_pipeline [latency_ms]
+"""
+import asyncio
+import json
+import sys
+import time
+
+import stripe
+
+from backend.services.stripe_service import AsyncStripeService
+
+
+OBJECTS = {
+    "/v1/customers": {"id": "cus_bench", "object": "customer"},
+    "/v1/setup_intents": {
+        "id": "seti_bench",
+        "object": "setup_intent",
+        "client_secret": "seti_bench_secret",
+    },
+    "/v1/payment_methods": {"id": "pm_bench", "object": "payment_method"},
+    "/v1/subscriptions": {
+        "id": "sub_bench",
+        "object": "subscription",
+        "status": "trialing",
+    },
+}
+
+
+class StubHTTPClient(stripe.HTTPClient):
+    """HTTP client that counts calls and answers after a fixed delay."""
+
+    name = "stub"
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+        self.calls = 0
+
+    async def request_async(self, method, url, headers, post_data=None):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        path = "/" + "/".join(url.split("/")[3:5]).split("?")[0]
+        return json.dumps(OBJECTS[path]).encode("utf-8"), 200, {}
+
+    def sleep_async(self, secs):
+        return asyncio.sleep(secs)
+
+    async def close_async(self):
+        pass
+
+
+async def legacy_checkout(service: AsyncStripeService) -> None:
+    """The previous flow: customer, SetupIntent, attach, modify, create."""
+    customer = await service.client.customers.create_async(
+        params={"email": "bench@example.com"},
+    )
+    await service.client.setup_intents.create_async(
+        params={"customer": customer.id, "payment_method_types": ["card"]},
+    )
+    await service.client.payment_methods.attach_async(
+        "pm_bench", params={"customer": customer.id}
+    )
+    await service.client.customers.update_async(
+        customer.id,
+        params={"invoice_settings": {"default_payment_method": "pm_bench"}},
+    )
+    await service.client.subscriptions.create_async(
+        params={"customer": customer.id, "items": [{"price": "price_bench"}]},
+    )
+
+
+async def inline_checkout(service: AsyncStripeService) -> None:
+    """Card form flow: setup intent, then a single-call subscription."""
+    customer_id = await service.get_or_create_customer("bench@example.com")
+    await service.create_setup_intent(customer_id)
+    await service.create_subscription(customer_id, "price_bench", "pm_bench")
+
+
+async def wallet_checkout(service: AsyncStripeService) -> None:
+    """Apple Pay / Google Pay flow through the subscribe pipeline."""
+    await service.subscribe("bench@example.com", "pm_bench", "price_bench")
+
+
+async def measure(flow, latency: float) -> tuple[float, int]:
+    """Run one checkout and return (milliseconds, Stripe calls)."""
+    stub = StubHTTPClient(latency)
+    service = AsyncStripeService(http_client=stub)
+
+    started = time.perf_counter()
+    await flow(service)
+    return (time.perf_counter() - started) * 1000, stub.calls
+
+
+def main() -> None:
+    """Print end-to-end time and call count for each flow."""
+    latency = (float(sys.argv[1]) if len(sys.argv) > 1 else 150.0) / 1000
+
+    print(f"stub latency per Stripe call: {latency * 1000:.0f}ms")
+    for name, flow in [
+        ("before (setup intent + subscription)", legacy_checkout),
+        ("after: card form", inline_checkout),
+        ("after: wallet /subscribe", wallet_checkout),
+    ]:
+        elapsed, calls = asyncio.run(measure(flow, latency))
+        print(f"{name:<38} {elapsed:7.1f}ms  {calls} calls")
+
+
+if __name__ == "__main__":
+    main()
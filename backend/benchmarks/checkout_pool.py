@@ -0,0 +1,116 @@
+"""
+Checkout Session pool benchmark.
+
+Times ``GET /api/stripe/checkout``'s session lookup for a stream of
+anonymous visitors, with and without the pre-created session pool,
+against a stub HTTP client that simulates Stripe's latency. Visitors
+arrive every ``interval_ms``; when they outpace the refill, the pool runs
+dry and lookups fall back to creating a session on demand.
+
+Usage:
+    python -m backend.benchmarks.checkout_pool [requests] [latency_ms]
+        [interval_ms] [pool_size]
+"""
+import asyncio
+import itertools
+import json
+import statistics
+import sys
+import time
+
+import stripe
+
+from backend.config import settings
+from backend.services.stripe_service import AsyncStripeService
+
+
+class StubHTTPClient(stripe.HTTPClient):
+    """HTTP client that creates a new session after a fixed delay."""
+
+    name = "stub"
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+        self.ids = itertools.count()
+
+    async def request_async(self, method, url, headers, post_data=None):
+        await asyncio.sleep(self.latency)
+        session_id = f"cs_test_{next(self.ids)}"
+        body = {
+            "id": session_id,
+            "object": "checkout.session",
+            "url": f"https://checkout.stripe.com/c/pay/{session_id}",
+            "expires_at": int(time.time()) + 24 * 3600,
+        }
+        return json.dumps(body).encode("utf-8"), 200, {}
+
+    def sleep_async(self, secs):
+        return asyncio.sleep(secs)
+
+    def close(self):
+        pass
+
+    async def close_async(self):
+        pass
+
+
+async def run(
+    pool_size: int,
+    requests: int,
+    latency: float,
+    interval: float,
+) -> tuple[list[float], dict]:
+    """Time each visitor's session lookup (ms) for one pool size."""
+    service = AsyncStripeService(
+        http_client=StubHTTPClient(latency),
+        session_pool_size=pool_size,
+    )
+    await service.warm_up()
+    while len(service.session_pool._items) < pool_size:
+        await asyncio.sleep(latency)
+
+    async def visitor() -> float:
+        started = time.perf_counter()
+        await service.get_checkout_session()
+        return (time.perf_counter() - started) * 1000
+
+    tasks = []
+    for _ in range(requests):
+        tasks.append(asyncio.create_task(visitor()))
+        await asyncio.sleep(interval)
+    timings = await asyncio.gather(*tasks)
+
+    stats = service.session_pool.stats()
+    await service.close()
+    return timings, stats
+
+
+async def main() -> None:
+    """Compare redirect latency with and without the session pool."""
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 300
+    interval_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 200
+    pool_size = int(sys.argv[4]) if len(sys.argv) > 4 else 10
+
+    settings.STRIPE_SECRET_KEY = settings.STRIPE_SECRET_KEY or "sk_bench"
+    settings.STRIPE_PRICE_ID = settings.STRIPE_PRICE_ID or "price_bench"
+
+    print(
+        f"{requests} visitors every {interval_ms:.0f}ms, "
+        f"{latency_ms:.0f}ms simulated Stripe latency"
+    )
+    print(f"{'pool size':<10} {'p50':>8} {'p99':>8} {'hit rate':>9}")
+    for size in (0, pool_size):
+        timings, stats = await run(
+            size, requests, latency_ms / 1000, interval_ms / 1000
+        )
+        p99 = statistics.quantiles(timings, n=100)[98]
+        print(
+            f"{size:<10} {statistics.median(timings):>6.1f}ms "
+            f"{p99:>6.1f}ms {stats['hit_rate']:>8.0%}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
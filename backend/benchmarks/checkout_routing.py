@@ -0,0 +1,146 @@
+"""
+Checkout routing benchmark.
+
+Creates checkouts against two stub providers while one of them is
+degraded: it answers after ``slow_ms`` and fails a share of its calls.
+Static routing splits checkouts evenly and returns the degraded
+provider's errors; the provider selector shifts traffic to the healthy
+provider and fails over when a call fails or the breaker is open.
+
+Usage:
+    python -m backend.benchmarks.checkout_routing [checkouts]
+        [healthy_ms] [slow_ms] [error_rate]
+"""
+import asyncio
+import logging
+import random
+import statistics
+import sys
+import time
+
+from fastapi import HTTPException
+
+from backend.services.circuit_breaker import CircuitBreakers
+from backend.services.provider_routing import ProviderSelector
+
+
+class StubProvider:
+    """Provider whose checkout creation takes ``latency`` seconds."""
+
+    checkout_operation = "create_checkout"
+
+    def __init__(
+        self,
+        name: str,
+        latency: float,
+        error_rate: float,
+        breakers: CircuitBreakers | None,
+    ):
+        self.name = name
+        self.latency = latency
+        self.error_rate = error_rate
+        self.breakers = breakers
+
+    async def create_checkout(self, customer_email=None) -> dict:
+        """Create a stub checkout, through the breaker if there is one."""
+
+        async def send() -> dict:
+            await asyncio.sleep(self.latency * random.uniform(0.8, 1.2))
+            if random.random() < self.error_rate:
+                raise HTTPException(status_code=502, detail="Provider error")
+            return {"id": f"{self.name}_checkout"}
+
+        if self.breakers is None:
+            return await send()
+        breaker = self.breakers.get(self.name, self.checkout_operation)
+        return await breaker.call(send)
+
+    @staticmethod
+    def is_caller_error(error: Exception) -> bool:
+        """Stub providers only fail with provider errors."""
+        return False
+
+
+async def run(
+    routed: bool,
+    checkouts: int,
+    healthy: float,
+    slow: float,
+    error_rate: float,
+) -> dict:
+    """Create the checkouts; return failures, latencies and traffic split."""
+    breakers = (
+        CircuitBreakers(slow_call_seconds=1.0, window=20, min_calls=10)
+        if routed
+        else None
+    )
+    services = {
+        "stripe": StubProvider("stripe", healthy, 0.0, breakers),
+        "paddle": StubProvider("paddle", slow, error_rate, breakers),
+    }
+    selector = ProviderSelector(breakers=breakers)
+    for name, service in services.items():
+        selector.register(name, service)
+
+    async def checkout() -> tuple[str | None, float]:
+        started = time.perf_counter()
+        try:
+            if routed:
+                provider, _ = await selector.create_checkout()
+            else:
+                provider = random.choice(list(services))
+                await services[provider].create_checkout()
+        except HTTPException:
+            provider = None
+        return provider, time.perf_counter() - started
+
+    results = []
+    # Checkouts arrive a few at a time, so the averages keep up
+    for _ in range(0, checkouts, 10):
+        results.extend(await asyncio.gather(*(checkout() for _ in range(10))))
+
+    latencies = sorted(latency for _, latency in results)
+    return {
+        "failed": sum(1 for provider, _ in results if provider is None),
+        "degraded": sum(1 for provider, _ in results if provider == "paddle"),
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "p99": latencies[int(len(latencies) * 0.99) - 1],
+    }
+
+
+async def main() -> None:
+    """Compare static and latency-aware routing with a degraded provider."""
+    checkouts = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    healthy_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 100
+    slow_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 800
+    error_rate = float(sys.argv[4]) if len(sys.argv) > 4 else 0.2
+
+    # Failover and breaker warnings would interleave with the results
+    logging.disable(logging.WARNING)
+
+    print(
+        f"{checkouts} checkouts, healthy provider {healthy_ms:.0f}ms, "
+        f"degraded provider {slow_ms:.0f}ms with {error_rate:.0%} errors"
+    )
+    print(
+        f"{'routing':<8} {'failed':>7} {'degraded':>9} {'p50':>8} "
+        f"{'p95':>8} {'p99':>8}"
+    )
+    for routed in (False, True):
+        result = await run(
+            routed,
+            checkouts,
+            healthy_ms / 1000,
+            slow_ms / 1000,
+            error_rate,
+        )
+        print(
+            f"{'routed' if routed else 'static':<8} {result['failed']:>7} "
+            f"{result['degraded']:>9} {result['p50'] * 1000:>6.0f}ms "
+            f"{result['p95'] * 1000:>6.0f}ms {result['p99'] * 1000:>6.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+"""
+Connection warm-up benchmark.
+
+Times the first Paddle API call after startup, with and without the
+HTTP pool's warm-up, against a local server that delays every new
+connection by a simulated TCP + TLS handshake:
+
+- cold: the first request builds the client and opens a connection;
+- warm: ``warm_up()`` ran at startup (as in the app lifespan), so the
+  first request reuses an open connection;
+- steady: a later request on a warm connection, for reference.
+
+Usage:
+    python -m backend.benchmarks.connection_warmup [handshake_ms] [rounds]
+"""
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+from backend.config import settings
+from backend.services import paddle_service
+from backend.services.http_pool import HttpPool
+from backend.services.paddle_service import AsyncPaddleService
+
+
+SERVICE_SECONDS = 0.005
+BODY = json.dumps(
+    {"data": {"id": "ctm_benchmark", "email": "user@example.com"}}
+).encode("utf-8")
+
+
+async def serve(reader, writer, handshake: float) -> None:
+    """Answer keep-alive requests after a per-connection setup delay."""
+    await asyncio.sleep(handshake)
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                name, _, value = line.partition(b":")
+                if name.lower() == b"content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+
+            await asyncio.sleep(SERVICE_SECONDS)
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: application/json\r\n"
+                b"Content-Length: " + str(len(BODY)).encode() + b"\r\n"
+                b"\r\n" + BODY
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def first_calls(warm: bool) -> tuple[float, float]:
+    """Time the first and second call of a freshly started service (ms)."""
+    service = AsyncPaddleService(pool=HttpPool(warm_connections=1))
+    if warm:
+        await service.warm_up()
+
+    timings = []
+    for _ in range(2):
+        started = time.perf_counter()
+        await service.create_customer("user@example.com")
+        timings.append((time.perf_counter() - started) * 1000)
+
+    await service.close()
+    return timings[0], timings[1]
+
+
+async def main() -> None:
+    """Compare cold and warm first-request latency."""
+    handshake_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 100
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    server = await asyncio.start_server(
+        lambda reader, writer: serve(reader, writer, handshake_ms / 1000),
+        "127.0.0.1",
+        0,
+    )
+    host, port = server.sockets[0].getsockname()[:2]
+
+    settings.PADDLE_API_KEY = settings.PADDLE_API_KEY or "pdl_bench"
+    settings.PADDLE_ENVIRONMENT = "sandbox"
+    paddle_service.PADDLE_API_URLS["sandbox"] = f"http://{host}:{port}"
+
+    results = {"cold": [], "warm": [], "steady": []}
+    for _ in range(rounds):
+        first, second = await first_calls(warm=False)
+        results["cold"].append(first)
+        results["steady"].append(second)
+        first, _ = await first_calls(warm=True)
+        results["warm"].append(first)
+
+    server.close()
+    await server.wait_closed()
+
+    print(
+        f"{handshake_ms:.0f}ms simulated handshake, "
+        f"{SERVICE_SECONDS * 1000:.0f}ms service time, {rounds} rounds"
+    )
+    print(f"{'first request':<14} {'p50':>8} {'max':>8}")
+    for name, timings in results.items():
+        print(
+            f"{name:<14} {statistics.median(timings):>6.1f}ms "
+            f"{max(timings):>6.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,162 @@
+"""
+Webhook event parsing benchmark.
+
+Parses large synthetic invoice and subscription events the way the
+webhook handlers used to (``stripe.Event.construct_from``) and with the
+lazy event views, reading the same handful of fields each time, and
+reports time and peak allocated memory per event.
+
+Usage:
+    python -m backend.benchmarks.event_parsing [line_items] [rounds]
+"""
+import json
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+
+import stripe
+
+from backend.services.event_views import parse_event
+
+
+def invoice_event(line_items: int) -> bytes:
+    """Build an ``invoice.paid`` event with many line items."""
+    lines = [
+        {
+            "id": f"il_{i}",
+            "object": "line_item",
+            "amount": 499,
+            "currency": "usd",
+            "description": f"1 x Phone Cleaner Plus ({i})",
+            "metadata": {"source": "benchmark", "index": str(i)},
+            "period": {"start": 1700000000, "end": 1702592000},
+            "price": {
+                "id": "price_123",
+                "object": "price",
+                "product": "prod_123",
+                "unit_amount": 499,
+                "recurring": {"interval": "month", "interval_count": 1},
+            },
+            "quantity": 1,
+            "tax_amounts": [],
+        }
+        for i in range(line_items)
+    ]
+    return json.dumps(
+        {
+            "id": "evt_invoice",
+            "object": "event",
+            "type": "invoice.paid",
+            "created": 1700000000,
+            "data": {
+                "object": {
+                    "id": "in_123",
+                    "object": "invoice",
+                    "customer": "cus_123",
+                    "amount_paid": 499 * line_items,
+                    "currency": "usd",
+                    "lines": {
+                        "object": "list",
+                        "data": lines,
+                        "has_more": False,
+                    },
+                }
+            },
+        }
+    ).encode("utf-8")
+
+
+def subscription_event(items: int) -> bytes:
+    """Build a ``customer.subscription.updated`` event."""
+    return json.dumps(
+        {
+            "id": "evt_subscription",
+            "object": "event",
+            "type": "customer.subscription.updated",
+            "created": 1700000000,
+            "data": {
+                "object": {
+                    "id": "sub_123",
+                    "object": "subscription",
+                    "customer": "cus_123",
+                    "status": "active",
+                    "current_period_end": 1702592000,
+                    "cancel_at_period_end": False,
+                    "items": {
+                        "object": "list",
+                        "data": [
+                            {
+                                "id": f"si_{i}",
+                                "price": {"id": "price_123"},
+                                "quantity": 1,
+                            }
+                            for i in range(items)
+                        ],
+                    },
+                    "metadata": {str(i): "x" * 32 for i in range(50)},
+                }
+            },
+        }
+    ).encode("utf-8")
+
+
+def read_construct_from(payload: bytes) -> None:
+    """Parse into a full StripeObject graph and read the handler fields."""
+    event = stripe.Event.construct_from(json.loads(payload), "sk_test")
+    resource = event["data"]["object"]
+    (event["id"], event["type"], resource["id"], resource.get("customer"))
+
+
+def read_view(payload: bytes) -> None:
+    """Parse into a lazy event view and read the handler fields."""
+    event = parse_event("stripe", payload)
+    resource = event.object
+    (event.id, event.type, resource["id"], resource.get("customer"))
+
+
+def measure(
+    read: Callable[[bytes], None], payload: bytes, rounds: int
+) -> tuple[float, float]:
+    """Return (mean ms per event, peak KiB allocated for one event)."""
+    started = time.perf_counter()
+    for _ in range(rounds):
+        read(payload)
+    elapsed = (time.perf_counter() - started) / rounds * 1e3
+
+    tracemalloc.start()
+    read(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak / 1024
+
+
+def main() -> None:
+    """Print time and peak memory per event for both parsers."""
+    line_items = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    payloads = {
+        "invoice.paid": invoice_event(line_items),
+        "subscription.updated": subscription_event(line_items // 10),
+    }
+
+    print(
+        f"{'event':<22} {'size':>9} {'parser':<15} "
+        f"{'time':>10} {'peak mem':>11}"
+    )
+    for name, payload in payloads.items():
+        for parser, read in (
+            ("construct_from", read_construct_from),
+            ("event view", read_view),
+        ):
+            elapsed, peak = measure(read, payload, rounds)
+            print(
+                f"{name:<22} {len(payload) / 1024:>7.0f}KB {parser:<15} "
+                f"{elapsed:>8.2f}ms {peak:>8.0f}KiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Import time benchmark with a regression budget.
+
+Imports ``backend.main`` in fresh interpreters under ``python -X
+importtime`` for each provider configuration and reports the median
+cumulative import time and the heaviest direct imports. Exits with
+status 1 if a configuration is over its budget, so it can gate CI.
+
+Usage:
+    python -m backend.benchmarks.import_time [runs] [budget_scale]
+
+``budget_scale`` multiplies the budgets for slower machines.
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+
+# Provider settings per configuration; unset providers are blanked so a
+# local .env cannot enable them
+CONFIGURATIONS = {
+    "paddle": {"PADDLE_API_KEY": "pdl_bench", "PADDLE_PRICE_ID": "pri_bench"},
+    "stripe": {"STRIPE_SECRET_KEY": "sk_bench", "STRIPE_PRICE_ID": "price"},
+    "stripe+paddle": {
+        "STRIPE_SECRET_KEY": "sk_bench",
+        "STRIPE_PRICE_ID": "price",
+        "PADDLE_API_KEY": "pdl_bench",
+        "PADDLE_PRICE_ID": "pri_bench",
+    },
+}
+PROVIDER_VARIABLES = (
+    "STRIPE_SECRET_KEY", "STRIPE_PRICE_ID", "PADDLE_API_KEY",
+    "PADDLE_PRICE_ID",
+)
+
+# Median cumulative import time of backend.main allowed (ms). Importing
+# both SDKs took ~1.9s before they were loaded on demand; Paddle alone
+# must stay well below that, or an SDK is being imported eagerly again.
+BUDGET_MS = {
+    "paddle": 1_000,
+    "stripe": 2_500,
+    "stripe+paddle": 2_500,
+}
+
+
+def import_once(variables: dict[str, str]) -> tuple[float, dict[str, float]]:
+    """
+    Import backend.main in a fresh interpreter.
+
+    Returns:
+        Total import time (ms) and cumulative time of each module
+        imported directly by backend.main (ms).
+    """
+    env = {**os.environ, **dict.fromkeys(PROVIDER_VARIABLES, "")}
+    env.update(variables)
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    total = 0.0
+    direct = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        if name.strip() == "backend.main" and not name.startswith("   "):
+            total = int(cumulative) / 1000
+        elif name.startswith("   ") and not name.startswith("    "):
+            direct[name.strip()] = int(cumulative) / 1000
+
+    return total, direct
+
+
+def main() -> None:
+    """Measure each configuration and check it against its budget."""
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    scale = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+
+    over_budget = []
+    print(f"{'providers':<14} {'median':>9} {'budget':>9}  heaviest imports")
+    for name, variables in CONFIGURATIONS.items():
+        samples = [import_once(variables) for _ in range(runs)]
+        median = statistics.median(total for total, _ in samples)
+        budget = BUDGET_MS[name] * scale
+
+        _, direct = samples[-1]
+        heaviest = ", ".join(
+            f"{module} {ms:.0f}ms"
+            for module, ms in sorted(
+                direct.items(), key=lambda item: item[1], reverse=True
+            )[:3]
+        )
+        print(
+            f"{name:<14} {median:>7.0f}ms {budget:>7.0f}ms  {heaviest}"
+        )
+        if median > budget:
+            over_budget.append(name)
+
+    if over_budget:
+        print(f"Over budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Load shedding benchmark.
+
+Sends a checkout traffic spike above the capacity of a simulated
+provider (a fixed number of connections, each call taking
+``service_ms``) through the app's middleware, with and without load
+shedding. A response slower than ``deadline_s`` counts as failed, as the
+visitor has given up by then, even though the server did the work.
+
+Reports goodput (responses within the deadline), latency of successful
+responses, and requests shed with a fast 503.
+
+Usage:
+    python -m backend.benchmarks.load_shedding [requests] [rate_per_s]
+        [capacity] [service_ms] [deadline_s]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from backend.middleware.load_shedding import LoadSheddingMiddleware
+from backend.services.load_shedding import AdaptiveLimiter, LoadShedder
+
+
+def build_app(capacity: int, service: float, shedding: bool) -> Starlette:
+    """App whose checkout route waits for one of ``capacity`` slots."""
+    provider = asyncio.Semaphore(capacity)
+
+    async def checkout(request):
+        async with provider:
+            await asyncio.sleep(service)
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/api/stripe/checkout", checkout)])
+    app.add_middleware(
+        LoadSheddingMiddleware,
+        shedder=LoadShedder(
+            [AdaptiveLimiter(name) for name in ("webhook", "checkout")],
+            enabled=shedding,
+        ),
+    )
+    return app
+
+
+async def run(
+    shedding: bool,
+    requests: int,
+    rate: float,
+    capacity: int,
+    service: float,
+) -> list[tuple[int, float]]:
+    """Send the spike; return each response's status and latency (s)."""
+    app = build_app(capacity, service, shedding)
+    transport = httpx.ASGITransport(app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def visitor() -> tuple[int, float]:
+            started = time.perf_counter()
+            response = await client.get("/api/stripe/checkout")
+            return response.status_code, time.perf_counter() - started
+
+        tasks = []
+        for _ in range(requests):
+            tasks.append(asyncio.create_task(visitor()))
+            await asyncio.sleep(1 / rate)
+        return await asyncio.gather(*tasks)
+
+
+async def main() -> None:
+    """Compare the spike with and without load shedding."""
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else 400
+    capacity = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    service_ms = float(sys.argv[4]) if len(sys.argv) > 4 else 50
+    deadline = float(sys.argv[5]) if len(sys.argv) > 5 else 2.0
+
+    print(
+        f"{requests} checkouts at {rate:.0f}/s, provider capacity "
+        f"{capacity / service_ms * 1000:.0f}/s, {deadline:.1f}s deadline"
+    )
+    print(
+        f"{'shedding':<9} {'goodput':>8} {'late':>6} {'shed':>6} "
+        f"{'p50':>9} {'p99':>9}"
+    )
+    for shedding in (False, True):
+        results = await run(
+            shedding, requests, rate, capacity, service_ms / 1000
+        )
+        served = [latency for status, latency in results if status == 200]
+        good = [latency for latency in served if latency <= deadline]
+        shed = sum(1 for status, _ in results if status == 503)
+        p99 = statistics.quantiles(good, n=100)[98] if len(good) > 1 else 0
+        print(
+            f"{'on' if shedding else 'off':<9} {len(good):>8} "
+            f"{len(served) - len(good):>6} {shed:>6} "
+            f"{statistics.median(good) * 1000 if good else 0:>7.0f}ms "
+            f"{p99 * 1000:>7.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+"""
+Logging throughput benchmark.
+
+Drives concurrent requests at the real ``/api/paddle/create-transaction``
+route (Paddle stubbed with an in-process transport) with logs going to a
+deliberately slow sink, such as a congested container log pipe. The
+client-side Paddle rate limit and load shedding are turned off, as they
+would reject the burst before logging is measured:
+
+- sync: a StreamHandler on the root logger, as ``logging.basicConfig``
+  set it up, writing on the event loop thread;
+- queued: ``setup_logging`` (JSON, QueueHandler + listener thread);
+- off: logging disabled.
+
+Usage:
+    python -m backend.benchmarks.logging_throughput [requests] [write_ms]
+"""
+import asyncio
+import io
+import logging
+import sys
+import time
+
+import httpx
+
+from backend.config import settings
+from backend.logging_config import (
+    TEXT_FORMAT,
+    setup_logging,
+    shutdown_logging,
+)
+
+
+class SlowStream(io.StringIO):
+    """Text stream whose every write blocks for a fixed time."""
+
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+        self.lines = 0
+
+    def write(self, text: str) -> int:
+        time.sleep(self.delay)
+        self.lines += text.count("\n")
+        return len(text)
+
+
+def paddle_stub(request: httpx.Request) -> httpx.Response:
+    """Answer every Paddle call with a ready transaction."""
+    return httpx.Response(
+        201,
+        json={"data": {"id": "txn_bench", "status": "ready"}},
+    )
+
+
+def configure(mode: str, sink: SlowStream) -> None:
+    """Install the logging setup for one benchmark mode."""
+    shutdown_logging()
+    logging.disable(logging.NOTSET)
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+
+    if mode == "sync":
+        handler = logging.StreamHandler(sink)
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+    elif mode == "queued":
+        setup_logging(level=logging.INFO, log_format="json", stream=sink)
+    else:
+        logging.disable(logging.CRITICAL)
+
+
+async def run(app, requests: int) -> float:
+    """Send concurrent requests; return requests per second."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        started = time.perf_counter()
+        responses = await asyncio.gather(
+            *(
+                client.post(
+                    "/api/paddle/create-transaction",
+                    json={"email": f"user{i}@example.com"},
+                )
+                for i in range(requests)
+            )
+        )
+        elapsed = time.perf_counter() - started
+
+    assert all(response.status_code == 200 for response in responses)
+    return requests / elapsed
+
+
+async def main() -> None:
+    """Compare throughput with sync, queued and disabled logging."""
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    write_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+
+    settings.PADDLE_API_KEY = settings.PADDLE_API_KEY or "pdl_bench"
+    settings.PADDLE_PRICE_ID = settings.PADDLE_PRICE_ID or "pri_bench"
+
+    from backend.main import app
+    from backend.services.load_shedding import load_shedder
+    from backend.services.paddle_service import async_paddle_service
+
+    async_paddle_service._transport = httpx.MockTransport(paddle_stub)
+    async_paddle_service.rate_limiter = None
+    load_shedder.enabled = False
+
+    print(f"{requests} requests, {write_ms}ms per log write")
+    print(f"{'logging':<8} {'throughput':>12} {'lines':>7}")
+    for mode in ("sync", "queued", "off"):
+        sink = SlowStream(write_ms / 1000)
+        configure(mode, sink)
+        await run(app, 20)
+        throughput = await run(app, requests)
+        shutdown_logging()
+        print(f"{mode:<8} {throughput:>10.0f}/s {sink.lines:>7}")
+
+    await async_paddle_service.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
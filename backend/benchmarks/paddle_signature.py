@@ -0,0 +1,87 @@
+"""
+Paddle webhook signature verification benchmark.
+
+Compares the previous verification (header parsed twice, body decoded to
+str and re-encoded) with PaddleWebhookVerifier for 1 KB to 1 MB bodies.
+
+Usage:
+    python -m backend.benchmarks.paddle_signature [iterations]
+"""
+import hashlib
+import hmac
+import sys
+import time
+
+from backend.services.paddle_service import PaddleWebhookVerifier
+
+
+SECRET = "pdl_ntfset_benchmark_secret"
+SIZES = [1024, 16 * 1024, 128 * 1024, 1024 * 1024]
+
+
+def legacy_verify(payload: bytes, signature_header: str) -> bool:
+    """The previous parse + verify path from the Paddle webhook route."""
+    parts = dict(part.split("=", 1) for part in signature_header.split(";"))
+    timestamp = parts.get("ts", "")
+
+    signed_payload = f"{timestamp}:{payload.decode('utf-8')}"
+    expected_signature = hmac.new(
+        SECRET.encode("utf-8"),
+        signed_payload.encode("utf-8"),
+        hashlib.sha256,
+    ).hexdigest()
+
+    sig_parts = dict(part.split("=", 1) for part in signature_header.split(";"))
+    return hmac.compare_digest(expected_signature, sig_parts.get("h1", ""))
+
+
+def sign(payload: bytes, timestamp: int) -> str:
+    """Build a Paddle-Signature header for a payload."""
+    digest = hmac.new(
+        SECRET.encode("utf-8"),
+        f"{timestamp}:".encode("ascii") + payload,
+        hashlib.sha256,
+    ).hexdigest()
+    return f"ts={timestamp};h1={digest}"
+
+
+def mean_us(fn, iterations: int) -> float:
+    """Return the mean call time of ``fn`` in microseconds."""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main() -> None:
+    """Print verification time per body size for both implementations."""
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    verifier = PaddleWebhookVerifier([SECRET])
+    # Worst case during rotation: the matching secret is tried last
+    rotating = PaddleWebhookVerifier(["pdl_ntfset_old_secret", SECRET])
+
+    print(
+        f"{'body':>8} {'legacy':>10} {'verifier':>10} {'speedup':>8} "
+        f"{'rotating':>10}"
+    )
+    for size in SIZES:
+        payload = b'{"data": "' + b"x" * (size - 12) + b'"}'
+        header = sign(payload, int(time.time()))
+
+        assert legacy_verify(payload, header)
+        verifier.verify(payload, header)
+
+        legacy = mean_us(lambda: legacy_verify(payload, header), iterations)
+        current = mean_us(lambda: verifier.verify(payload, header), iterations)
+        rotation = mean_us(
+            lambda: rotating.verify(payload, header), iterations
+        )
+
+        print(
+            f"{size // 1024:>6}KB {legacy:>8.1f}us {current:>8.1f}us "
+            f"{legacy / current:>7.2f}x {rotation:>8.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
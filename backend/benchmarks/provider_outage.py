@@ -0,0 +1,130 @@
+"""
+Provider outage benchmark.
+
+Sends requests to a stub Paddle API that has degraded to answering
+after ``provider_s`` seconds, with and without request deadlines and
+circuit breakers. Without them every request holds a worker for the full
+provider latency; with them the first requests are cut off at the
+deadline, the breaker opens, and the rest fail fast until it probes
+again.
+
+Usage:
+    python -m backend.benchmarks.provider_outage [requests] [interval_ms]
+        [provider_s] [deadline_s]
+"""
+import asyncio
+import logging
+import statistics
+import sys
+import time
+
+import httpx
+
+from backend.config import settings
+from backend.services.circuit_breaker import CircuitBreakers
+from backend.services.deadline import deadline
+from backend.services.http_pool import HttpPool
+from backend.services.metrics import provider_calls_in_flight
+from backend.services.paddle_service import AsyncPaddleService
+
+
+def degraded_transport(latency: float) -> httpx.MockTransport:
+    """Stub Paddle API answering every request after ``latency``."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        return httpx.Response(
+            200, json={"data": {"id": "sub_benchmark", "items": []}}
+        )
+
+    return httpx.MockTransport(handler)
+
+
+async def run(
+    guarded: bool,
+    requests: int,
+    interval: float,
+    provider_latency: float,
+    budget: float,
+) -> dict:
+    """Send the requests; return latencies, failures and peak in-flight."""
+    service = AsyncPaddleService(
+        transport=degraded_transport(provider_latency),
+        pool=HttpPool(),
+        breakers=(
+            CircuitBreakers(
+                slow_call_seconds=budget / 2,
+                window=10,
+                min_calls=5,
+                open_seconds=30,
+            )
+            if guarded
+            else None
+        ),
+    )
+    in_flight = provider_calls_in_flight.labels("paddle", "get_subscription")
+    peak = 0
+
+    async def request(number: int) -> tuple[bool, float]:
+        started = time.perf_counter()
+        try:
+            if guarded:
+                with deadline(budget):
+                    await service.get_subscription(f"sub_{number}")
+            else:
+                await service.get_subscription(f"sub_{number}")
+            ok = True
+        except Exception:
+            ok = False
+        return ok, time.perf_counter() - started
+
+    tasks = []
+    for number in range(requests):
+        tasks.append(asyncio.create_task(request(number)))
+        await asyncio.sleep(interval)
+        peak = max(peak, int(in_flight.value))
+    results = await asyncio.gather(*tasks)
+    await service.close()
+
+    latencies = [latency for _, latency in results]
+    return {
+        "failed": sum(1 for ok, _ in results if not ok),
+        "fast": sum(1 for latency in latencies if latency < 0.01),
+        "p50": statistics.median(latencies),
+        "max": max(latencies),
+        "peak": peak,
+    }
+
+
+async def main() -> None:
+    """Compare a provider outage with and without deadlines and breakers."""
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    interval_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 50
+    provider_s = float(sys.argv[3]) if len(sys.argv) > 3 else 10
+    budget = float(sys.argv[4]) if len(sys.argv) > 4 else 2
+
+    settings.PADDLE_API_KEY = settings.PADDLE_API_KEY or "pdl_bench"
+    # Breaker warnings would interleave with the results
+    logging.disable(logging.WARNING)
+
+    print(
+        f"{requests} requests every {interval_ms:.0f}ms, provider answering "
+        f"after {provider_s:.0f}s, {budget:.0f}s deadline"
+    )
+    print(
+        f"{'guarded':<8} {'failed':>7} {'fast':>6} {'p50':>8} {'max':>8} "
+        f"{'peak in-flight':>15}"
+    )
+    for guarded in (False, True):
+        result = await run(
+            guarded, requests, interval_ms / 1000, provider_s, budget
+        )
+        print(
+            f"{'yes' if guarded else 'no':<8} {result['failed']:>7} "
+            f"{result['fast']:>6} {result['p50']:>7.2f}s "
+            f"{result['max']:>7.2f}s {result['peak']:>15}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,140 @@
+"""
+Provider rate limit benchmark.
+
+Sends a burst of Paddle API calls through AsyncPaddleService to a stub
+Paddle API that enforces a rate limit the way providers do: a token
+bucket of ``limit_per_s`` requests per second (burst of the same size)
+answering 429 with ``Retry-After: 1`` once it is empty. Compares the
+service without a client-side limiter, where throttled calls fail, to
+one with a limiter configured at the provider's rate.
+
+Usage:
+    python -m backend.benchmarks.provider_rate_limit [calls] [limit_per_s]
+        [latency_ms]
+"""
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import time
+
+import httpx
+
+from backend.config import settings
+from backend.services.http_pool import HttpPool
+from backend.services.paddle_service import AsyncPaddleService, PaddleAPIError
+from backend.services.rate_limit import (
+    ProviderRateLimiter,
+    ProviderRateLimitError,
+    TokenBucket,
+)
+
+
+BODY = json.dumps(
+    {"data": {"id": "ctm_benchmark", "email": "user@example.com"}}
+).encode("utf-8")
+
+
+def stub_transport(limit: float, latency: float) -> httpx.MockTransport:
+    """Stub Paddle API enforcing ``limit`` requests per second."""
+    bucket = TokenBucket(limit, max(1, int(limit)))
+    counts = {"requests": 0, "throttled": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        counts["requests"] += 1
+        if bucket.reserve() > 0:
+            bucket.cancel()
+            counts["throttled"] += 1
+            return httpx.Response(
+                429,
+                headers={"Retry-After": "1"},
+                json={"error": {"code": "too_many_requests"}},
+            )
+        return httpx.Response(200, content=BODY)
+
+    transport = httpx.MockTransport(handler)
+    transport.counts = counts
+    return transport
+
+
+async def burst(
+    calls: int,
+    limit: float,
+    latency: float,
+    limited: bool,
+) -> dict:
+    """Send ``calls`` concurrent calls; return outcome counts and timing."""
+    transport = stub_transport(limit, latency)
+    service = AsyncPaddleService(
+        transport=transport,
+        pool=HttpPool(),
+        rate_limiter=(
+            ProviderRateLimiter(
+                "paddle",
+                read_rate=limit,
+                write_rate=limit,
+                max_wait=calls / limit + 5,
+            )
+            if limited
+            else None
+        ),
+    )
+
+    async def call() -> tuple[str, float]:
+        started = time.perf_counter()
+        try:
+            await service.create_customer("user@example.com")
+            outcome = "ok"
+        except (PaddleAPIError, ProviderRateLimitError):
+            outcome = "failed"
+        return outcome, time.perf_counter() - started
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(call() for _ in range(calls)))
+    elapsed = time.perf_counter() - started
+    await service.close()
+
+    ok = [latency for outcome, latency in results if outcome == "ok"]
+    return {
+        "ok": len(ok),
+        "failed": calls - len(ok),
+        "upstream_429": transport.counts["throttled"],
+        "requests": transport.counts["requests"],
+        "p50": statistics.median(ok) if ok else 0.0,
+        "max": max(ok, default=0.0),
+        "elapsed": elapsed,
+    }
+
+
+async def main() -> None:
+    """Compare a burst with and without the client-side limiter."""
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    limit = float(sys.argv[2]) if len(sys.argv) > 2 else 50
+    latency_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    settings.PADDLE_API_KEY = settings.PADDLE_API_KEY or "pdl_bench"
+    # Retry warnings would interleave with the results
+    logging.disable(logging.WARNING)
+
+    print(
+        f"{calls} concurrent calls, provider limit {limit:.0f}/s, "
+        f"{latency_ms:.0f}ms latency"
+    )
+    print(
+        f"{'limiter':<8} {'ok':>5} {'failed':>7} {'429s':>6} "
+        f"{'requests':>9} {'p50':>8} {'max':>8} {'elapsed':>8}"
+    )
+    for limited in (False, True):
+        result = await burst(calls, limit, latency_ms / 1000, limited)
+        print(
+            f"{'on' if limited else 'off':<8} {result['ok']:>5} "
+            f"{result['failed']:>7} {result['upstream_429']:>6} "
+            f"{result['requests']:>9} {result['p50']:>7.2f}s "
+            f"{result['max']:>7.2f}s {result['elapsed']:>7.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+"""
+Stripe concurrency benchmark.
+
+Compares blocking Stripe SDK calls with AsyncStripeService against a
+stub HTTP client that simulates Stripe's network latency, so no real
+API calls are made.
+
+Usage:
+    python -m backend.benchmarks.stripe_concurrency [requests] [latency_ms]
+"""
+import asyncio
+import json
+import sys
+import time
+
+import stripe
+
+from backend.services.stripe_service import AsyncStripeService
+
+
+SESSION_BODY = json.dumps(
+    {
+        "id": "cs_test_benchmark",
+        "object": "checkout.session",
+        "url": "https://checkout.stripe.com/c/pay/cs_test_benchmark",
+    }
+).encode("utf-8")
+
+
+class StubHTTPClient(stripe.HTTPClient):
+    """HTTP client that answers every request after a fixed delay."""
+
+    name = "stub"
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+
+    def request(self, method, url, headers, post_data=None):
+        time.sleep(self.latency)
+        return SESSION_BODY, 200, {}
+
+    async def request_async(self, method, url, headers, post_data=None):
+        await asyncio.sleep(self.latency)
+        return SESSION_BODY, 200, {}
+
+    def sleep_async(self, secs):
+        return asyncio.sleep(secs)
+
+    def close(self):
+        pass
+
+    async def close_async(self):
+        pass
+
+
+async def run_blocking(requests: int) -> float:
+    """Issue requests the way the routes used to: sync calls on the loop."""
+
+    async def handler():
+        stripe.checkout.Session.create(
+            mode="subscription",
+            line_items=[{"price": "price_benchmark", "quantity": 1}],
+        )
+
+    started = time.perf_counter()
+    await asyncio.gather(*(handler() for _ in range(requests)))
+    return time.perf_counter() - started
+
+
+async def run_async(service: AsyncStripeService, requests: int) -> float:
+    """Issue requests through the async service so they overlap."""
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            service.create_checkout_session(customer_email=None)
+            for _ in range(requests)
+        )
+    )
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    """Run both variants and print wall-clock time and throughput."""
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 50.0) / 1000
+
+    stub = StubHTTPClient(latency)
+    stripe.api_key = stripe.api_key or "sk_test_benchmark"
+    stripe.default_http_client = stub
+    service = AsyncStripeService(http_client=stub)
+
+    blocking = asyncio.run(run_blocking(requests))
+    concurrent = asyncio.run(run_async(service, requests))
+
+    print(f"requests={requests} latency={latency * 1000:.0f}ms")
+    print(
+        f"blocking: {blocking:.2f}s "
+        f"({requests / blocking:.0f} req/s)"
+    )
+    print(
+        f"async:    {concurrent:.2f}s "
+        f"({requests / concurrent:.0f} req/s, "
+        f"{blocking / concurrent:.0f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
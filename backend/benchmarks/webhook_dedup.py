@@ -0,0 +1,83 @@
+"""
+Webhook de-duplication benchmark.
+
+Fills an EventDeduplicator with millions of event IDs and measures
+lookup latency for LRU hits, on-disk hits and misses at each size, to
+show that lookups stay flat as the index grows.
+
+Usage:
+    python -m backend.benchmarks.webhook_dedup [max_ids]
+"""
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from backend.services.webhook_dedup import EventDeduplicator
+
+
+LOOKUPS = 20_000
+
+
+def fill(dedup: EventDeduplicator, start: int, stop: int) -> None:
+    """Bulk insert event IDs ``evt_<start>`` .. ``evt_<stop - 1>``."""
+    connection = dedup.connection
+    now = time.time()
+    connection.execute("BEGIN")
+    connection.executemany(
+        "INSERT OR IGNORE INTO seen_events "
+        "(provider, event_id, received_at) VALUES ('stripe', ?, ?)",
+        ((f"evt_{i}", now) for i in range(start, stop)),
+    )
+    connection.execute("COMMIT")
+
+
+def time_lookups(dedup: EventDeduplicator, event_ids: list[str]) -> float:
+    """Return the mean lookup time in microseconds."""
+    started = time.perf_counter()
+    for event_id in event_ids:
+        dedup.seen("stripe", event_id)
+    return (time.perf_counter() - started) / len(event_ids) * 1e6
+
+
+def main() -> None:
+    """Grow the index by 10x steps and print lookup latency per step."""
+    max_ids = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        dedup = EventDeduplicator(
+            Path(directory) / "dedup.sqlite3",
+            cache_size=LOOKUPS,
+        )
+
+        print(f"{'stored':>10} {'lru hit':>10} {'disk hit':>10} {'miss':>10}")
+
+        size = 0
+        target = 10_000
+        while target <= max_ids:
+            fill(dedup, size, target)
+            size = target
+
+            sample = [
+                f"evt_{random.randrange(size)}" for _ in range(LOOKUPS)
+            ]
+            dedup._recent.clear()
+            disk = time_lookups(dedup, sample)
+            memory = time_lookups(dedup, sample)
+            miss = time_lookups(
+                dedup, [f"evt_new_{i}" for i in range(LOOKUPS)]
+            )
+
+            print(
+                f"{size:>10,} {memory:>8.2f}us {disk:>8.2f}us "
+                f"{miss:>8.2f}us"
+            )
+            target *= 10
+
+        print(dedup.stats())
+        dedup.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Webhook scheduler benchmark.
+
+Enqueues a burst of events whose customers follow a Zipf distribution
+(a few hot customers, a long tail of cold ones) into a WebhookQueue and
+drains it with a stub processor that takes a fixed time per event:
+
+- serial: one worker, the old one-at-a-time behaviour;
+- keyed: per-customer ordering on a worker pool, but a hot customer may
+  fill the whole in-memory buffer;
+- keyed + key limit: as above, with hot customers' surplus left on disk
+  (``WEBHOOK_KEY_BACKLOG``).
+
+Reports throughput, p50/p99 completion time of cold-customer events and
+the number of per-customer ordering violations (which must be zero).
+
+Usage:
+    python -m backend.benchmarks.webhook_scheduler [events] [workers] [skew]
+"""
+import asyncio
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from backend.services.webhook_queue import WebhookQueue
+
+
+CUSTOMERS = 1_000
+HANDLER_SECONDS = 0.002
+# Below the default so a hot customer's backlog outgrows the buffer
+CAPACITY = 256
+
+
+def zipf_customers(events: int, skew: float) -> list[str]:
+    """Draw event customers from a Zipf distribution."""
+    weights = [1 / rank**skew for rank in range(1, CUSTOMERS + 1)]
+    return random.choices(
+        [f"cus_{rank}" for rank in range(CUSTOMERS)], weights, k=events
+    )
+
+
+async def drain(
+    customers: list[str], workers: int, key_limit: int
+) -> tuple[float, list[tuple[str, float]], int]:
+    """
+    Enqueue the burst, drain it and time every event.
+
+    Returns:
+        Elapsed seconds, (customer, completion seconds) per event and the
+        number of ordering violations.
+    """
+    last_seq: dict[str, int] = {}
+    completions: list[tuple[str, float]] = []
+    violations = 0
+
+    async def process(event) -> None:
+        nonlocal violations
+        await asyncio.sleep(HANDLER_SECONDS)
+        customer = event.object["customer"]
+        if last_seq.get(customer, -1) > event.created:
+            violations += 1
+        last_seq[customer] = event.created
+        completions.append((customer, time.perf_counter() - started))
+
+    with tempfile.TemporaryDirectory() as directory:
+        queue = WebhookQueue(
+            Path(directory) / "queue.sqlite3",
+            workers=workers,
+            capacity=CAPACITY,
+            key_limit=key_limit,
+        )
+        queue.register_processor("stripe", process)
+
+        for seq, customer in enumerate(customers):
+            payload = {
+                "id": f"evt_{seq}",
+                "type": "invoice.paid",
+                "created": seq,
+                "data": {"object": {"id": f"in_{seq}", "customer": customer}},
+            }
+            queue.enqueue(
+                "stripe",
+                payload["id"],
+                payload["type"],
+                json.dumps(payload).encode("utf-8"),
+                customer,
+            )
+
+        started = time.perf_counter()
+        await queue.start()
+        while queue.processed < len(customers):
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - started
+        await queue.stop()
+
+    return elapsed, completions, violations
+
+
+async def main() -> None:
+    """Drain the same skewed burst with each configuration."""
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    skew = float(sys.argv[3]) if len(sys.argv) > 3 else 1.2
+
+    customers = zipf_customers(events, skew)
+    hot = {customer for customer, _ in Counter(customers).most_common(3)}
+    share = sum(1 for customer in customers if customer in hot) / events
+    print(
+        f"{events} events over {CUSTOMERS} customers, skew {skew}: "
+        f"top 3 carry {share:.0%}; {workers} workers, "
+        f"{HANDLER_SECONDS * 1000:.0f}ms per event"
+    )
+    print(
+        f"{'schedule':<18} {'throughput':>11} {'cold p50':>10} "
+        f"{'cold p99':>10} {'violations':>10}"
+    )
+
+    configurations = [
+        ("serial", 1, CAPACITY),
+        ("keyed", workers, CAPACITY),
+        ("keyed + key limit", workers, 32),
+    ]
+    for name, pool, key_limit in configurations:
+        elapsed, completions, violations = await drain(
+            customers, pool, key_limit
+        )
+        cold = sorted(
+            seconds for customer, seconds in completions
+            if customer not in hot
+        )
+        p50 = statistics.median(cold) * 1000
+        p99 = cold[int(len(cold) * 0.99) - 1] * 1000
+        print(
+            f"{name:<18} {events / elapsed:>9.0f}/s {p50:>8.0f}ms "
+            f"{p99:>8.0f}ms {violations:>10}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -25,7 +25,11 @@ class Settings:
     # Paddle configuration
     PADDLE_API_KEY: str = os.getenv("PADDLE_API_KEY", "")
     PADDLE_CLIENT_TOKEN: str = os.getenv("PADDLE_CLIENT_TOKEN", "")
+    # Comma-separated: list both secrets while rotating
     PADDLE_WEBHOOK_SECRET: str = os.getenv("PADDLE_WEBHOOK_SECRET", "")
+    PADDLE_WEBHOOK_TOLERANCE: int = int(
+        os.getenv("PADDLE_WEBHOOK_TOLERANCE", "300")
+    )
     PADDLE_PRICE_ID: str = os.getenv("PADDLE_PRICE_ID", "")
     PADDLE_ENVIRONMENT: str = os.getenv("PADDLE_ENVIRONMENT", "sandbox")
 
@@ -34,22 +38,212 @@ class Settings:
     FRONTEND_URL: str = os.getenv("FRONTEND_URL", "http://localhost:8080")
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
 
+    # Logging: "json" (one object per line) or "text", and the fraction of
+    # DEBUG lines kept (only relevant with DEBUG=True)
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")
+    LOG_DEBUG_SAMPLE_RATE: float = float(
+        os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.1")
+    )
+
+    # Tracing: send a Server-Timing breakdown with every response (off by
+    # default: span names include provider paths with object IDs), and
+    # append request traces as OTLP JSON lines to this file (off if empty)
+    SERVER_TIMING: bool = (
+        os.getenv("SERVER_TIMING", "False").lower() == "true"
+    )
+    TRACE_EXPORT_PATH: str = os.getenv("TRACE_EXPORT_PATH", "")
+
+    # Token required by the /api/admin profiling endpoints (off if empty)
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+
+    # Outbound HTTP connection pool (async provider clients)
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(
+        os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")
+    )
+    HTTP_KEEPALIVE_EXPIRY: float = float(
+        os.getenv("HTTP_KEEPALIVE_EXPIRY", "60")
+    )
+    HTTP_TIMEOUT: float = float(os.getenv("HTTP_TIMEOUT", "30"))
+    # Connections opened to each provider at startup
+    HTTP_WARM_CONNECTIONS: int = int(os.getenv("HTTP_WARM_CONNECTIONS", "2"))
+
+    # Load shedding: adaptive concurrency limit per route class (webhook,
+    # account, checkout) and the queue in front of it
+    LOAD_SHEDDING: bool = os.getenv("LOAD_SHEDDING", "True").lower() == "true"
+    CONCURRENCY_LIMIT_INITIAL: int = int(
+        os.getenv("CONCURRENCY_LIMIT_INITIAL", "20")
+    )
+    CONCURRENCY_LIMIT_MIN: int = int(os.getenv("CONCURRENCY_LIMIT_MIN", "2"))
+    CONCURRENCY_LIMIT_MAX: int = int(os.getenv("CONCURRENCY_LIMIT_MAX", "200"))
+    CONCURRENCY_QUEUE_SIZE: int = int(
+        os.getenv("CONCURRENCY_QUEUE_SIZE", "50")
+    )
+    CONCURRENCY_QUEUE_TIMEOUT: float = float(
+        os.getenv("CONCURRENCY_QUEUE_TIMEOUT", "2")
+    )
+    # Recent latency above this multiple of the long-run average shrinks
+    # the limit
+    CONCURRENCY_LATENCY_TOLERANCE: float = float(
+        os.getenv("CONCURRENCY_LATENCY_TOLERANCE", "2")
+    )
+
+    # Worker processes sharing one IP and API key (uvicorn --workers,
+    # WEB_CONCURRENCY); the client-side rate limits below are per process,
+    # so their defaults are the providers' limits divided by this
+    API_WORKERS: int = max(
+        1, int(os.getenv("API_WORKERS", os.getenv("WEB_CONCURRENCY", "1")))
+    )
+
+    # Client-side provider rate limits (requests per second) per endpoint
+    # class, and how 429 responses are retried. Stripe allows 100 reads
+    # and 100 writes per second with live keys, 25 with test keys. Paddle
+    # allows 240 requests per minute in total: two buckets of 1.5/s with
+    # a burst of 30 send at most 2 * 30 + 3 * 60 = 240 in any minute.
+    STRIPE_RATE_LIMIT_READ: float = float(
+        os.getenv(
+            "STRIPE_RATE_LIMIT_READ",
+            str((25 if "_test_" in STRIPE_SECRET_KEY else 100) / API_WORKERS),
+        )
+    )
+    STRIPE_RATE_LIMIT_WRITE: float = float(
+        os.getenv("STRIPE_RATE_LIMIT_WRITE", str(STRIPE_RATE_LIMIT_READ))
+    )
+    PADDLE_RATE_LIMIT_READ: float = float(
+        os.getenv("PADDLE_RATE_LIMIT_READ", str(1.5 / API_WORKERS))
+    )
+    PADDLE_RATE_LIMIT_WRITE: float = float(
+        os.getenv("PADDLE_RATE_LIMIT_WRITE", str(1.5 / API_WORKERS))
+    )
+    # Requests allowed at once before the rates apply
+    STRIPE_RATE_LIMIT_BURST: int = int(
+        os.getenv(
+            "STRIPE_RATE_LIMIT_BURST", str(max(1, int(STRIPE_RATE_LIMIT_READ)))
+        )
+    )
+    PADDLE_RATE_LIMIT_BURST: int = int(
+        os.getenv("PADDLE_RATE_LIMIT_BURST", str(max(1, 30 // API_WORKERS)))
+    )
+    RATE_LIMIT_MAX_RETRIES: int = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "3"))
+    RATE_LIMIT_MAX_WAIT: float = float(os.getenv("RATE_LIMIT_MAX_WAIT", "5"))
+
+    # Time budget (seconds) of a request per route class; provider calls
+    # are cancelled when it runs out
+    REQUEST_DEADLINE_CHECKOUT: float = float(
+        os.getenv("REQUEST_DEADLINE_CHECKOUT", "15")
+    )
+    REQUEST_DEADLINE_ACCOUNT: float = float(
+        os.getenv("REQUEST_DEADLINE_ACCOUNT", "5")
+    )
+    REQUEST_DEADLINE_WEBHOOK: float = float(
+        os.getenv("REQUEST_DEADLINE_WEBHOOK", "10")
+    )
+
+    # Circuit breakers per provider operation: bad (failed or slow) call
+    # rate that opens one, over how many calls, and for how long
+    CIRCUIT_BREAKER_FAILURE_RATE: float = float(
+        os.getenv("CIRCUIT_BREAKER_FAILURE_RATE", "0.5")
+    )
+    CIRCUIT_BREAKER_SLOW_CALL: float = float(
+        os.getenv("CIRCUIT_BREAKER_SLOW_CALL", "5")
+    )
+    CIRCUIT_BREAKER_WINDOW: int = int(
+        os.getenv("CIRCUIT_BREAKER_WINDOW", "20")
+    )
+    CIRCUIT_BREAKER_MIN_CALLS: int = int(
+        os.getenv("CIRCUIT_BREAKER_MIN_CALLS", "10")
+    )
+    CIRCUIT_BREAKER_OPEN_SECONDS: float = float(
+        os.getenv("CIRCUIT_BREAKER_OPEN_SECONDS", "30")
+    )
+
+    # Provider lookup cache: size, TTL and TTL for objects in a final state
+    PROVIDER_CACHE_SIZE: int = int(os.getenv("PROVIDER_CACHE_SIZE", "4096"))
+    PROVIDER_CACHE_TTL: float = float(os.getenv("PROVIDER_CACHE_TTL", "30"))
+    PROVIDER_CACHE_FINAL_TTL: float = float(
+        os.getenv("PROVIDER_CACHE_FINAL_TTL", "600")
+    )
+
+    # Idempotency-Key response store: retention (seconds) and size
+    IDEMPOTENCY_TTL: float = float(os.getenv("IDEMPOTENCY_TTL", "86400"))
+    IDEMPOTENCY_MAX_KEYS: int = int(
+        os.getenv("IDEMPOTENCY_MAX_KEYS", "10000")
+    )
+
+    # Local storage directory for durable state (webhook queue, indexes)
+    DATA_DIR: str = os.getenv(
+        "DATA_DIR", str(Path(__file__).parent / "data")
+    )
+
+    # Webhook ingestion queue
+    WEBHOOK_WORKERS: int = int(os.getenv("WEBHOOK_WORKERS", "4"))
+    WEBHOOK_MAX_ATTEMPTS: int = int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "8"))
+    WEBHOOK_SCHEDULER_CAPACITY: int = int(
+        os.getenv("WEBHOOK_SCHEDULER_CAPACITY", "1000")
+    )
+    WEBHOOK_KEY_BACKLOG: int = int(os.getenv("WEBHOOK_KEY_BACKLOG", "32"))
+    WEBHOOK_DEDUP_CACHE_SIZE: int = int(
+        os.getenv("WEBHOOK_DEDUP_CACHE_SIZE", "100000")
+    )
+    # Seconds webhook event IDs are remembered; providers stop retrying
+    # after about three days
+    WEBHOOK_DEDUP_RETENTION: float = float(
+        os.getenv("WEBHOOK_DEDUP_RETENTION", str(7 * 24 * 3600))
+    )
+    WEBHOOK_HANDLER_TIMEOUT: float = float(
+        os.getenv("WEBHOOK_HANDLER_TIMEOUT", "10")
+    )
+
     # Trial period days
     TRIAL_PERIOD_DAYS: int = int(os.getenv("TRIAL_PERIOD_DAYS", "3"))
 
+    # Anonymous Stripe Checkout Sessions kept ready for /api/stripe/checkout
+    # per worker (0, the default, disables), the level that triggers a
+    # refill, and the validity (seconds) a session must have left
+    CHECKOUT_POOL_SIZE: int = int(os.getenv("CHECKOUT_POOL_SIZE", "0"))
+    CHECKOUT_POOL_LOW_WATERMARK: int = int(
+        os.getenv("CHECKOUT_POOL_LOW_WATERMARK", "5")
+    )
+    CHECKOUT_POOL_MIN_REMAINING: float = float(
+        os.getenv("CHECKOUT_POOL_MIN_REMAINING", "3600")
+    )
+
+    # Relative share of /api/checkout/create per provider before latency
+    # and errors are taken into account ("name=weight,..."; 0 = failover
+    # only), and how long (seconds) a visitor keeps their provider
+    CHECKOUT_PROVIDER_WEIGHTS: str = os.getenv(
+        "CHECKOUT_PROVIDER_WEIGHTS", "stripe=1,paddle=1"
+    )
+    CHECKOUT_STICKY_SECONDS: int = int(
+        os.getenv("CHECKOUT_STICKY_SECONDS", "86400")
+    )
+
     @classmethod
-    def validate(cls) -> None:
-        """Validate that required settings are present."""
-        # Check if at least one payment provider is configured
-        stripe_configured = bool(cls.STRIPE_SECRET_KEY and cls.STRIPE_PRICE_ID)
-        paddle_configured = bool(cls.PADDLE_API_KEY and cls.PADDLE_PRICE_ID)
+    def validate(cls) -> list[str]:
+        """
+        Validate that required settings are present.
+
+        Returns:
+            Names of the configured payment providers.
+
+        Raises:
+            ValueError: If no payment provider is configured.
+        """
+        providers = []
+        if cls.STRIPE_SECRET_KEY and cls.STRIPE_PRICE_ID:
+            providers.append("stripe")
+        if cls.PADDLE_API_KEY and cls.PADDLE_PRICE_ID:
+            providers.append("paddle")
 
-        if not stripe_configured and not paddle_configured:
+        # Check if at least one payment provider is configured
+        if not providers:
             raise ValueError(
                 "At least one payment provider must be configured. "
                 "Set STRIPE_SECRET_KEY + STRIPE_PRICE_ID or "
                 "PADDLE_API_KEY + PADDLE_PRICE_ID"
             )
 
+        return providers
+
 
 settings = Settings()
@@ -3,33 +3,102 @@ Phone Cleaner Plus - Stripe Payment Backend.
 
 FastAPI application for handling Stripe payments and subscriptions.
 """
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 from backend.config import settings
-from backend.routers import stripe_router, paddle_router
-
-
-# Configure logging
-logging.basicConfig(
+from backend.logging_config import setup_logging
+from backend.middleware.deadline import DeadlineMiddleware
+from backend.middleware.load_shedding import LoadSheddingMiddleware
+from backend.middleware.metrics import MetricsMiddleware
+from backend.middleware.request_id import RequestIdMiddleware
+from backend.middleware.tracing import TracingMiddleware
+from backend.providers import enabled_providers, load_providers
+from backend.routers import admin_router, checkout_router
+from backend.services import metrics
+from backend.services.cache import provider_cache
+from backend.services.circuit_breaker import circuit_breakers
+from backend.services.customer_index import customer_index
+from backend.services.event_registry import event_registry
+from backend.services.http_pool import http_pool
+from backend.services.idempotency import idempotency_store
+from backend.services.load_shedding import load_shedder
+from backend.services.provider_routing import provider_selector
+from backend.services.singleflight import provider_flights
+from backend.services.subscription_store import subscription_store
+from backend.services.tracing import span_exporter
+from backend.services.webhook_dedup import webhook_dedup
+from backend.services.webhook_queue import webhook_queue
+
+
+# Configure logging; records are written by a background thread
+setup_logging(
     level=logging.DEBUG if settings.DEBUG else logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    log_format=settings.LOG_FORMAT,
+    debug_sample_rate=settings.LOG_DEBUG_SAMPLE_RATE,
 )
 
 logger = logging.getLogger(__name__)
 
+# Routers and SDKs of unconfigured providers are never imported
+providers = load_providers(enabled_providers())
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background services and warm provider connections."""
+    logger.info(
+        "Starting Phone Cleaner Plus Payment API with %s",
+        ", ".join(provider.name for provider in providers),
+    )
+
+    # Start draining webhook events, including any left from a restart
+    await webhook_queue.start()
+    await webhook_dedup.start()
+
+    # Pre-open provider connections so the first checkout skips the
+    # TCP/TLS handshakes
+    await asyncio.gather(
+        *(provider.service.warm_up() for provider in providers)
+    )
+
+    yield
+
+    logger.info("Shutting down Phone Cleaner Plus Payment API")
+
+    for provider in providers:
+        await provider.service.close()
+    await http_pool.close()
+    await webhook_queue.stop()
+    await webhook_dedup.stop()
+    webhook_dedup.close()
+    subscription_store.close()
+    customer_index.close()
+    span_exporter.close()
+
+
 # Create FastAPI application
 app = FastAPI(
     title="Phone Cleaner Plus Payment API",
     description="Stripe payment integration for Phone Cleaner Plus subscription service",
     version="1.0.0",
     debug=settings.DEBUG,
+    lifespan=lifespan,
 )
 
+# Time budget per request, propagated to provider calls
+app.add_middleware(DeadlineMiddleware)
+
+# Bound in-flight requests per route class; shed the excess with 503
+# (inside CORS, so browsers can read the 503)
+app.add_middleware(LoadSheddingMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -44,11 +113,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
 
+# Per-request span tree: Server-Timing header and trace export
+app.add_middleware(TracingMiddleware)
+
+# Correlate log lines and traces with requests
+app.add_middleware(RequestIdMiddleware)
+
+# Per-route latency and in-flight requests for /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
-app.include_router(stripe_router.router)
-app.include_router(paddle_router.router)
+for provider in providers:
+    app.include_router(provider.router)
+    provider_selector.register(provider.name, provider.service)
+app.include_router(checkout_router.router)
+app.include_router(admin_router.router)
 
 
 @app.get("/")
@@ -70,27 +152,40 @@ async def health_check():
             "status": "healthy",
             "stripe_configured": bool(settings.STRIPE_SECRET_KEY),
             "paddle_configured": bool(settings.PADDLE_API_KEY),
+            "providers": {
+                provider.name: provider.service.stats()
+                for provider in providers
+            },
+            "webhook_queue": webhook_queue.stats(),
+            "webhook_dedup": webhook_dedup.stats(),
+            "webhook_handlers": event_registry.stats(),
+            "provider_cache": provider_cache.stats(),
+            "provider_flights": provider_flights.stats(),
+            "http_pool": http_pool.stats(),
+            "load_shedding": load_shedder.stats(),
+            "circuit_breakers": circuit_breakers.stats(),
+            "checkout_routing": provider_selector.stats(),
+            "idempotency": idempotency_store.stats(),
+            "trace_export": span_exporter.stats(),
         }
     )
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Application startup event handler."""
-    logger.info("Starting Phone Cleaner Plus Payment API")
-    
-    # Validate configuration
-    try:
-        settings.validate()
-        logger.info("Configuration validated successfully")
-    except ValueError as e:
-        logger.warning("Configuration warning: %s", str(e))
-
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Application shutdown event handler."""
-    logger.info("Shutting down Phone Cleaner Plus Payment API")
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Metrics in the Prometheus text format."""
+    queue = webhook_queue.stats()
+    metrics.webhook_queue_depth.set(queue["depth"])
+    metrics.webhook_queue_oldest.set(queue["lag_seconds"])
+    for name, limiter in load_shedder.limiters.items():
+        metrics.concurrency_limit.labels(name).set(int(limiter.limit))
+        metrics.concurrency_in_flight.labels(name).set(limiter.in_flight)
+        metrics.concurrency_queued.labels(name).set(limiter.queued)
+
+    return Response(
+        content=metrics.registry.render(),
+        media_type=metrics.CONTENT_TYPE,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,44 @@
+"""
+Deadline middleware module.
+Gives each request the time budget of its route class.
+"""
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from backend.config import settings
+from backend.middleware.load_shedding import route_class
+from backend.services.deadline import deadline
+
+
+class DeadlineMiddleware:
+    """
+    ASGI middleware setting the request deadline for the route class.
+
+    Provider calls made while handling the request read the deadline
+    from a ContextVar and are cancelled when it passes, so a degraded
+    provider cannot hold a request for the SDK's full timeout. Paths
+    outside the route classes have no deadline.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        deadlines: dict[str, float] | None = None,
+    ):
+        self.app = app
+        self.deadlines = deadlines or {
+            "checkout": settings.REQUEST_DEADLINE_CHECKOUT,
+            "account": settings.REQUEST_DEADLINE_ACCOUNT,
+            "webhook": settings.REQUEST_DEADLINE_WEBHOOK,
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        seconds = None
+        if scope["type"] == "http":
+            seconds = self.deadlines.get(route_class(scope["path"]))
+
+        if seconds is None:
+            await self.app(scope, receive, send)
+            return
+
+        with deadline(seconds):
+            await self.app(scope, receive, send)
@@ -0,0 +1,114 @@
+"""
+Load shedding middleware module.
+Bounds in-flight requests per route class and sheds the excess with 503.
+"""
+import json
+import re
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.services.load_shedding import LoadShedder, load_shedder
+from backend.services.metrics import requests_shed
+
+
+# Route class per path, checked in order; other paths (health, metrics,
+# config, admin, static files) are never limited. Mutating routes are in
+# the checkout class, whose deadline leaves room for provider writes.
+ROUTE_CLASSES = (
+    ("webhook", re.compile(r"^/api/(stripe|paddle)/webhook$")),
+    (
+        "checkout",
+        re.compile(
+            r"^/api/(stripe/(checkout|create-[\w-]+|subscribe)"
+            r"|paddle/(create-transaction|subscription/[^/]+/cancel)"
+            r"|checkout/create)$"
+        ),
+    ),
+    ("account", re.compile(r"^/api/(stripe/session|paddle/subscription)/")),
+)
+
+SHED_BODY = json.dumps(
+    {"detail": "Server is busy, please retry later"}
+).encode("utf-8")
+
+
+def route_class(path: str) -> str | None:
+    """
+    Get the route class of a request path.
+
+    Args:
+        path: Request path.
+
+    Returns:
+        Route class name, or None for unlimited paths.
+    """
+    for name, pattern in ROUTE_CLASSES:
+        if pattern.match(path):
+            return name
+    return None
+
+
+class LoadSheddingMiddleware:
+    """
+    ASGI middleware admitting requests through the route class's
+    adaptive concurrency limit.
+
+    Requests over the limit wait briefly in a bounded queue; when it is
+    full or the wait times out they get an immediate 503 with
+    ``Retry-After`` instead of piling up behind slow provider calls. The
+    latency and outcome (5xx) of admitted requests drive the limit.
+    """
+
+    def __init__(self, app: ASGIApp, shedder: LoadShedder | None = None):
+        self.app = app
+        self.shedder = shedder or load_shedder
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.shedder.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        name = route_class(scope["path"])
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.shedder.limiters[name]
+        reason = await self.shedder.acquire(limiter)
+        if reason is not None:
+            requests_shed.labels(name, reason).inc()
+            await _send_shed(send, limiter.retry_after())
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            limiter.release(
+                time.perf_counter() - started, failed=status >= 500
+            )
+
+
+async def _send_shed(send: Send, retry_after: int) -> None:
+    """Send the 503 response for a shed request."""
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(SHED_BODY)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": SHED_BODY})
@@ -0,0 +1,52 @@
+"""
+Metrics middleware module.
+Records latency and in-flight count of every HTTP request.
+"""
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.services.metrics import (
+    http_request_duration,
+    http_requests_in_flight,
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route request latency.
+
+    Requests are labelled with the route template (e.g.
+    ``/api/stripe/session/{session_id}``), not the raw path, so IDs in
+    URLs do not create new series; unmatched paths share one label.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            # The router stores the matched route in the shared scope
+            route = scope.get("route")
+            http_request_duration.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status),
+            ).observe(time.perf_counter() - started)
@@ -0,0 +1,56 @@
+"""
+Request ID middleware module.
+Tags every request, its log lines and its response with a request ID.
+"""
+import uuid
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.logging_config import request_id_var
+
+
+HEADER = b"x-request-id"
+
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware that assigns each HTTP request an ID.
+
+    A well-formed incoming ``X-Request-ID`` (e.g. from the load balancer)
+    is kept, otherwise a new one is generated. The ID is stored in
+    ``request_id_var`` for log correlation and echoed in the response.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _incoming_request_id(scope) or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (HEADER, request_id.encode("latin-1")),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
+
+
+def _incoming_request_id(scope: Scope) -> str | None:
+    """Get the caller's request ID if it is short and printable."""
+    for name, value in scope["headers"]:
+        if name == HEADER:
+            if 0 < len(value) <= 128 and all(32 < b < 127 for b in value):
+                return value.decode("ascii")
+            return None
+    return None
@@ -0,0 +1,100 @@
+"""
+Tracing middleware module.
+Opens a root span per request and reports its timing tree.
+"""
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.config import settings
+from backend.logging_config import request_id_var
+from backend.services.tracing import (
+    KIND_SERVER,
+    FileSpanExporter,
+    Span,
+    current_span,
+    server_timing,
+    span_exporter,
+)
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware that traces each HTTP request.
+
+    Service methods and provider HTTP calls made while handling the
+    request add child spans to its root span. The resulting tree is
+    summarized in a ``Server-Timing`` response header (if enabled) and
+    handed to the exporter once the request is done.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        exporter: FileSpanExporter = span_exporter,
+        timing_header: bool | None = None,
+    ):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI app.
+            exporter: Destination of finished traces.
+            timing_header: Send ``Server-Timing`` (default: SERVER_TIMING).
+        """
+        self.app = app
+        self.exporter = exporter
+        self.timing_header = (
+            settings.SERVER_TIMING if timing_header is None else timing_header
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        attributes = {
+            "http.request.method": method,
+            "url.path": scope["path"],
+        }
+        request_id = request_id_var.get()
+        if request_id:
+            attributes["request.id"] = request_id
+
+        root = Span(
+            f"{method} {scope['path']}", kind=KIND_SERVER,
+            attributes=attributes,
+        )
+        token = current_span.set(root)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                root.attributes["http.response.status_code"] = (
+                    message["status"]
+                )
+                if self.timing_header:
+                    message["headers"] = [
+                        *message.get("headers", ()),
+                        (
+                            b"server-timing",
+                            server_timing(root).encode("latin-1", "replace"),
+                        ),
+                        (
+                            b"timing-allow-origin",
+                            settings.FRONTEND_URL.encode("latin-1"),
+                        ),
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        except BaseException as e:
+            root.error = type(e).__name__
+            raise
+        finally:
+            current_span.reset(token)
+            route = scope.get("route")
+            if route is not None:
+                root.name = f"{method} {route.path}"
+                root.attributes["http.route"] = route.path
+            root.finish()
+            self.exporter.export(root)
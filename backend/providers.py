@@ -0,0 +1,82 @@
+"""
+Payment providers module.
+Imports the routers and services of configured providers on demand.
+"""
+import importlib
+import logging
+from typing import Any, NamedTuple
+
+from fastapi import APIRouter
+
+from backend.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Router module, service module and async service name per provider. The
+# provider SDKs they import dominate startup time, so only configured
+# providers are imported.
+PROVIDER_MODULES = {
+    "stripe": (
+        "backend.routers.stripe_router",
+        "backend.services.stripe_service",
+        "async_stripe_service",
+    ),
+    "paddle": (
+        "backend.routers.paddle_router",
+        "backend.services.paddle_service",
+        "async_paddle_service",
+    ),
+}
+
+
+class Provider(NamedTuple):
+    """A loaded payment provider."""
+
+    name: str
+    router: APIRouter
+    # Async service with ``warm_up()``, ``close()``, ``stats()`` and
+    # ``create_checkout()``
+    service: Any
+
+
+def enabled_providers() -> list[str]:
+    """
+    Get the providers to load.
+
+    Returns:
+        The providers configured in Settings, or all of them when none is
+        (e.g. local development), so every endpoint still answers.
+    """
+    try:
+        providers = settings.validate()
+        logger.info("Configuration validated successfully")
+        return providers
+    except ValueError as e:
+        logger.warning("Configuration warning: %s", str(e))
+        return list(PROVIDER_MODULES)
+
+
+def load_providers(names: list[str]) -> list[Provider]:
+    """
+    Import the router and async service of each provider.
+
+    Args:
+        names: Provider names (keys of PROVIDER_MODULES).
+
+    Returns:
+        Loaded providers, in the given order.
+    """
+    providers = []
+    for name in names:
+        router_module, service_module, service_name = PROVIDER_MODULES[name]
+        providers.append(
+            Provider(
+                name,
+                importlib.import_module(router_module).router,
+                getattr(
+                    importlib.import_module(service_module), service_name
+                ),
+            )
+        )
+    return providers
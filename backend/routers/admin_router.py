@@ -0,0 +1,150 @@
+"""
+Admin API routes.
+On-demand CPU profiles and memory snapshots of the running process.
+"""
+import asyncio
+import hmac
+import logging
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from backend.config import settings
+from backend.services.profiler import (
+    ProfilerBusyError,
+    memory_snapshots,
+    stack_sampler,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+async def require_admin(
+    admin_token: str | None = Header(None, alias="X-Admin-Token"),
+) -> None:
+    """
+    Check the admin token.
+
+    Raises:
+        HTTPException: 404 if no ADMIN_TOKEN is configured, 403 if the
+            token is missing or wrong.
+    """
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    if admin_token is None or not hmac.compare_digest(
+        admin_token.encode(), settings.ADMIN_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(
+    prefix="/api/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_admin)],
+)
+
+
+@router.post("/profile")
+async def profile(
+    seconds: float = Query(10.0, gt=0, le=60),
+    interval_ms: float = Query(5.0, ge=1, le=1000),
+):
+    """
+    Sample the stacks of all threads while the API keeps serving.
+
+    Args:
+        seconds: Profile duration.
+        interval_ms: Time between samples.
+
+    Returns:
+        Collapsed stacks as a text file, for flamegraph.pl or speedscope.
+    """
+    logger.info("Profiling for %.1fs every %.1fms", seconds, interval_ms)
+
+    try:
+        stacks = await asyncio.to_thread(
+            stack_sampler.sample, seconds, interval_ms / 1000
+        )
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+
+    return PlainTextResponse(
+        stacks,
+        headers={
+            "Content-Disposition": 'attachment; filename="profile.collapsed"'
+        },
+    )
+
+
+@router.post("/memory/snapshots")
+async def take_memory_snapshot():
+    """
+    Take a tracemalloc snapshot, starting tracing on first use.
+
+    Returns:
+        JSON with the snapshot ID and traced memory.
+    """
+    return JSONResponse(content=await asyncio.to_thread(memory_snapshots.take))
+
+
+@router.get("/memory/diff")
+async def memory_diff(
+    base: int,
+    target: int,
+    group_by: Literal["filename", "lineno", "traceback"] = "lineno",
+    limit: int = Query(25, ge=1, le=500),
+):
+    """
+    Compare two memory snapshots.
+
+    Args:
+        base: Earlier snapshot ID.
+        target: Later snapshot ID.
+        group_by: Group allocations by file, line or full traceback.
+        limit: Number of entries returned.
+
+    Returns:
+        JSON with the largest allocation changes.
+    """
+    try:
+        stats = await asyncio.to_thread(
+            memory_snapshots.diff, base, target, group_by, limit
+        )
+    except KeyError as e:
+        raise HTTPException(
+            status_code=404, detail=f"Unknown snapshot {e.args[0]}"
+        ) from e
+
+    return JSONResponse(content={"base": base, "target": target, "top": stats})
+
+
+@router.delete("/memory/snapshots")
+async def stop_memory_tracing():
+    """
+    Stop tracemalloc and drop all snapshots.
+
+    Returns:
+        JSON with the tracing state.
+    """
+    memory_snapshots.stop()
+    return JSONResponse(content=memory_snapshots.stats())
+
+
+@router.get("/status")
+async def profiler_status():
+    """
+    Report profiler and memory tracing state.
+
+    Returns:
+        JSON with profiling and tracemalloc status.
+    """
+    return JSONResponse(
+        content={
+            "profiling": stack_sampler.running,
+            "profiles": stack_sampler.profiles,
+            "memory": memory_snapshots.stats(),
+        }
+    )
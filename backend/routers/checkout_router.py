@@ -0,0 +1,105 @@
+"""
+Provider-neutral checkout routes.
+Creates checkouts with whichever payment provider is healthiest.
+"""
+import logging
+
+from fastapi import APIRouter, Cookie, Header, HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, EmailStr
+
+from backend.config import settings
+from backend.services.idempotency import idempotency_store
+from backend.services.provider_routing import (
+    CheckoutRejectedError,
+    NoProviderAvailableError,
+    provider_selector,
+)
+
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/checkout", tags=["checkout"])
+
+# Provider a visitor was routed to, tried first on their next checkout
+STICKY_COOKIE = "checkout_provider"
+
+
+class CreateCheckoutRequest(BaseModel):
+    """Request model for creating a provider-neutral checkout."""
+
+    email: EmailStr | None = None
+    provider: str | None = None
+
+
+@router.post("/create")
+async def create_checkout(
+    request: CreateCheckoutRequest,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+    sticky_provider: str | None = Cookie(None, alias=STICKY_COOKIE),
+):
+    """
+    Create a checkout with the fastest healthy payment provider.
+
+    An explicit ``provider`` in the body, or else the provider the
+    visitor was routed to before, is tried first unless its circuit
+    breaker is open. Failed attempts fall over to the other provider.
+
+    Returns:
+        JSON with the provider used and its checkout data: a Stripe
+        session ID and URL, or a Paddle transaction for Paddle.js.
+    """
+    providers = provider_selector.providers
+    if request.provider and request.provider not in providers:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown payment provider: {request.provider}",
+        )
+
+    async def create() -> dict:
+        provider, checkout = await provider_selector.create_checkout(
+            customer_email=request.email,
+            preferred=request.provider or sticky_provider,
+        )
+        logger.info("Checkout created with %s", provider)
+        return {"provider": provider, "checkout": checkout}
+
+    try:
+        content = await idempotency_store.run(
+            "checkout.create", idempotency_key, request, create
+        )
+    except HTTPException:
+        raise
+    except CheckoutRejectedError as e:
+        logger.warning("%s rejected checkout: %s", e.provider, str(e))
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except NoProviderAvailableError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+    except Exception as e:
+        logger.error("All payment providers failed: %s", str(e))
+        raise HTTPException(
+            status_code=503,
+            detail="Checkout is unavailable, please retry later",
+        ) from e
+
+    response = JSONResponse(content=content)
+    response.set_cookie(
+        STICKY_COOKIE,
+        content["provider"],
+        max_age=settings.CHECKOUT_STICKY_SECONDS,
+        httponly=True,
+        samesite="lax",
+    )
+    return response
+
+
+@router.get("/providers")
+async def get_providers():
+    """
+    Get the checkout routing state of each provider.
+
+    Returns:
+        JSON with each provider's weight, recent latency and error rate,
+        current share of new checkouts and breaker state.
+    """
+    return JSONResponse(content=provider_selector.stats())
@@ -2,21 +2,51 @@
 Paddle API routes.
 Handles checkout transactions, webhooks, and subscription management.
 """
-import json
 import logging
 
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Header, HTTPException, Request
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, EmailStr
 
 from backend.config import settings
-from backend.services.paddle_service import paddle_service
+from backend.services.cache import provider_cache
+from backend.services.customer_index import customer_index
+from backend.services.event_registry import event_registry
+from backend.services.event_views import WebhookEvent, parse_event
+from backend.services.idempotency import idempotency_store
+from backend.services.paddle_service import (
+    PaddleSignatureError,
+    async_paddle_service,
+    paddle_webhook_verifier,
+    subscription_to_dict,
+)
+from backend.services.subscription_store import subscription_store
+from backend.services.webhook_dedup import webhook_dedup
+from backend.services.webhook_queue import webhook_queue
 
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/paddle", tags=["paddle"])
 
+SUBSCRIPTION_EVENTS = frozenset(
+    {
+        "subscription.created",
+        "subscription.activated",
+        "subscription.updated",
+        "subscription.canceled",
+        "subscription.paused",
+        "subscription.resumed",
+    }
+)
+
+TRANSACTION_EVENTS = frozenset(
+    {
+        "transaction.completed",
+        "transaction.payment_failed",
+    }
+)
+
 
 class CreateTransactionRequest(BaseModel):
     """Request model for creating a transaction."""
@@ -55,7 +85,10 @@ async def get_paddle_config():
 
 
 @router.post("/create-transaction")
-async def create_transaction(request: CreateTransactionRequest):
+async def create_transaction(
+    request: CreateTransactionRequest,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+):
     """
     Create a Paddle transaction for inline checkout.
 
@@ -65,26 +98,34 @@ async def create_transaction(request: CreateTransactionRequest):
     Returns:
         JSON with transaction ID and details.
     """
-    print("\n>>> API: paddle/create-transaction called")
-    print(f"    email: {request.email}")
-    print(f"    customer_id: {request.customer_id}")
+    logger.debug(
+        "paddle/create-transaction called",
+        extra={"email": request.email, "customer_id": request.customer_id},
+    )
 
-    try:
-        transaction = paddle_service.create_transaction(
+    async def create() -> dict:
+        transaction = await async_paddle_service.create_transaction(
             customer_id=request.customer_id,
             customer_email=request.email,
         )
 
-        print(f"<<< Transaction created: {transaction['transaction_id']}")
+        logger.info("Transaction created: %s", transaction["transaction_id"])
+
+        return transaction
+
+    try:
+        transaction = await idempotency_store.run(
+            "paddle.create-transaction", idempotency_key, request, create
+        )
 
         return JSONResponse(content=transaction)
 
+    except HTTPException:
+        raise
     except ValueError as e:
-        print(f"!!! ERROR: {e}")
         logger.error("Configuration error: %s", str(e))
         raise HTTPException(status_code=500, detail=str(e)) from e
     except Exception as e:
-        print(f"!!! ERROR creating transaction: {e}")
         logger.error("Paddle error creating transaction: %s", str(e))
         raise HTTPException(status_code=400, detail=str(e)) from e
 
@@ -100,9 +141,20 @@ async def get_subscription(subscription_id: str):
     Returns:
         JSON with subscription details.
     """
+    # Subscriptions are kept up to date locally by the webhook handler
+    local_subscription = subscription_store.get(
+        "paddle", "subscription", subscription_id
+    )
+    if local_subscription is not None:
+        return JSONResponse(content=local_subscription)
+
     try:
-        subscription = paddle_service.get_subscription(subscription_id)
+        subscription = await async_paddle_service.get_subscription(
+            subscription_id
+        )
         return JSONResponse(content=subscription)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error("Paddle error getting subscription: %s", str(e))
         raise HTTPException(status_code=400, detail=str(e)) from e
@@ -112,6 +164,7 @@ async def get_subscription(subscription_id: str):
 async def cancel_subscription(
     subscription_id: str,
     request: CancelSubscriptionRequest,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
 ):
     """
     Cancel a subscription.
@@ -123,20 +176,40 @@ async def cancel_subscription(
     Returns:
         JSON with cancelled subscription details.
     """
-    print(f"\n>>> API: paddle/subscription/{subscription_id}/cancel called")
-    print(f"    effective_from: {request.effective_from}")
+    logger.debug(
+        "paddle/subscription/cancel called",
+        extra={
+            "subscription_id": subscription_id,
+            "effective_from": request.effective_from,
+        },
+    )
 
-    try:
-        subscription = paddle_service.cancel_subscription(
+    async def cancel() -> dict:
+        subscription = await async_paddle_service.cancel_subscription(
             subscription_id=subscription_id,
             effective_from=request.effective_from,
         )
 
-        print(f"<<< Subscription cancelled: {subscription['id']}")
+        logger.info(
+            "Subscription cancel requested: %s, effective_from=%s",
+            subscription["id"],
+            request.effective_from,
+        )
+
+        return subscription
+
+    try:
+        subscription = await idempotency_store.run(
+            f"paddle.cancel-subscription:{subscription_id}",
+            idempotency_key,
+            request,
+            cancel,
+        )
 
         return JSONResponse(content=subscription)
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"!!! ERROR cancelling subscription: {e}")
         logger.error("Paddle error cancelling subscription: %s", str(e))
         raise HTTPException(status_code=400, detail=str(e)) from e
 
@@ -144,10 +217,12 @@ async def cancel_subscription(
 @router.post("/webhook")
 async def paddle_webhook(request: Request):
     """
-    Handle Paddle webhook events.
+    Receive Paddle webhook events.
 
-    This endpoint receives events from Paddle about transactions,
-    subscriptions, and other payment-related events.
+    The signature is verified and the raw event is appended to the
+    durable webhook queue; processing happens in the background
+    (see the event_registry handlers below), so Paddle gets its 200
+    immediately.
     """
     payload = await request.body()
     signature_header = request.headers.get("paddle-signature", "")
@@ -155,164 +230,213 @@ async def paddle_webhook(request: Request):
     # Verify webhook signature if secret is configured
     if settings.PADDLE_WEBHOOK_SECRET:
         try:
-            timestamp, signature = paddle_service.parse_webhook_signature(
-                signature_header
-            )
-
-            if not paddle_service.verify_webhook_signature(
-                payload=payload,
-                signature=signature_header,
-                timestamp=timestamp,
-            ):
-                logger.error("Invalid Paddle webhook signature")
-                raise HTTPException(
-                    status_code=400,
-                    detail="Invalid signature",
-                )
-        except ValueError as e:
-            logger.error("Invalid webhook signature format: %s", str(e))
+            paddle_webhook_verifier.verify(payload, signature_header)
+        except PaddleSignatureError as e:
+            logger.error("Invalid Paddle webhook signature: %s", str(e))
             raise HTTPException(
                 status_code=400,
-                detail="Invalid signature format",
+                detail="Invalid signature",
             ) from e
 
     # Parse the webhook payload
     try:
-        event = json.loads(payload)
-    except json.JSONDecodeError as e:
+        event = parse_event("paddle", payload)
+        event_id = event.id
+        event_type = event.type
+        ordering_key = event.ordering_key
+    except (ValueError, AttributeError) as e:
         logger.error("Invalid webhook JSON: %s", str(e))
         raise HTTPException(
             status_code=400,
             detail="Invalid JSON payload",
         ) from e
 
-    event_type = event.get("event_type", "unknown")
-    data = event.get("data", {})
+    # Providers retry deliveries; drop events we have already accepted
+    if event_id and webhook_dedup.seen("paddle", event_id):
+        logger.info("Duplicate Paddle webhook event ignored: %s", event_id)
+        return JSONResponse(content={"received": True, "duplicate": True})
 
-    # Print to console for immediate visibility during development
-    print(f"\n{'='*50}")
-    print(f"PADDLE WEBHOOK RECEIVED: {event_type}")
-    print(f"{'='*50}")
-    logger.info("Received Paddle webhook event: %s", event_type)
+    webhook_queue.enqueue(
+        "paddle", event_id, event_type, payload, ordering_key
+    )
+    if event_id:
+        webhook_dedup.add("paddle", event_id)
+    logger.info("Queued Paddle webhook event: %s (%s)", event_type, event_id)
 
-    # Handle specific event types
-    if event_type == "transaction.completed":
-        transaction_id = data.get("id")
-        customer_id = data.get("customer_id")
-        subscription_id = data.get("subscription_id")
-        status = data.get("status")
+    return JSONResponse(content={"received": True})
 
-        print(f"  Transaction completed: {transaction_id}")
-        print(f"  Customer: {customer_id}")
-        print(f"  Subscription: {subscription_id}")
-        print(f"  Status: {status}")
 
-        logger.info(
-            "Transaction completed: %s, customer=%s, subscription=%s",
-            transaction_id,
-            customer_id,
-            subscription_id,
-        )
+@event_registry.on("paddle", *SUBSCRIPTION_EVENTS)
+def record_subscription(event: WebhookEvent) -> None:
+    """Keep the local subscription store current."""
+    data = event.object
+    subscription_store.upsert(
+        "paddle",
+        "subscription",
+        data["id"],
+        subscription_to_dict(data),
+        event.created,
+    )
+    provider_cache.invalidate(("paddle", "subscription", data["id"]))
+
+
+@event_registry.on("paddle", *TRANSACTION_EVENTS)
+def record_transaction(event: WebhookEvent) -> None:
+    """Keep the local transaction store current."""
+    data = event.object
+    subscription_store.upsert(
+        "paddle",
+        "transaction",
+        data["id"],
+        {
+            "id": data["id"],
+            "status": data.get("status"),
+            "customer_id": data.get("customer_id"),
+            "subscription_id": data.get("subscription_id"),
+        },
+        event.created,
+    )
+    provider_cache.invalidate(("paddle", "transaction", data["id"]))
+
+
+@event_registry.on("paddle", "customer.created")
+def record_customer(event: WebhookEvent) -> None:
+    """Store the customer and index it by email for reuse."""
+    data = event.object
+    subscription_store.upsert(
+        "paddle",
+        "customer",
+        data["id"],
+        {
+            "id": data["id"],
+            "email": data.get("email"),
+            "name": data.get("name"),
+        },
+        event.created,
+    )
+    customer_index.add("paddle", data.get("email"), data["id"], event.created)
+
+
+@event_registry.on("paddle", "transaction.completed")
+def log_transaction_completed(event: WebhookEvent) -> None:
+    """Log a completed transaction."""
+    data = event.object
+    transaction_id = data.get("id")
+    customer_id = data.get("customer_id")
+    subscription_id = data.get("subscription_id")
+    status = data.get("status")
+
+    logger.info(
+        "Transaction completed: %s, customer=%s, subscription=%s, "
+        "status=%s",
+        transaction_id,
+        customer_id,
+        subscription_id,
+        status,
+    )
 
-        # TODO: Save to database
-        # TODO: Send confirmation email
+    # TODO: Save to database
+    # TODO: Send confirmation email
 
-    elif event_type == "subscription.created":
-        subscription_id = data.get("id")
-        customer_id = data.get("customer_id")
-        status = data.get("status")
 
-        print(f"  Subscription created: {subscription_id}")
-        print(f"  Customer: {customer_id}")
-        print(f"  Status: {status}")
+@event_registry.on("paddle", "subscription.created")
+def log_subscription_created(event: WebhookEvent) -> None:
+    """Log a new subscription."""
+    data = event.object
+    subscription_id = data.get("id")
+    customer_id = data.get("customer_id")
+    status = data.get("status")
 
-        logger.info(
-            "Subscription created: %s, customer=%s, status=%s",
-            subscription_id,
-            customer_id,
-            status,
-        )
+    logger.info(
+        "Subscription created: %s, customer=%s, status=%s",
+        subscription_id,
+        customer_id,
+        status,
+    )
 
-    elif event_type == "subscription.activated":
-        subscription_id = data.get("id")
-        customer_id = data.get("customer_id")
 
-        print(f"  Subscription activated: {subscription_id}")
-        print(f"  Customer: {customer_id}")
+@event_registry.on("paddle", "subscription.activated")
+def log_subscription_activated(event: WebhookEvent) -> None:
+    """Log an activated subscription."""
+    data = event.object
+    subscription_id = data.get("id")
+    customer_id = data.get("customer_id")
 
-        logger.info(
-            "Subscription activated: %s, customer=%s",
-            subscription_id,
-            customer_id,
-        )
+    logger.info(
+        "Subscription activated: %s, customer=%s",
+        subscription_id,
+        customer_id,
+    )
 
-    elif event_type == "subscription.updated":
-        subscription_id = data.get("id")
-        status = data.get("status")
 
-        print(f"  Subscription updated: {subscription_id}")
-        print(f"  Status: {status}")
+@event_registry.on("paddle", "subscription.updated")
+def log_subscription_updated(event: WebhookEvent) -> None:
+    """Log a subscription change."""
+    data = event.object
+    subscription_id = data.get("id")
+    status = data.get("status")
 
-        logger.info(
-            "Subscription updated: %s, status=%s",
-            subscription_id,
-            status,
-        )
+    logger.info(
+        "Subscription updated: %s, status=%s",
+        subscription_id,
+        status,
+    )
 
-    elif event_type == "subscription.canceled":
-        subscription_id = data.get("id")
-        customer_id = data.get("customer_id")
 
-        print(f"  Subscription cancelled: {subscription_id}")
-        print(f"  Customer: {customer_id}")
+@event_registry.on("paddle", "subscription.canceled")
+def log_subscription_canceled(event: WebhookEvent) -> None:
+    """Log a cancelled subscription."""
+    data = event.object
+    subscription_id = data.get("id")
+    customer_id = data.get("customer_id")
 
-        logger.info(
-            "Subscription cancelled: %s, customer=%s",
-            subscription_id,
-            customer_id,
-        )
+    logger.info(
+        "Subscription cancelled: %s, customer=%s",
+        subscription_id,
+        customer_id,
+    )
 
-    elif event_type == "subscription.paused":
-        subscription_id = data.get("id")
 
-        print(f"  Subscription paused: {subscription_id}")
-        logger.info("Subscription paused: %s", subscription_id)
+@event_registry.on("paddle", "subscription.paused")
+def log_subscription_paused(event: WebhookEvent) -> None:
+    """Log a paused subscription."""
+    subscription_id = event.object.get("id")
 
-    elif event_type == "subscription.resumed":
-        subscription_id = data.get("id")
+    logger.info("Subscription paused: %s", subscription_id)
 
-        print(f"  Subscription resumed: {subscription_id}")
-        logger.info("Subscription resumed: %s", subscription_id)
 
-    elif event_type == "transaction.payment_failed":
-        transaction_id = data.get("id")
-        customer_id = data.get("customer_id")
+@event_registry.on("paddle", "subscription.resumed")
+def log_subscription_resumed(event: WebhookEvent) -> None:
+    """Log a resumed subscription."""
+    subscription_id = event.object.get("id")
 
-        print(f"  Payment failed: {transaction_id}")
-        print(f"  Customer: {customer_id}")
+    logger.info("Subscription resumed: %s", subscription_id)
 
-        logger.warning(
-            "Payment failed: transaction=%s, customer=%s",
-            transaction_id,
-            customer_id,
-        )
 
-        # TODO: Send payment failure notification
+@event_registry.on("paddle", "transaction.payment_failed")
+def log_payment_failed(event: WebhookEvent) -> None:
+    """Log a failed transaction payment."""
+    data = event.object
+    transaction_id = data.get("id")
+    customer_id = data.get("customer_id")
 
-    elif event_type == "customer.created":
-        customer_id = data.get("id")
-        email = data.get("email")
+    logger.warning(
+        "Payment failed: transaction=%s, customer=%s",
+        transaction_id,
+        customer_id,
+    )
 
-        print(f"  Customer created: {customer_id}")
-        print(f"  Email: {email}")
+    # TODO: Send payment failure notification
 
-        logger.info("Customer created: %s, email=%s", customer_id, email)
 
-    else:
-        # Log any unhandled event types
-        print(f"  Unhandled event type: {event_type}")
-        logger.info("Unhandled Paddle event type: %s", event_type)
+@event_registry.on("paddle", "customer.created")
+def log_customer_created(event: WebhookEvent) -> None:
+    """Log a new customer."""
+    data = event.object
+    customer_id = data.get("id")
+    email = data.get("email")
 
-    print(f"{'='*50}\n")
+    logger.info("Customer created: %s, email=%s", customer_id, email)
 
-    return JSONResponse(content={"received": True})
+
+webhook_queue.register_processor("paddle", event_registry.dispatch)
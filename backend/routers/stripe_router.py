@@ -2,23 +2,46 @@
 Stripe API routes.
 Handles checkout sessions, webhooks, and subscription management.
 """
-import json
+import hashlib
+import hmac
 import logging
+import time
+from collections.abc import Mapping
 
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Cookie, Header, HTTPException, Request
 from fastapi.responses import JSONResponse, RedirectResponse
 from pydantic import BaseModel, EmailStr
 
 import stripe
 
 from backend.config import settings
-from backend.services.stripe_service import stripe_service
+from backend.services import metrics
+from backend.services.cache import provider_cache
+from backend.services.customer_index import customer_index
+from backend.services.event_registry import event_registry
+from backend.services.event_views import (
+    ObjectView,
+    WebhookEvent,
+    parse_event,
+)
+from backend.services.idempotency import idempotency_store
+from backend.services.stripe_service import (
+    async_stripe_service,
+    stripe_service,
+)
+from backend.services.subscription_store import subscription_store
+from backend.services.webhook_dedup import webhook_dedup
+from backend.services.webhook_queue import webhook_queue
 
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/stripe", tags=["stripe"])
 
+# Signed customer ID proving a browser created (and so owns) a customer
+CUSTOMER_COOKIE = "stripe_customer"
+CUSTOMER_COOKIE_MAX_AGE = 30 * 24 * 3600
+
 
 class CreateCheckoutRequest(BaseModel):
     """Request model for creating checkout session."""
@@ -40,25 +63,81 @@ class CreateSubscriptionRequest(BaseModel):
     payment_method_id: str
 
 
+class SubscribeRequest(BaseModel):
+    """Request model for one-step subscription with a payment method."""
+
+    email: EmailStr
+    payment_method_id: str
+    price_id: str | None = None
+
+
+def session_summary(session: Mapping | ObjectView) -> dict:
+    """
+    Shape a Checkout Session like the session endpoint returns it.
+
+    Args:
+        session: Checkout Session from the API or a webhook event.
+
+    Returns:
+        Dict with session ID, status, payment status and email.
+    """
+    customer_details = session.get("customer_details") or {}
+
+    return {
+        "id": session["id"],
+        "status": session.get("status"),
+        "payment_status": session.get("payment_status"),
+        "customer_email": customer_details.get("email"),
+    }
+
+
+def subscription_summary(subscription: Mapping | ObjectView) -> dict:
+    """
+    Shape a Subscription for the local subscription store.
+
+    Args:
+        subscription: Subscription from the API or a webhook event.
+
+    Returns:
+        Dict with subscription ID, status, customer and period end.
+    """
+    return {
+        "id": subscription["id"],
+        "status": subscription.get("status"),
+        "customer": subscription.get("customer"),
+        "current_period_end": subscription.get("current_period_end"),
+        "cancel_at_period_end": subscription.get("cancel_at_period_end"),
+    }
+
+
 @router.post("/create-checkout-session")
-async def create_checkout_session(request: CreateCheckoutRequest):
+async def create_checkout_session(
+    request: CreateCheckoutRequest,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+):
     """
     Create a Stripe Checkout Session for subscription.
 
     Returns:
         JSON with session ID and URL, or redirect to Stripe Checkout.
     """
-    try:
-        checkout_session = stripe_service.create_checkout_session(
+
+    async def create() -> dict:
+        checkout_session = await async_stripe_service.create_checkout_session(
             customer_email=request.email,
+            idempotency_key=idempotency_key,
         )
+        return {
+            "id": checkout_session.id,
+            "url": checkout_session.url,
+        }
 
-        return JSONResponse(
-            content={
-                "id": checkout_session.id,
-                "url": checkout_session.url,
-            }
+    try:
+        content = await idempotency_store.run(
+            "stripe.create-checkout-session", idempotency_key, request, create
         )
+
+        return JSONResponse(content=content)
     except stripe.error.StripeError as e:
         logger.error("Stripe error creating checkout session: %s", str(e))
         raise HTTPException(status_code=400, detail=str(e)) from e
@@ -67,60 +146,142 @@ async def create_checkout_session(request: CreateCheckoutRequest):
 @router.get("/checkout")
 async def checkout_redirect(email: str | None = None):
     """
-    Create checkout session and redirect to Stripe.
+    Get a checkout session and redirect to Stripe.
 
-    This endpoint creates a session and immediately redirects.
+    Anonymous visitors get a pre-created session from the pool when one
+    is available, so the redirect does not wait for Stripe.
     """
+    started = time.perf_counter()
     try:
-        checkout_session = stripe_service.create_checkout_session(
-            customer_email=email,
+        checkout_session, pooled = (
+            await async_stripe_service.get_checkout_session(
+                customer_email=email,
+            )
         )
 
+        metrics.checkout_redirect_duration.labels(
+            "pool" if pooled else "on_demand"
+        ).observe(time.perf_counter() - started)
         return RedirectResponse(checkout_session.url, status_code=303)
     except stripe.error.StripeError as e:
         logger.error("Stripe error in checkout redirect: %s", str(e))
         raise HTTPException(status_code=400, detail=str(e)) from e
 
 
+def _customer_signature(customer_id: str) -> str:
+    """Sign a customer ID with a key derived from the Stripe secret."""
+    key = hmac.new(
+        settings.STRIPE_SECRET_KEY.encode("utf-8"),
+        b"customer-cookie",
+        hashlib.sha256,
+    ).digest()
+    return hmac.new(
+        key, customer_id.encode("utf-8"), hashlib.sha256
+    ).hexdigest()
+
+
+def _cookie_customer(cookie: str | None) -> str | None:
+    """Get the customer ID from a customer cookie if its signature holds."""
+    if not cookie:
+        return None
+    customer_id, _, signature = cookie.rpartition(".")
+    if not customer_id or not hmac.compare_digest(
+        signature, _customer_signature(customer_id)
+    ):
+        return None
+    return customer_id
+
+
+def _customer_response(content: dict, owner: bool) -> JSONResponse:
+    """
+    JSON response setting the signed cookie for its ``customerId``.
+
+    The cookie is only set when this request ran the handler (``owner``):
+    a replayed Idempotency-Key response does not prove the caller sent
+    the original request, so it grants no ownership.
+    """
+    response = JSONResponse(content=content)
+    if not owner:
+        return response
+    customer_id = content["customerId"]
+    response.set_cookie(
+        CUSTOMER_COOKIE,
+        f"{customer_id}.{_customer_signature(customer_id)}",
+        max_age=CUSTOMER_COOKIE_MAX_AGE,
+        httponly=True,
+        secure=not settings.DEBUG,
+        samesite="lax",
+    )
+    return response
+
+
 @router.post("/create-setup-intent")
-async def create_setup_intent(request: CreateSetupIntentRequest):
+async def create_setup_intent(
+    request: CreateSetupIntentRequest,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+    customer_cookie: str | None = Cookie(None, alias=CUSTOMER_COOKIE),
+):
     """
     Create a SetupIntent for inline card input.
 
     This is used for Stripe Elements integration where
-    the card is entered directly on the page.
+    the card is entered directly on the page. The existing customer for
+    the email is only reused when the browser's signed customer cookie
+    names it; otherwise a new customer is created.
 
     Returns:
         JSON with client secret, customer ID, and price ID.
     """
-    print(f"\n>>> API: create-setup-intent called with email: {request.email}")
-    try:
-        # Create or get customer
-        customer = stripe_service.create_customer(email=request.email)
+    logger.debug(
+        "create-setup-intent called", extra={"email": request.email}
+    )
+
+    created = False
+
+    async def create() -> dict:
+        nonlocal created
+        # Reuse this browser's customer for the email, or create one
+        customer_id = await async_stripe_service.get_or_create_customer(
+            email=request.email,
+            idempotency_key=idempotency_key,
+            owned_customer_id=_cookie_customer(customer_cookie),
+        )
 
         # Create SetupIntent
-        setup_intent = stripe_service.create_setup_intent(
-            customer_id=customer.id
+        setup_intent = await async_stripe_service.create_setup_intent(
+            customer_id=customer_id,
+            idempotency_key=idempotency_key,
+        )
+
+        logger.info(
+            "SetupIntent created: %s",
+            setup_intent.id,
+            extra={"customer_id": customer_id},
         )
 
-        print(f"<<< SetupIntent created: {setup_intent.id}")
-        print(f"    Customer: {customer.id}")
+        created = True
+        return {
+            "clientSecret": setup_intent.client_secret,
+            "customerId": customer_id,
+            "priceId": settings.STRIPE_PRICE_ID,
+        }
 
-        return JSONResponse(
-            content={
-                "clientSecret": setup_intent.client_secret,
-                "customerId": customer.id,
-                "priceId": settings.STRIPE_PRICE_ID,
-            }
+    try:
+        content = await idempotency_store.run(
+            "stripe.create-setup-intent", idempotency_key, request, create
         )
     except stripe.error.StripeError as e:
-        print(f"!!! ERROR creating setup intent: {e}")
         logger.error("Stripe error creating setup intent: %s", str(e))
         raise HTTPException(status_code=400, detail=str(e)) from e
 
+    return _customer_response(content, owner=created)
+
 
 @router.post("/create-subscription")
-async def create_subscription(request: CreateSubscriptionRequest):
+async def create_subscription(
+    request: CreateSubscriptionRequest,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+):
     """
     Create a subscription after payment method is saved.
 
@@ -129,39 +290,105 @@ async def create_subscription(request: CreateSubscriptionRequest):
     Returns:
         JSON with subscription details.
     """
-    print(f"\n>>> API: create-subscription called")
-    print(f"    customer_id: {request.customer_id}")
-    print(f"    price_id: {request.price_id}")
-    print(f"    payment_method_id: {request.payment_method_id}")
-    try:
-        subscription = stripe_service.create_subscription(
+    logger.debug(
+        "create-subscription called",
+        extra={
+            "customer_id": request.customer_id,
+            "price_id": request.price_id,
+            "payment_method_id": request.payment_method_id,
+        },
+    )
+
+    async def create() -> dict:
+        timings = {}
+        subscription = await async_stripe_service.create_subscription(
             customer_id=request.customer_id,
             price_id=request.price_id,
             payment_method_id=request.payment_method_id,
+            timings=timings,
+            idempotency_key=idempotency_key,
+        )
+        logger.info(
+            "create-subscription Stripe calls: %s",
+            ", ".join(f"{leg}={ms:.1f}ms" for leg, ms in timings.items()),
+        )
+        logger.info(
+            "Subscription created: %s, status=%s",
+            subscription.id,
+            subscription.status,
         )
 
-        print(f"<<< Subscription created: {subscription.id}")
-        print(f"    Status: {subscription.status}")
+        return {
+            "subscriptionId": subscription.id,
+            "status": subscription.status,
+        }
 
-        return JSONResponse(
-            content={
-                "subscriptionId": subscription.id,
-                "status": subscription.status,
-            }
+    try:
+        content = await idempotency_store.run(
+            "stripe.create-subscription", idempotency_key, request, create
         )
+
+        return JSONResponse(content=content)
     except stripe.error.StripeError as e:
-        print(f"!!! ERROR creating subscription: {e}")
         logger.error("Stripe error creating subscription: %s", str(e))
         raise HTTPException(status_code=400, detail=str(e)) from e
 
 
+@router.post("/subscribe")
+async def subscribe(
+    request: SubscribeRequest,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+    customer_cookie: str | None = Cookie(None, alias=CUSTOMER_COOKIE),
+):
+    """
+    Create a customer (if needed) and subscription in one request.
+
+    Used by Apple Pay / Google Pay, where the payment method already
+    exists, instead of create-setup-intent followed by
+    create-subscription. As there, an existing customer is only reused
+    when the signed customer cookie names it.
+
+    Returns:
+        JSON with subscription details and customer ID.
+    """
+    created = False
+
+    async def create() -> dict:
+        nonlocal created
+        customer_id, subscription = await async_stripe_service.subscribe(
+            email=request.email,
+            payment_method_id=request.payment_method_id,
+            price_id=request.price_id,
+            idempotency_key=idempotency_key,
+            owned_customer_id=_cookie_customer(customer_cookie),
+        )
+        created = True
+        return {
+            "subscriptionId": subscription.id,
+            "status": subscription.status,
+            "customerId": customer_id,
+        }
+
+    try:
+        content = await idempotency_store.run(
+            "stripe.subscribe", idempotency_key, request, create
+        )
+    except stripe.error.StripeError as e:
+        logger.error("Stripe error subscribing: %s", str(e))
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    return _customer_response(content, owner=created)
+
+
 @router.post("/webhook")
 async def stripe_webhook(request: Request):
     """
-    Handle Stripe webhook events.
+    Receive Stripe webhook events.
 
-    This endpoint receives events from Stripe about payment status,
-    subscription changes, etc.
+    The signature is verified and the raw event is appended to the
+    durable webhook queue; processing happens in the background
+    (see the event_registry handlers below), so Stripe gets its 200
+    immediately.
     """
     payload = await request.body()
     sig_header = request.headers.get("stripe-signature", "")
@@ -169,7 +396,7 @@ async def stripe_webhook(request: Request):
     # If webhook secret is configured, verify the signature
     if settings.STRIPE_WEBHOOK_SECRET:
         try:
-            event = stripe_service.construct_webhook_event(
+            stripe_service.verify_webhook_signature(
                 payload=payload,
                 sig_header=sig_header,
             )
@@ -183,113 +410,191 @@ async def stripe_webhook(request: Request):
             raise HTTPException(
                 status_code=400, detail="Invalid signature"
             ) from e
-    else:
-        # Without webhook secret, just parse the event
-        try:
-            event = stripe.Event.construct_from(
-                json.loads(payload),
-                stripe.api_key,
-            )
-        except ValueError as e:
-            logger.error("Invalid webhook payload: %s", str(e))
-            raise HTTPException(
-                status_code=400, detail="Invalid payload"
-            ) from e
-
-    # Print to console for immediate visibility during development
-    print(f"\n{'='*50}")
-    print(f"WEBHOOK RECEIVED: {event['type']}")
-    print(f"{'='*50}")
-    logger.info("Received webhook event: %s", event["type"])
-
-    # Handle specific event types
-    if event["type"] == "checkout.session.completed":
-        session = event["data"]["object"]
-
-        customer_email = session.get("customer_details", {}).get("email")
-        customer_name = session.get("customer_details", {}).get("name")
-        amount_total = session.get("amount_total")
-        currency = session.get("currency")
-        subscription_id = session.get("subscription")
-
-        logger.info(
-            "Checkout completed: email=%s, name=%s, amount=%s %s, sub=%s",
-            customer_email,
-            customer_name,
-            amount_total,
-            currency,
-            subscription_id,
-        )
-
-        # TODO: Save to database
-        # TODO: Send confirmation email
-
-    elif event["type"] == "setup_intent.succeeded":
-        setup_intent = event["data"]["object"]
-        print(f"  SetupIntent succeeded: {setup_intent['id']}")
-        print(f"  Customer: {setup_intent.get('customer')}")
-        print(f"  Payment Method: {setup_intent.get('payment_method')}")
-        logger.info(
-            "SetupIntent succeeded: %s, customer=%s",
-            setup_intent["id"],
-            setup_intent.get("customer"),
-        )
-
-    elif event["type"] == "customer.subscription.created":
-        subscription = event["data"]["object"]
-        print(f"  Subscription ID: {subscription['id']}")
-        print(f"  Status: {subscription['status']}")
-        print(f"  Customer: {subscription.get('customer')}")
-        logger.info("Subscription created: %s", subscription["id"])
 
-    elif event["type"] == "customer.subscription.updated":
-        subscription = event["data"]["object"]
-        logger.info(
-            "Subscription updated: %s, status=%s",
-            subscription["id"],
-            subscription["status"],
-        )
+    try:
+        event = parse_event("stripe", payload)
+        event_id = event.id
+        event_type = event.type
+        ordering_key = event.ordering_key
+    except (ValueError, KeyError, AttributeError) as e:
+        logger.error("Invalid webhook payload: %s", str(e))
+        raise HTTPException(
+            status_code=400, detail="Invalid payload"
+        ) from e
+
+    # Providers retry deliveries; drop events we have already accepted
+    if event_id and webhook_dedup.seen("stripe", event_id):
+        logger.info("Duplicate webhook event ignored: %s", event_id)
+        return JSONResponse(content={"received": True, "duplicate": True})
+
+    webhook_queue.enqueue(
+        "stripe", event_id, event_type, payload, ordering_key
+    )
+    if event_id:
+        webhook_dedup.add("stripe", event_id)
+    logger.info("Queued webhook event: %s (%s)", event_type, event_id)
 
-    elif event["type"] == "customer.subscription.deleted":
-        subscription = event["data"]["object"]
-        logger.info("Subscription cancelled: %s", subscription["id"])
+    return JSONResponse(content={"received": True})
 
-    elif event["type"] == "invoice.paid":
-        invoice = event["data"]["object"]
-        logger.info(
-            "Invoice paid: %s, amount=%s",
-            invoice["id"],
-            invoice["amount_paid"],
-        )
 
-    elif event["type"] == "invoice.payment_failed":
-        invoice = event["data"]["object"]
-        logger.warning(
-            "Invoice payment failed: %s, customer=%s",
-            invoice["id"],
-            invoice.get("customer"),
-        )
-        # TODO: Send payment failure notification
-
-    elif event["type"] == "payment_method.attached":
-        pm = event["data"]["object"]
-        print(f"  Payment method attached: {pm['id']}")
-        print(f"  Type: {pm['type']}")
-        print(f"  Customer: {pm.get('customer')}")
-        logger.info("Payment method attached: %s", pm["id"])
-
-    elif event["type"] == "customer.created":
-        customer = event["data"]["object"]
-        print(f"  Customer created: {customer['id']}")
-        print(f"  Email: {customer.get('email')}")
-        logger.info("Customer created: %s", customer["id"])
-
-    else:
-        # Log any unhandled event types
-        print(f"  Unhandled event type: {event['type']}")
-
-    print(f"{'='*50}\n")
-    return JSONResponse(content={"received": True})
+@event_registry.on("stripe", "checkout.session.completed")
+def record_checkout_session(event: WebhookEvent) -> None:
+    """Store the completed session for the session endpoint."""
+    session = event.object
+    subscription_store.upsert(
+        "stripe",
+        "checkout_session",
+        session["id"],
+        session_summary(session),
+        event.created,
+    )
+    provider_cache.invalidate(("stripe", "checkout_session", session["id"]))
+
+
+@event_registry.on("stripe", "checkout.session.completed")
+def log_checkout_completed(event: WebhookEvent) -> None:
+    """Log a completed checkout."""
+    session = event.object
+    customer_details = session.get("customer_details") or {}
+
+    logger.info(
+        "Checkout completed: email=%s, name=%s, amount=%s %s, sub=%s",
+        customer_details.get("email"),
+        customer_details.get("name"),
+        session.get("amount_total"),
+        session.get("currency"),
+        session.get("subscription"),
+    )
+
+    # TODO: Save to database
+    # TODO: Send confirmation email
+
+
+@event_registry.on("stripe", "setup_intent.succeeded")
+def log_setup_intent_succeeded(event: WebhookEvent) -> None:
+    """Log a confirmed SetupIntent."""
+    setup_intent = event.object
+    logger.info(
+        "SetupIntent succeeded: %s, customer=%s",
+        setup_intent["id"],
+        setup_intent.get("customer"),
+        extra={"payment_method_id": setup_intent.get("payment_method")},
+    )
+
+
+@event_registry.on(
+    "stripe",
+    "customer.subscription.created",
+    "customer.subscription.updated",
+    "customer.subscription.deleted",
+)
+def record_subscription(event: WebhookEvent) -> None:
+    """Keep the local subscription store current."""
+    subscription = event.object
+    subscription_store.upsert(
+        "stripe",
+        "subscription",
+        subscription["id"],
+        subscription_summary(subscription),
+        event.created,
+    )
+
+
+@event_registry.on("stripe", "customer.subscription.created")
+def log_subscription_created(event: WebhookEvent) -> None:
+    """Log a new subscription."""
+    subscription = event.object
+    logger.info(
+        "Subscription created: %s, status=%s, customer=%s",
+        subscription["id"],
+        subscription["status"],
+        subscription.get("customer"),
+    )
+
+
+@event_registry.on("stripe", "customer.subscription.updated")
+def log_subscription_updated(event: WebhookEvent) -> None:
+    """Log a subscription change."""
+    subscription = event.object
+    logger.info(
+        "Subscription updated: %s, status=%s",
+        subscription["id"],
+        subscription["status"],
+    )
+
+
+@event_registry.on("stripe", "customer.subscription.deleted")
+def log_subscription_deleted(event: WebhookEvent) -> None:
+    """Log a cancelled subscription."""
+    logger.info("Subscription cancelled: %s", event.object["id"])
+
+
+@event_registry.on("stripe", "invoice.paid")
+def log_invoice_paid(event: WebhookEvent) -> None:
+    """Log a paid invoice."""
+    invoice = event.object
+    logger.info(
+        "Invoice paid: %s, amount=%s",
+        invoice["id"],
+        invoice["amount_paid"],
+    )
+
+
+@event_registry.on("stripe", "invoice.payment_failed")
+def log_invoice_payment_failed(event: WebhookEvent) -> None:
+    """Log a failed invoice payment."""
+    invoice = event.object
+    logger.warning(
+        "Invoice payment failed: %s, customer=%s",
+        invoice["id"],
+        invoice.get("customer"),
+    )
+    # TODO: Send payment failure notification
+
+
+@event_registry.on("stripe", "payment_method.attached")
+def log_payment_method_attached(event: WebhookEvent) -> None:
+    """Log a payment method attached to a customer."""
+    pm = event.object
+    logger.info(
+        "Payment method attached: %s, type=%s, customer=%s",
+        pm["id"],
+        pm["type"],
+        pm.get("customer"),
+    )
+
+
+@event_registry.on("stripe", "customer.created")
+def record_customer(event: WebhookEvent) -> None:
+    """Store the customer and index it by email for reuse."""
+    customer = event.object
+    subscription_store.upsert(
+        "stripe",
+        "customer",
+        customer["id"],
+        {"id": customer["id"], "email": customer.get("email")},
+        event.created,
+    )
+    customer_index.add(
+        "stripe",
+        customer.get("email"),
+        customer["id"],
+        customer.get("created") or event.created,
+    )
+    logger.info(
+        "Customer created: %s, email=%s", customer["id"], customer.get("email")
+    )
+
+
+@event_registry.on("stripe", "customer.deleted")
+def forget_customer(event: WebhookEvent) -> None:
+    """Stop reusing a deleted customer."""
+    customer = event.object
+    customer_index.remove("stripe", customer["id"])
+    logger.info("Customer deleted: %s", customer["id"])
+
+
+webhook_queue.register_processor("stripe", event_registry.dispatch)
 
 
 @router.get("/session/{session_id}")
@@ -299,21 +604,17 @@ async def get_session(session_id: str):
 
     Useful for confirming payment status on the frontend.
     """
+    # Completed sessions are recorded locally by the webhook handler
+    local_session = subscription_store.get(
+        "stripe", "checkout_session", session_id
+    )
+    if local_session is not None:
+        return JSONResponse(content=local_session)
+
     try:
-        session = stripe_service.get_session(session_id)
-
-        customer_email = None
-        if session.customer_details:
-            customer_email = session.customer_details.email
-
-        return JSONResponse(
-            content={
-                "id": session.id,
-                "status": session.status,
-                "payment_status": session.payment_status,
-                "customer_email": customer_email,
-            }
-        )
+        session = await async_stripe_service.get_session(session_id)
+
+        return JSONResponse(content=session_summary(session))
     except stripe.error.StripeError as e:
         logger.error("Stripe error getting session: %s", str(e))
         raise HTTPException(status_code=400, detail=str(e)) from e
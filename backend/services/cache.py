@@ -0,0 +1,218 @@
+"""
+Cache module.
+Read-through TTL cache for provider lookups with explicit invalidation.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any, Protocol
+
+from backend.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(Protocol):
+    """Interface implemented by provider cache backends."""
+
+    def get(self, key: Hashable) -> Any | None:
+        """Return the cached value, or None on a miss."""
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None):
+        """Store a value for ``ttl`` seconds."""
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a cached value."""
+
+    def generation(self, key: Hashable) -> int:
+        """Return a counter that changes whenever ``key`` is invalidated."""
+
+    def stats(self) -> dict:
+        """Return hit-rate statistics."""
+
+
+class TTLCache:
+    """
+    Size-bounded LRU cache with a per-entry time to live.
+
+    Entries expire ``ttl`` seconds after they were stored; when the cache
+    is full the least recently used entry is evicted. Each invalidation
+    bumps the key's generation, so a load that started before it can
+    tell that its value is stale. Webhook handlers invalidate from worker
+    threads, so every operation holds a lock.
+    """
+
+    def __init__(self, max_size: int = 1024, default_ttl: float = 30.0):
+        """Initialize an empty cache."""
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = (
+            OrderedDict()
+        )
+        # Generation per recently invalidated key, bounded like the
+        # entries. Keys without one read as the highest generation ever
+        # forgotten, so forgetting a key never makes it look unchanged.
+        self._generations: OrderedDict[Hashable, int] = OrderedDict()
+        self._last_generation = 0
+        self._forgotten_generation = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        """
+        Get a cached value.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            Cached value, or None if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None):
+        """
+        Store a value.
+
+        Args:
+            key: Cache key.
+            value: Value to cache.
+            ttl: Time to live in seconds (defaults to ``default_ttl``).
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Drop a cached value, e.g. when a webhook reports a change.
+
+        Args:
+            key: Cache key.
+        """
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+            self._last_generation += 1
+            self._generations[key] = self._last_generation
+            self._generations.move_to_end(key)
+            if len(self._generations) > self.max_size:
+                _, forgotten = self._generations.popitem(last=False)
+                self._forgotten_generation = max(
+                    self._forgotten_generation, forgotten
+                )
+
+    def generation(self, key: Hashable) -> int:
+        """
+        Get a counter that changes whenever a key is invalidated.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            Generation counter; compare before and after a load.
+        """
+        with self._lock:
+            return self._generations.get(key, self._forgotten_generation)
+
+    def clear(self) -> None:
+        """Drop all cached values."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict with hits, misses, hit rate, size and eviction counters.
+        """
+        lookups = self.hits + self.misses
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+async def read_through(
+    cache: CacheBackend | None,
+    key: Hashable,
+    loader: Callable[[], Awaitable[Any]],
+    ttl: float | Callable[[Any], float] | None = None,
+) -> Any:
+    """
+    Return a cached value, loading and caching it on a miss.
+
+    The loaded value is not cached if the key was invalidated while it
+    was loading, as it may predate the change that invalidated it.
+
+    Args:
+        cache: Cache backend, or None to always call the loader.
+        key: Cache key.
+        loader: Coroutine function that fetches the value.
+        ttl: Time to live in seconds, or a function computing it from the
+            loaded value (e.g. longer for objects in a final state).
+
+    Returns:
+        Cached or freshly loaded value.
+    """
+    if cache is None:
+        return await loader()
+
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    generation = cache.generation(key)
+    value = await loader()
+    if cache.generation(key) == generation:
+        cache.set(key, value, ttl(value) if callable(ttl) else ttl)
+
+    return value
+
+
+provider_cache = TTLCache(
+    max_size=settings.PROVIDER_CACHE_SIZE,
+    default_ttl=settings.PROVIDER_CACHE_TTL,
+)
@@ -0,0 +1,305 @@
+"""
+Circuit breaker module.
+Fails provider operations fast while the provider is unhealthy.
+"""
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from fastapi import HTTPException
+
+from backend.config import settings
+from backend.services.metrics import (
+    circuit_breaker_rejected,
+    circuit_breaker_state,
+    circuit_breaker_transitions,
+)
+
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar("R")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Value of the state gauge per state
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(HTTPException):
+    """A provider operation fails fast while its breaker is open (503)."""
+
+    def __init__(self, provider: str, operation: str, retry_after: float):
+        super().__init__(
+            status_code=503,
+            detail=f"{provider} is unavailable, please retry later",
+            headers={"Retry-After": str(max(1, round(retry_after)))},
+        )
+        self.provider = provider
+        self.operation = operation
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker over a rolling window of calls.
+
+    While closed, each call's outcome is recorded in a window of the last
+    ``window`` calls; a call is bad if it failed or took longer than
+    ``slow_call_seconds``. Once the window holds ``min_calls`` calls and
+    the bad rate reaches ``failure_rate``, the breaker opens and every
+    call fails fast with CircuitOpenError for ``open_seconds``. It then
+    lets ``half_open_calls`` probe calls through: if they all succeed it
+    closes, otherwise it opens again.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        operation: str,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 5.0,
+        window: int = 20,
+        min_calls: int = 10,
+        open_seconds: float = 30.0,
+        half_open_calls: int = 2,
+    ):
+        """
+        Initialize a closed breaker.
+
+        Args:
+            provider: Provider name.
+            operation: Operation (service method) name.
+            failure_rate: Bad call rate that opens the breaker.
+            slow_call_seconds: Calls slower than this count as bad.
+            window: Calls the rate is computed over.
+            min_calls: Calls needed before the breaker can open.
+            open_seconds: Time spent open before probing.
+            half_open_calls: Successful probes needed to close.
+        """
+        self.provider = provider
+        self.operation = operation
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._outcomes: deque[bool] = deque(maxlen=window)
+        self._probes = 0
+        self._probe_successes = 0
+
+        self.trips = 0
+        self.rejected = 0
+        self._gauge = circuit_breaker_state.labels(provider, operation)
+        self._gauge.set(STATE_VALUES[CLOSED])
+
+    async def call(
+        self,
+        request: Callable[[], Awaitable[R]],
+        failed: Callable[[R], bool] = lambda result: False,
+    ) -> R:
+        """
+        Run a provider call through the breaker.
+
+        Args:
+            request: Makes the call.
+            failed: Whether a returned result is a failure (e.g. 5xx).
+
+        Returns:
+            The call's result.
+
+        Raises:
+            CircuitOpenError: If the breaker is open.
+        """
+        self._admit()
+        started = time.monotonic()
+        try:
+            result = await request()
+        except Exception:
+            self._record(bad=True)
+            raise
+        except BaseException:
+            # Cancelled (deadline passed or client gone): only a verdict
+            # if the call was already slow
+            if time.monotonic() - started > self.slow_call_seconds:
+                self._record(bad=True)
+            else:
+                self._release()
+            raise
+
+        slow = time.monotonic() - started > self.slow_call_seconds
+        self._record(bad=failed(result) or slow)
+        return result
+
+    @property
+    def is_open(self) -> bool:
+        """Whether calls are currently failing fast (not yet probing)."""
+        return (
+            self.state == OPEN
+            and time.monotonic() - self.opened_at < self.open_seconds
+        )
+
+    def stats(self) -> dict:
+        """
+        Get breaker state and counters.
+
+        Returns:
+            Dict with the state, bad call rate over the window, calls in
+            the window, times opened and calls rejected while open.
+        """
+        return {
+            "state": self.state,
+            "failure_rate": round(self._bad_rate(), 4),
+            "window_calls": len(self._outcomes),
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+    def _admit(self) -> None:
+        """Let a call through, or raise while open."""
+        if self.state == OPEN:
+            waited = time.monotonic() - self.opened_at
+            if waited < self.open_seconds:
+                self._reject(self.open_seconds - waited)
+            self._transition(HALF_OPEN)
+            self._probes = 0
+            self._probe_successes = 0
+
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_calls:
+                self._reject(1.0)
+            self._probes += 1
+
+    def _release(self) -> None:
+        """Forget a call that ended without a verdict."""
+        if self.state == HALF_OPEN:
+            self._probes -= 1
+
+    def _record(self, bad: bool) -> None:
+        """Record a call's outcome and change state if needed."""
+        if self.state == HALF_OPEN:
+            if bad:
+                self._open()
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_calls:
+                self._outcomes.clear()
+                self._transition(CLOSED)
+            return
+
+        if self.state == OPEN:
+            # Started before the breaker opened
+            return
+
+        self._outcomes.append(bad)
+        if (
+            len(self._outcomes) >= self.min_calls
+            and self._bad_rate() >= self.failure_rate
+        ):
+            self._open()
+
+    def _open(self) -> None:
+        """Start failing fast."""
+        self.opened_at = time.monotonic()
+        self.trips += 1
+        self._transition(OPEN)
+        logger.warning(
+            "Circuit breaker for %s %s opened for %.0fs",
+            self.provider,
+            self.operation,
+            self.open_seconds,
+        )
+
+    def _transition(self, state: str) -> None:
+        """Change state and publish it."""
+        self.state = state
+        self._gauge.set(STATE_VALUES[state])
+        circuit_breaker_transitions.labels(
+            self.provider, self.operation, state
+        ).inc()
+
+    def _reject(self, retry_after: float) -> None:
+        """Fail a call fast."""
+        self.rejected += 1
+        circuit_breaker_rejected.labels(self.provider, self.operation).inc()
+        raise CircuitOpenError(self.provider, self.operation, retry_after)
+
+    def _bad_rate(self) -> float:
+        """Fraction of bad calls in the window."""
+        if not self._outcomes:
+            return 0.0
+        return sum(self._outcomes) / len(self._outcomes)
+
+
+class CircuitBreakers:
+    """Circuit breakers per provider operation, created on first use."""
+
+    def __init__(self, **config):
+        """
+        Initialize the registry.
+
+        Args:
+            **config: CircuitBreaker arguments shared by all breakers.
+        """
+        self.config = config
+        self._breakers: dict[tuple[str, str], CircuitBreaker] = {}
+
+    def get(self, provider: str, operation: str) -> CircuitBreaker:
+        """
+        Get the breaker of a provider operation.
+
+        Args:
+            provider: Provider name.
+            operation: Operation (service method) name.
+
+        Returns:
+            The operation's breaker.
+        """
+        key = (provider, operation)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CircuitBreaker(
+                provider, operation, **self.config
+            )
+        return breaker
+
+    def is_open(self, provider: str, operation: str) -> bool:
+        """
+        Check whether a provider operation is failing fast.
+
+        Args:
+            provider: Provider name.
+            operation: Operation (service method) name.
+
+        Returns:
+            True if the operation's breaker exists and is open.
+        """
+        breaker = self._breakers.get((provider, operation))
+        return breaker is not None and breaker.is_open
+
+    def stats(self) -> dict:
+        """
+        Get the state of every breaker.
+
+        Returns:
+            Dict of provider to operation to breaker stats.
+        """
+        providers: dict[str, dict] = {}
+        for (provider, operation), breaker in self._breakers.items():
+            providers.setdefault(provider, {})[operation] = breaker.stats()
+        return providers
+
+
+circuit_breakers = CircuitBreakers(
+    failure_rate=settings.CIRCUIT_BREAKER_FAILURE_RATE,
+    slow_call_seconds=settings.CIRCUIT_BREAKER_SLOW_CALL,
+    window=settings.CIRCUIT_BREAKER_WINDOW,
+    min_calls=settings.CIRCUIT_BREAKER_MIN_CALLS,
+    open_seconds=settings.CIRCUIT_BREAKER_OPEN_SECONDS,
+)
@@ -0,0 +1,239 @@
+"""
+Customer index module.
+Persistent email to customer IDs index used to reuse existing customers.
+
+Backfill the index from existing Stripe customers with:
+    python -m backend.services.customer_index
+"""
+import asyncio
+import logging
+from pathlib import Path
+
+from backend.services.storage import connect, database_path
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS customer_emails (
+    provider TEXT NOT NULL,
+    email TEXT NOT NULL,
+    customer_id TEXT NOT NULL,
+    created REAL,
+    PRIMARY KEY (provider, email, customer_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS customer_emails_customer
+    ON customer_emails (provider, customer_id);
+"""
+
+# Rows indexed before ``created`` was stored get it from the next record
+UPSERT = """
+INSERT INTO customer_emails (provider, email, customer_id, created)
+VALUES (?, ?, ?, ?)
+ON CONFLICT (provider, email, customer_id) DO UPDATE
+SET created = excluded.created
+WHERE customer_emails.created IS NULL
+"""
+
+# Databases from before an email could map to several customers keyed
+# the table on (provider, email) alone
+MIGRATE = """
+ALTER TABLE customer_emails RENAME TO customer_emails_by_email;
+DROP INDEX IF EXISTS customer_emails_customer;
+"""
+COPY = """
+INSERT OR IGNORE INTO customer_emails
+SELECT provider, email, customer_id, created FROM customer_emails_by_email;
+DROP TABLE customer_emails_by_email;
+"""
+
+
+def normalize_email(email: str) -> str:
+    """Normalize an email address for lookups."""
+    return email.strip().lower()
+
+
+class CustomerIndex:
+    """
+    Persistent email to customer IDs index.
+
+    Every customer recorded for an email is kept, so a caller proving it
+    owns one of them (see ``has``) can reuse it however many customers
+    share the email.
+    """
+
+    def __init__(self, path: str | Path):
+        """Initialize the index; the database is opened lazily."""
+        self.path = Path(path)
+        self._connection = None
+
+    @property
+    def connection(self):
+        """Lazy initialization of the index database."""
+        if self._connection is None:
+            connection = connect(self.path)
+            columns = {
+                row[1]: row[5]
+                for row in connection.execute(
+                    "PRAGMA table_info(customer_emails)"
+                )
+            }
+            migrate = bool(columns) and not columns.get("customer_id")
+            if migrate:
+                if "created" not in columns:
+                    connection.execute(
+                        "ALTER TABLE customer_emails ADD COLUMN created REAL"
+                    )
+                connection.executescript(MIGRATE)
+            connection.executescript(SCHEMA)
+            if migrate:
+                connection.executescript(COPY)
+            self._connection = connection
+        return self._connection
+
+    def close(self) -> None:
+        """Close the index database."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def has(self, provider: str, email: str, customer_id: str) -> bool:
+        """
+        Check whether a customer is indexed for an email.
+
+        Args:
+            provider: Provider name.
+            email: Customer's email address.
+            customer_id: Provider customer ID.
+
+        Returns:
+            True if the customer was recorded with this email.
+        """
+        row = self.connection.execute(
+            "SELECT 1 FROM customer_emails "
+            "WHERE provider = ? AND email = ? AND customer_id = ?",
+            (provider, normalize_email(email), customer_id),
+        ).fetchone()
+
+        return row is not None
+
+    def add(
+        self,
+        provider: str,
+        email: str | None,
+        customer_id: str,
+        created: float,
+    ):
+        """
+        Record a customer's email.
+
+        Args:
+            provider: Provider name.
+            email: Customer's email address (ignored if empty).
+            customer_id: Provider customer ID.
+            created: Customer creation time (seconds since the epoch).
+        """
+        if not email:
+            return
+
+        self.connection.execute(
+            UPSERT,
+            (provider, normalize_email(email), customer_id, created),
+        )
+
+    def add_many(
+        self,
+        provider: str,
+        customers: list[tuple[str, str, float]],
+    ) -> None:
+        """
+        Record many customers in one transaction.
+
+        Args:
+            provider: Provider name.
+            customers: Email address, customer ID and creation time of
+                each customer.
+        """
+        connection = self.connection
+        connection.execute("BEGIN")
+        try:
+            connection.executemany(
+                UPSERT,
+                (
+                    (provider, normalize_email(email), customer_id, created)
+                    for email, customer_id, created in customers
+                    if email
+                ),
+            )
+        except BaseException:
+            # Leave the shared connection usable for the next write
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def remove(self, provider: str, customer_id: str) -> None:
+        """
+        Remove a deleted customer from the index.
+
+        Args:
+            provider: Provider name.
+            customer_id: Provider customer ID.
+        """
+        self.connection.execute(
+            "DELETE FROM customer_emails "
+            "WHERE provider = ? AND customer_id = ?",
+            (provider, customer_id),
+        )
+
+
+async def backfill_stripe(index: CustomerIndex, page_size: int = 100) -> int:
+    """
+    Warm the index with every existing Stripe customer.
+
+    Re-running the backfill is harmless: customers already indexed are
+    left as they are.
+
+    Args:
+        index: Index to populate.
+        page_size: Customers fetched per API call (max 100).
+
+    Returns:
+        Number of customers read.
+    """
+    from backend.services.stripe_service import async_stripe_service
+
+    total = 0
+    starting_after = None
+
+    while True:
+        page = await async_stripe_service.list_customers(
+            limit=page_size,
+            starting_after=starting_after,
+        )
+        index.add_many(
+            "stripe",
+            [
+                (customer.email, customer.id, customer.created)
+                for customer in page.data
+            ],
+        )
+
+        total += len(page.data)
+        logger.info("Indexed %d Stripe customers", total)
+
+        if not page.has_more or not page.data:
+            break
+        starting_after = page.data[-1].id
+
+    await async_stripe_service.close()
+
+    return total
+
+
+customer_index = CustomerIndex(database_path("customers.sqlite3"))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    count = asyncio.run(backfill_stripe(customer_index))
+    logger.info("Backfill complete: %d customers", count)
@@ -0,0 +1,92 @@
+"""
+Request deadline module.
+Per-request time budgets propagated to provider calls via a ContextVar.
+"""
+import asyncio
+import time
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+from fastapi import HTTPException
+
+
+# Absolute deadline (time.monotonic()) of the current request, if any
+deadline_var: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceededError(HTTPException):
+    """A provider call did not finish within the request deadline (504)."""
+
+    def __init__(self, operation: str):
+        super().__init__(
+            status_code=504,
+            detail=f"{operation} did not finish within the request deadline",
+        )
+        self.operation = operation
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[float]:
+    """
+    Set the deadline of the enclosed code.
+
+    A deadline can only be tightened: nested calls keep the earlier of
+    their own and the enclosing one.
+
+    Args:
+        seconds: Time budget from now.
+
+    Yields:
+        The effective absolute deadline.
+    """
+    at = time.monotonic() + seconds
+    current = deadline_var.get()
+    if current is not None:
+        at = min(at, current)
+
+    token = deadline_var.set(at)
+    try:
+        yield at
+    finally:
+        deadline_var.reset(token)
+
+
+def remaining() -> float | None:
+    """
+    Get the time left before the current deadline.
+
+    Returns:
+        Seconds left (0 or less once passed), or None without a deadline.
+    """
+    at = deadline_var.get()
+    return None if at is None else at - time.monotonic()
+
+
+@asynccontextmanager
+async def enforce(operation: str) -> AsyncIterator[None]:
+    """
+    Cancel the enclosed awaits when the current deadline passes.
+
+    Args:
+        operation: Name used in the error.
+
+    Raises:
+        DeadlineExceededError: If the deadline passes before or while the
+            block runs.
+    """
+    left = remaining()
+    if left is None:
+        yield
+        return
+    if left <= 0:
+        raise DeadlineExceededError(operation)
+
+    timeout = asyncio.timeout(left)
+    try:
+        async with timeout:
+            yield
+    except TimeoutError as e:
+        if not timeout.expired():
+            raise
+        raise DeadlineExceededError(operation) from e
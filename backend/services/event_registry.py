@@ -0,0 +1,184 @@
+"""
+Webhook event registry module.
+Dispatches webhook events to the handlers registered for their type.
+"""
+import asyncio
+import inspect
+import logging
+import time
+from collections.abc import Awaitable, Callable
+
+from backend.config import settings
+from backend.services.event_views import WebhookEvent
+
+
+logger = logging.getLogger(__name__)
+
+EventHandler = Callable[[WebhookEvent], Awaitable[None] | None]
+
+
+class EventRegistry:
+    """
+    Registry of webhook event handlers keyed by provider and event type.
+
+    Handlers are registered with the ``on`` decorator; an event type may
+    have any number of them. On dispatch all handlers for the event run
+    concurrently, each under its own timeout: async handlers on the event
+    loop, sync handlers in worker threads, so a slow SQLite write or log
+    sink does not stall the loop. If any handler fails the first error is
+    raised after the rest have finished, so the webhook queue retries the
+    event; handlers must therefore be safe to run more than once. A sync
+    handler that times out cannot be interrupted and finishes in its
+    thread, possibly alongside the retry.
+    """
+
+    def __init__(self, handler_timeout: float = 10.0):
+        """Initialize an empty registry."""
+        self.handler_timeout = handler_timeout
+        self._handlers: dict[tuple[str, str], list[EventHandler]] = {}
+        self._stats: dict[str, dict] = {}
+
+        self.unhandled = 0
+
+    def on(
+        self, provider: str, *event_types: str
+    ) -> Callable[[EventHandler], EventHandler]:
+        """
+        Register the decorated function as a handler for event types.
+
+        Args:
+            provider: Provider name ("stripe" or "paddle").
+            *event_types: Event types the handler subscribes to.
+
+        Returns:
+            Decorator returning the handler unchanged.
+        """
+
+        def register(handler: EventHandler) -> EventHandler:
+            for event_type in event_types:
+                handlers = self._handlers.setdefault(
+                    (provider, event_type), []
+                )
+                if handler not in handlers:
+                    handlers.append(handler)
+            self._stats.setdefault(
+                _handler_name(handler),
+                {
+                    "calls": 0,
+                    "errors": 0,
+                    "timeouts": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                },
+            )
+            return handler
+
+        return register
+
+    def handlers(self, provider: str, event_type: str) -> list[EventHandler]:
+        """Get the handlers registered for an event type."""
+        return list(self._handlers.get((provider, event_type), ()))
+
+    async def dispatch(self, event: WebhookEvent) -> None:
+        """
+        Run every handler registered for the event.
+
+        Args:
+            event: Parsed webhook event.
+
+        Raises:
+            Exception: The first handler error or timeout, if any.
+        """
+        handlers = self._handlers.get((event.provider, event.type))
+        if not handlers:
+            self.unhandled += 1
+            logger.info(
+                "Unhandled %s webhook event type: %s",
+                event.provider,
+                event.type,
+            )
+            return
+
+        logger.info(
+            "Dispatching %s webhook event %s to %d handler(s)",
+            event.provider,
+            event.type,
+            len(handlers),
+        )
+
+        results = await asyncio.gather(
+            *(self._run(handler, event) for handler in handlers),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    def stats(self) -> dict:
+        """
+        Get per-handler statistics.
+
+        Returns:
+            Dict with call, error and timeout counts and latency (ms) per
+            handler, plus the number of events nobody handled.
+        """
+        handlers = {}
+        for name, stats in self._stats.items():
+            calls = stats["calls"]
+            handlers[name] = {
+                "calls": calls,
+                "errors": stats["errors"],
+                "timeouts": stats["timeouts"],
+                "mean_ms": round(stats["total_ms"] / calls, 3)
+                if calls
+                else 0.0,
+                "max_ms": round(stats["max_ms"], 3),
+            }
+
+        return {"unhandled": self.unhandled, "handlers": handlers}
+
+    async def _run(self, handler: EventHandler, event: WebhookEvent) -> None:
+        """Run one handler, recording its latency and outcome."""
+        stats = self._stats[_handler_name(handler)]
+        started = time.perf_counter()
+
+        try:
+            if inspect.iscoroutinefunction(handler):
+                call = handler(event)
+            else:
+                call = asyncio.to_thread(handler, event)
+            await asyncio.wait_for(call, self.handler_timeout)
+        except asyncio.TimeoutError:
+            stats["timeouts"] += 1
+            logger.error(
+                "Webhook handler %s timed out after %.1fs on %s",
+                _handler_name(handler),
+                self.handler_timeout,
+                event.id,
+            )
+            raise
+        except Exception as e:
+            stats["errors"] += 1
+            logger.error(
+                "Webhook handler %s failed on %s: %s",
+                _handler_name(handler),
+                event.id,
+                str(e),
+            )
+            raise
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            stats["calls"] += 1
+            stats["total_ms"] += elapsed
+            stats["max_ms"] = max(stats["max_ms"], elapsed)
+
+
+def _handler_name(handler: EventHandler) -> str:
+    """Get a readable name such as "stripe_router.record_subscription"."""
+    module = handler.__module__.rsplit(".", 1)[-1]
+    return f"{module}.{handler.__qualname__}"
+
+
+event_registry = EventRegistry(
+    handler_timeout=settings.WEBHOOK_HANDLER_TIMEOUT
+)
@@ -0,0 +1,247 @@
+"""
+Webhook event views module.
+Lightweight read-only views over parsed Stripe and Paddle webhook payloads.
+"""
+import json
+from abc import ABC, abstractmethod
+from collections.abc import Iterator, Sequence
+from datetime import datetime
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    # orjson is an optional speed-up; fall back to the stdlib decoder
+    orjson = None
+
+
+def loads(payload: bytes | str) -> Any:
+    """Parse JSON with orjson when available, else the stdlib decoder."""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def _wrap(value: Any) -> Any:
+    """Wrap containers in views; return scalars unchanged."""
+    if isinstance(value, dict):
+        return ObjectView(value)
+    if isinstance(value, list):
+        return ListView(value)
+    return value
+
+
+class ObjectView:
+    """
+    Read-only view over a parsed JSON object.
+
+    Fields are available as attributes or items. Nested objects are
+    wrapped only when accessed, so handlers that read a few fields never
+    build an object graph for the rest of the payload.
+
+    The view is not a ``Mapping``, whose ``items``, ``keys`` and
+    ``values`` methods would shadow payload fields of those names (such
+    as a Stripe subscription's ``items``). Only ``get`` and ``to_dict``
+    are methods; fields with those names are reached as items.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: dict):
+        """Wrap a parsed JSON object."""
+        self._data = data
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return _wrap(self._data[name])
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __getitem__(self, key: str) -> Any:
+        return _wrap(self._data[key])
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"ObjectView({self._data.get('id', '...')!r})"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a field, or ``default`` if the object does not have it."""
+        if key in self._data:
+            return _wrap(self._data[key])
+        return default
+
+    def to_dict(self) -> dict:
+        """Return the underlying parsed object."""
+        return self._data
+
+
+class ListView(Sequence):
+    """Read-only view over a parsed JSON array, wrapping items on access."""
+
+    __slots__ = ("_items",)
+
+    def __init__(self, items: list):
+        """Wrap a parsed JSON array."""
+        self._items = items
+
+    def __getitem__(self, index: int) -> Any:
+        return _wrap(self._items[index])
+
+    def __iter__(self) -> Iterator[Any]:
+        return (_wrap(item) for item in self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def to_list(self) -> list:
+        """Return the underlying parsed array."""
+        return self._items
+
+
+class WebhookEvent(ObjectView, ABC):
+    """
+    Provider-neutral webhook event.
+
+    Exposes ``provider``, ``id``, ``type``, ``created`` (seconds since the
+    epoch), ``object`` (the resource the event is about) and
+    ``ordering_key`` (the customer or subscription whose events must be
+    applied in order); the raw payload fields remain available as items.
+    Provider subclasses must implement every property.
+    """
+
+    __slots__ = ()
+
+    provider = ""
+
+    @property
+    @abstractmethod
+    def id(self) -> str | None:
+        """Provider event ID."""
+
+    @property
+    @abstractmethod
+    def type(self) -> str:
+        """Event type, e.g. "customer.subscription.updated"."""
+
+    @property
+    @abstractmethod
+    def created(self) -> float:
+        """Time the event occurred, in seconds since the epoch."""
+
+    @property
+    @abstractmethod
+    def object(self) -> ObjectView:
+        """Resource the event is about."""
+
+    @property
+    @abstractmethod
+    def ordering_key(self) -> str | None:
+        """Customer, else subscription, else resource ID of the event."""
+
+
+class StripeEvent(WebhookEvent):
+    """View over a Stripe event payload."""
+
+    __slots__ = ()
+
+    provider = "stripe"
+
+    @property
+    def id(self) -> str | None:
+        return self._data.get("id")
+
+    @property
+    def type(self) -> str:
+        return self._data["type"]
+
+    @property
+    def created(self) -> float:
+        return float(self._data.get("created") or 0)
+
+    @property
+    def object(self) -> ObjectView:
+        return ObjectView(self._data["data"]["object"])
+
+    @property
+    def ordering_key(self) -> str | None:
+        resource = self._data["data"]["object"]
+        if resource.get("object") == "customer":
+            return resource.get("id")
+        return (
+            resource.get("customer")
+            or resource.get("subscription")
+            or resource.get("id")
+        )
+
+
+class PaddleEvent(WebhookEvent):
+    """View over a Paddle notification payload."""
+
+    __slots__ = ()
+
+    provider = "paddle"
+
+    @property
+    def id(self) -> str | None:
+        return self._data.get("event_id")
+
+    @property
+    def type(self) -> str:
+        return self._data.get("event_type", "unknown")
+
+    @property
+    def created(self) -> float:
+        occurred_at = self._data.get("occurred_at")
+        if not occurred_at:
+            return 0.0
+        return datetime.fromisoformat(occurred_at).timestamp()
+
+    @property
+    def object(self) -> ObjectView:
+        return ObjectView(self._data.get("data") or {})
+
+    @property
+    def ordering_key(self) -> str | None:
+        resource = self._data.get("data") or {}
+        if self.type.startswith("customer."):
+            return resource.get("id")
+        return (
+            resource.get("customer_id")
+            or resource.get("subscription_id")
+            or resource.get("id")
+        )
+
+
+EVENT_TYPES = {
+    "stripe": StripeEvent,
+    "paddle": PaddleEvent,
+}
+
+
+def parse_event(provider: str, payload: bytes) -> WebhookEvent:
+    """
+    Parse a webhook payload into a provider event view.
+
+    Args:
+        provider: Provider name ("stripe" or "paddle").
+        payload: Raw request body.
+
+    Returns:
+        Event view over the parsed payload.
+
+    Raises:
+        ValueError: If the payload is not a JSON object.
+    """
+    data = loads(payload)
+    if not isinstance(data, dict):
+        raise ValueError("Webhook payload is not a JSON object")
+
+    return EVENT_TYPES[provider](data)
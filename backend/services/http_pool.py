@@ -0,0 +1,181 @@
+"""
+HTTP connection pool module.
+Shared keep-alive httpx clients for the payment providers, warmed at startup.
+"""
+import asyncio
+import logging
+import time
+
+import httpx
+
+from backend.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class HttpPool:
+    """
+    Named ``httpx.AsyncClient`` instances sharing one pool configuration.
+
+    Each provider gets its own client (and so its own connection pool)
+    with the configured size, keep-alive expiry and timeout. ``warm``
+    opens connections ahead of the first real request, so it does not pay
+    for DNS, TCP and TLS setup.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 50,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 60.0,
+        timeout: float = 30.0,
+        warm_connections: int = 2,
+    ):
+        """
+        Initialize the pool; clients are created on first use.
+
+        Args:
+            max_connections: Connection limit per provider.
+            max_keepalive_connections: Idle connections kept per provider.
+            keepalive_expiry: Seconds an idle connection is kept open.
+            timeout: Request timeout in seconds.
+            warm_connections: Connections opened per provider by ``warm``.
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = timeout
+        self.warm_connections = warm_connections
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._warmups: dict[str, dict] = {}
+
+    def client(self, name: str, **kwargs) -> httpx.AsyncClient:
+        """
+        Get a provider's client, creating it on first use.
+
+        Args:
+            name: Provider name.
+            **kwargs: Extra ``httpx.AsyncClient`` arguments (base URL,
+                headers, HTTP/2, transport), used on creation only.
+
+        Returns:
+            The provider's shared client.
+        """
+        client = self._clients.get(name)
+        if client is None:
+            client = self._clients[name] = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                **kwargs,
+            )
+        return client
+
+    async def warm(
+        self,
+        name: str,
+        url: str,
+        connections: int | None = None,
+    ) -> dict:
+        """
+        Open connections to a provider with cheap concurrent requests.
+
+        Any response counts, including 401/404: only the connection
+        matters. Failures are logged and reported, never raised, so an
+        unreachable provider does not block startup.
+
+        Args:
+            name: Provider name; its client must exist.
+            url: URL to request (absolute, or relative to the base URL).
+            connections: Concurrent requests (default: warm_connections).
+
+        Returns:
+            Dict with the number of requests that connected, failed and
+            the time taken (ms).
+        """
+        client = self._clients[name]
+        connections = connections or self.warm_connections
+
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(client.get(url) for _ in range(connections)),
+            return_exceptions=True,
+        )
+        errors = [
+            result for result in results if isinstance(result, Exception)
+        ]
+
+        warmup = self._warmups[name] = {
+            "connected": len(results) - len(errors),
+            "failed": len(errors),
+            "ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+
+        if errors:
+            logger.warning(
+                "Warming %s connections failed: %r", name, errors[0]
+            )
+        else:
+            logger.info("Warmed %s connections: %s", name, warmup)
+
+        return warmup
+
+    async def close(self, name: str | None = None) -> None:
+        """
+        Close one provider's client, or all of them.
+
+        Args:
+            name: Provider name (default: all).
+        """
+        names = list(self._clients) if name is None else [name]
+        for item in names:
+            client = self._clients.pop(item, None)
+            if client is not None:
+                await client.aclose()
+
+    def stats(self) -> dict:
+        """
+        Get pool configuration and per-provider connection counts.
+
+        Returns:
+            Dict with limits and, per provider, open, idle and in-use
+            connections and the last warm-up result.
+        """
+        providers = {}
+        for name, client in self._clients.items():
+            connections = _connections(client)
+            idle = sum(
+                1 for connection in connections if connection.is_idle()
+            )
+            providers[name] = {
+                "connections": len(connections),
+                "idle": idle,
+                "in_use": len(connections) - idle,
+                "warmup": self._warmups.get(name),
+            }
+
+        return {
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": (
+                self.limits.max_keepalive_connections
+            ),
+            "keepalive_expiry": self.limits.keepalive_expiry,
+            "providers": providers,
+        }
+
+
+def _connections(client: httpx.AsyncClient) -> list:
+    """Open connections of a client's default transport, if it has a pool."""
+    pool = getattr(client._transport, "_pool", None)
+    return list(getattr(pool, "connections", ()))
+
+
+http_pool = HttpPool(
+    max_connections=settings.HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    timeout=settings.HTTP_TIMEOUT,
+    warm_connections=settings.HTTP_WARM_CONNECTIONS,
+)
@@ -0,0 +1,109 @@
+"""
+Idempotency module.
+Replays stored responses for repeated Idempotency-Key requests.
+"""
+import hashlib
+import logging
+from collections.abc import Awaitable, Callable
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from backend.config import settings
+from backend.services.cache import TTLCache
+from backend.services.singleflight import SingleFlight
+
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyStore:
+    """
+    Bounded, expiring store of responses keyed by Idempotency-Key.
+
+    A repeated key replays the stored response without calling the
+    provider. Concurrent requests with the same key wait for the first
+    one and share its outcome. Only successful responses are stored, so
+    a client may retry a failed request with the same key.
+    """
+
+    def __init__(self, max_keys: int = 10_000, ttl: float = 86_400.0):
+        """Initialize an empty store."""
+        self._responses = TTLCache(max_size=max_keys, default_ttl=ttl)
+        self._flights = SingleFlight()
+
+    async def run(
+        self,
+        scope: str,
+        key: str | None,
+        request: BaseModel | None,
+        handler: Callable[[], Awaitable[dict]],
+    ) -> dict:
+        """
+        Run a mutating handler at most once per idempotency key.
+
+        Args:
+            scope: Endpoint name, so keys are not shared across endpoints.
+            key: Idempotency-Key header value, or None to always run.
+            request: Request body; reusing a key with a different body is
+                rejected.
+            handler: Coroutine function producing the JSON response body.
+
+        Returns:
+            Response body, either fresh or replayed.
+
+        Raises:
+            HTTPException: 422 if the key was used with another body.
+        """
+        if not key:
+            return await handler()
+
+        fingerprint = hashlib.sha256(
+            request.model_dump_json().encode("utf-8") if request else b""
+        ).hexdigest()
+        cache_key = (scope, key)
+
+        stored = self._responses.get(cache_key)
+        if stored is None:
+            stored = await self._flights.do(
+                cache_key,
+                lambda: self._execute(cache_key, fingerprint, handler),
+            )
+        else:
+            logger.info("Replaying %s response for key %s", scope, key)
+
+        stored_fingerprint, content = stored
+        if stored_fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used with another request",
+            )
+
+        return content
+
+    def stats(self) -> dict:
+        """
+        Get store statistics.
+
+        Returns:
+            Dict with replay (hit) counts and stored key count.
+        """
+        return self._responses.stats()
+
+    async def _execute(
+        self,
+        cache_key: tuple[str, str],
+        fingerprint: str,
+        handler: Callable[[], Awaitable[dict]],
+    ) -> tuple[str, dict]:
+        """Run the handler and store its response."""
+        content = await handler()
+        stored = (fingerprint, content)
+        self._responses.set(cache_key, stored)
+        return stored
+
+
+idempotency_store = IdempotencyStore(
+    max_keys=settings.IDEMPOTENCY_MAX_KEYS,
+    ttl=settings.IDEMPOTENCY_TTL,
+)
@@ -0,0 +1,294 @@
+"""
+Load shedding module.
+Adaptive (AIMD) concurrency limits per route class, with bounded queues.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+
+from backend.config import settings
+
+
+# Reasons a request is shed
+SHED_QUEUE_FULL = "queue_full"
+SHED_TIMEOUT = "timeout"
+SHED_PRIORITY = "priority"
+
+# Smoothing of the recent and long-run latency averages
+RECENT_WEIGHT = 0.2
+LONG_RUN_WEIGHT = 0.01
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit adjusted by additive increase, multiplicative
+    decrease (AIMD).
+
+    Every completed request updates a recent and a long-run latency
+    average. While the recent average stays within ``tolerance`` times the
+    long-run one and requests succeed, the limit grows by about one per
+    ``limit`` completions (only while it is actually used). When latency
+    rises or a request fails, the limit is multiplied by ``backoff``, at
+    most once per recent latency so a single slow burst is not punished
+    repeatedly.
+
+    Requests over the limit wait in a FIFO queue of ``queue_size`` for up
+    to ``queue_timeout`` seconds; beyond that they are shed.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int = 20,
+        min_limit: int = 2,
+        max_limit: int = 200,
+        queue_size: int = 50,
+        queue_timeout: float = 2.0,
+        tolerance: float = 2.0,
+        backoff: float = 0.9,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            name: Route class name.
+            initial_limit: Starting concurrency limit.
+            min_limit: Lowest limit; also what a request may use while
+                higher-priority classes are queueing.
+            max_limit: Highest limit.
+            queue_size: Requests allowed to wait for a slot.
+            queue_timeout: Seconds a request waits before it is shed.
+            tolerance: Recent / long-run latency ratio treated as
+                overload.
+            backoff: Factor applied to the limit on overload.
+        """
+        self.name = name
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.tolerance = tolerance
+        self.backoff = backoff
+
+        self.in_flight = 0
+        self.recent_latency: float | None = None
+        self.long_run_latency: float | None = None
+        self._last_decrease = 0.0
+        self._waiters: deque[asyncio.Future] = deque()
+
+        self.admitted = 0
+        self.shed = dict.fromkeys(
+            (SHED_QUEUE_FULL, SHED_TIMEOUT, SHED_PRIORITY), 0
+        )
+
+    @property
+    def queued(self) -> int:
+        """Requests waiting for a slot."""
+        return len(self._waiters)
+
+    async def acquire(self, constrained: bool = False) -> str | None:
+        """
+        Wait for a slot.
+
+        Args:
+            constrained: A higher-priority class is queueing: admit only
+                below ``min_limit`` and never queue.
+
+        Returns:
+            None once a slot is held (call ``release`` afterwards), or the
+            reason the request was shed.
+        """
+        limit = self.min_limit if constrained else int(self.limit)
+        if self.in_flight < limit and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return None
+
+        if constrained:
+            return self._reject(SHED_PRIORITY)
+        if len(self._waiters) >= self.queue_size:
+            return self._reject(SHED_QUEUE_FULL)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as the timeout fired
+                self.admitted += 1
+                return None
+            self._remove(waiter)
+            return self._reject(SHED_TIMEOUT)
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Hand the slot granted to this request to the next one
+                self.in_flight -= 1
+                self._grant()
+            else:
+                self._remove(waiter)
+            raise
+
+        self.admitted += 1
+        return None
+
+    def release(self, latency: float, failed: bool = False) -> None:
+        """
+        Free a slot and adapt the limit to the request's outcome.
+
+        Args:
+            latency: Seconds the request took once admitted.
+            failed: The request failed (server error).
+        """
+        used = self.in_flight
+        self.in_flight -= 1
+
+        if self.recent_latency is None:
+            self.recent_latency = self.long_run_latency = latency
+        else:
+            self.recent_latency += (
+                (latency - self.recent_latency) * RECENT_WEIGHT
+            )
+            self.long_run_latency += (
+                (latency - self.long_run_latency) * LONG_RUN_WEIGHT
+            )
+
+        overloaded = failed or (
+            self.recent_latency > self.long_run_latency * self.tolerance
+        )
+        now = time.monotonic()
+        if overloaded:
+            if now - self._last_decrease >= self.recent_latency:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+        elif used * 2 >= self.limit:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+        self._grant()
+
+    def retry_after(self) -> int:
+        """Seconds a shed client should wait: time to drain the queue."""
+        latency = self.long_run_latency or 1.0
+        drain = latency * (len(self._waiters) + 1) / max(self.limit, 1)
+        return max(1, math.ceil(drain))
+
+    def stats(self) -> dict:
+        """
+        Get limit, usage and shedding counters.
+
+        Returns:
+            Dict with the current limit, in-flight and queued requests,
+            latency averages (ms) and admitted/shed counts.
+        """
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "recent_latency_ms": _ms(self.recent_latency),
+            "long_run_latency_ms": _ms(self.long_run_latency),
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+        }
+
+    def _grant(self) -> None:
+        """Hand free slots to queued requests, oldest first."""
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def _remove(self, waiter: asyncio.Future) -> None:
+        """Drop a waiter that gave up."""
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _reject(self, reason: str) -> str:
+        """Count a shed request."""
+        self.shed[reason] += 1
+        return reason
+
+
+class LoadShedder:
+    """
+    Adaptive limiters for route classes, in priority order.
+
+    While a class has queued requests, every lower-priority class is
+    constrained to its minimum limit and does not queue, so under
+    overload capacity goes to the higher-priority class first.
+    """
+
+    def __init__(self, limiters: list[AdaptiveLimiter], enabled: bool = True):
+        """
+        Initialize the shedder.
+
+        Args:
+            limiters: One limiter per route class, highest priority first.
+            enabled: Whether requests are limited at all.
+        """
+        self.limiters = {limiter.name: limiter for limiter in limiters}
+        self.enabled = enabled
+
+    async def acquire(self, limiter: AdaptiveLimiter) -> str | None:
+        """
+        Wait for a slot in a route class, respecting priorities.
+
+        Args:
+            limiter: The route class's limiter.
+
+        Returns:
+            None once a slot is held, or the reason the request was shed.
+        """
+        constrained = False
+        for other in self.limiters.values():
+            if other is limiter:
+                break
+            if other.queued:
+                constrained = True
+                break
+        return await limiter.acquire(constrained)
+
+    def stats(self) -> dict:
+        """
+        Get per-class limiter statistics.
+
+        Returns:
+            Dict of route class to limiter stats, and whether shedding is
+            enabled.
+        """
+        return {
+            "enabled": self.enabled,
+            "classes": {
+                name: limiter.stats()
+                for name, limiter in self.limiters.items()
+            },
+        }
+
+
+def _ms(seconds: float | None) -> float | None:
+    """Seconds to rounded milliseconds."""
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+# Webhooks first: providers retry them, but a backlog delays fulfilment;
+# then account reads; anonymous checkout creation is shed first
+load_shedder = LoadShedder(
+    [
+        AdaptiveLimiter(
+            name,
+            initial_limit=settings.CONCURRENCY_LIMIT_INITIAL,
+            min_limit=settings.CONCURRENCY_LIMIT_MIN,
+            max_limit=settings.CONCURRENCY_LIMIT_MAX,
+            queue_size=settings.CONCURRENCY_QUEUE_SIZE,
+            queue_timeout=settings.CONCURRENCY_QUEUE_TIMEOUT,
+            tolerance=settings.CONCURRENCY_LATENCY_TOLERANCE,
+        )
+        for name in ("webhook", "account", "checkout")
+    ],
+    enabled=settings.LOAD_SHEDDING,
+)
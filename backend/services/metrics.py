@@ -0,0 +1,440 @@
+"""
+Metrics module.
+Prometheus-compatible counters, gauges and histograms for ``/metrics``.
+"""
+import functools
+import math
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from contextvars import ContextVar
+
+from backend.services.tracing import span
+
+
+# Prometheus client defaults, in seconds
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0,
+    7.5, 10.0,
+)
+LAG_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Provider operation (instrumented service method) being run, so the HTTP
+# layer below it can attribute requests to it
+current_operation: ContextVar[str | None] = ContextVar(
+    "current_operation", default=None
+)
+
+
+class CounterChild:
+    """Counter for one label set."""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class GaugeChild:
+    """Gauge for one label set."""
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class HistogramChild:
+    """
+    Histogram for one label set.
+
+    Keeps per-bucket (not cumulative) counts, so an observation is one
+    bisect and two in-place additions; cumulative counts are computed
+    when rendering.
+    """
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Metric(ABC):
+    """
+    Metric family: one child per label set.
+
+    Children are created on first use and reused afterwards. Hot paths
+    should resolve their child once with ``labels()`` and keep it, so
+    recording needs no lookup. Recording takes no lock: metrics are only
+    updated from the event loop thread.
+    """
+
+    kind = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+    ):
+        """
+        Initialize the family.
+
+        Args:
+            name: Metric name.
+            documentation: HELP text.
+            labelnames: Label names, in the order ``labels()`` takes them.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], object] = {}
+
+    def labels(self, *values: str):
+        """Get the child for a label set, creating it if needed."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(
+                    f"{self.name} takes labels {self.labelnames}"
+                )
+            child = self._children[values] = self._new_child()
+        return child
+
+    @abstractmethod
+    def _new_child(self):
+        """Create the child recording one label set."""
+
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        """Yield (suffix, rendered labels, value) for every child."""
+        for values, child in self._children.items():
+            yield "", _labels(self.labelnames, values), child.value
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        for _, labels, value in super().samples():
+            yield "_total", labels, value
+
+
+class Gauge(Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def _new_child(self) -> GaugeChild:
+        return GaugeChild()
+
+
+class Histogram(Metric):
+    """Distribution of observations over fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        """
+        Initialize the family.
+
+        Args:
+            name: Metric name.
+            documentation: HELP text.
+            labelnames: Label names, in the order ``labels()`` takes them.
+            buckets: Sorted upper bounds, without ``+Inf``.
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.buckets)
+
+    def samples(self) -> Iterator[tuple[str, str, float]]:
+        bounds = (*self.buckets, math.inf)
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(bounds, child.counts):
+                cumulative += count
+                labels = _labels(
+                    (*self.labelnames, "le"), (*values, _format(bound))
+                )
+                yield "_bucket", labels, cumulative
+
+            labels = _labels(self.labelnames, values)
+            yield "_sum", labels, child.sum
+            yield "_count", labels, cumulative
+
+
+class Registry:
+    """Set of metric families rendered together."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """Add a metric family; names must be unique."""
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()):
+        """Create and register a Counter."""
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames=()):
+        """Create and register a Gauge."""
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames=(),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        """Create and register a Histogram."""
+        return self.register(
+            Histogram(name, documentation, labelnames, buckets)
+        )
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Returns:
+            Exposition text (version 0.0.4).
+        """
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                lines.append(
+                    f"{metric.name}{suffix}{labels} {_format(value)}"
+                )
+        lines.append("")
+        return "\n".join(lines)
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    """Render a label set as ``{name="value",...}``."""
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+def _format(value: float) -> str:
+    """Format a sample value or bucket bound."""
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return f"{value:.1f}"
+    return repr(value)
+
+
+registry = Registry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight",
+    "HTTP requests being handled.",
+).labels()
+
+provider_call_duration = registry.histogram(
+    "provider_call_duration_seconds",
+    "Latency of payment provider service methods.",
+    ("provider", "method"),
+)
+provider_calls_in_flight = registry.gauge(
+    "provider_calls_in_flight",
+    "Payment provider service calls in progress.",
+    ("provider", "method"),
+)
+provider_errors = registry.counter(
+    "provider_errors",
+    "Payment provider service calls that raised, by exception type.",
+    ("provider", "method", "error"),
+)
+
+provider_rate_limit_wait = registry.histogram(
+    "provider_rate_limit_wait_seconds",
+    "Time provider calls waited for a client-side rate limit token.",
+    ("provider", "endpoint_class"),
+)
+provider_throttled = registry.counter(
+    "provider_throttled",
+    "Provider responses with status 429 Too Many Requests.",
+    ("provider", "endpoint_class"),
+)
+circuit_breaker_state = registry.gauge(
+    "circuit_breaker_state",
+    "Circuit breaker state per provider operation "
+    "(0 closed, 1 half-open, 2 open).",
+    ("provider", "operation"),
+)
+circuit_breaker_transitions = registry.counter(
+    "circuit_breaker_transitions",
+    "Circuit breaker state changes, by the state entered.",
+    ("provider", "operation", "state"),
+)
+circuit_breaker_rejected = registry.counter(
+    "circuit_breaker_rejected",
+    "Provider calls failed fast by an open circuit breaker.",
+    ("provider", "operation"),
+)
+webhook_processing_duration = registry.histogram(
+    "webhook_processing_duration_seconds",
+    "Time spent running the handlers of a webhook event.",
+    ("provider", "event_type"),
+)
+webhook_lag = registry.histogram(
+    "webhook_lag_seconds",
+    "Time from receiving a webhook to starting to process it.",
+    ("provider",),
+    LAG_BUCKETS,
+)
+webhook_queue_depth = registry.gauge(
+    "webhook_queue_depth",
+    "Webhook events waiting or being processed (set when scraped).",
+).labels()
+webhook_queue_oldest = registry.gauge(
+    "webhook_queue_oldest_seconds",
+    "Age of the oldest unprocessed webhook event (set when scraped).",
+).labels()
+webhook_failures = registry.counter(
+    "webhook_failures",
+    "Webhook processing attempts that failed.",
+    ("provider", "event_type"),
+)
+concurrency_limit = registry.gauge(
+    "concurrency_limit",
+    "Adaptive concurrency limit per route class (set when scraped).",
+    ("route_class",),
+)
+concurrency_in_flight = registry.gauge(
+    "concurrency_in_flight",
+    "Admitted requests per route class (set when scraped).",
+    ("route_class",),
+)
+concurrency_queued = registry.gauge(
+    "concurrency_queued",
+    "Requests waiting for a slot per route class (set when scraped).",
+    ("route_class",),
+)
+requests_shed = registry.counter(
+    "requests_shed",
+    "Requests rejected with 503 by load shedding.",
+    ("route_class", "reason"),
+)
+checkout_redirect_duration = registry.histogram(
+    "checkout_redirect_duration_seconds",
+    "Time to get the Checkout Session behind /api/stripe/checkout.",
+    ("source",),
+)
+checkout_routed = registry.counter(
+    "checkout_routed",
+    "Checkouts created per provider and routing decision.",
+    ("provider", "reason"),
+)
+checkout_failovers = registry.counter(
+    "checkout_failovers",
+    "Checkout attempts that failed and moved on to another provider.",
+    ("provider",),
+)
+
+
+def instrument(provider: str) -> Callable:
+    """
+    Decorate an async provider service method with metrics and a span.
+
+    Records the call's latency, in-flight count and raised exceptions
+    under the method's name, and traces it as a child span of the
+    current request. The method's name is also the ``current_operation``
+    while it runs. Label children are resolved at decoration time, so a
+    successful call only does arithmetic on them.
+
+    Args:
+        provider: Provider label ("stripe" or "paddle").
+
+    Returns:
+        Decorator for ``async def`` methods.
+    """
+
+    def decorate(func: Callable) -> Callable:
+        method = func.__name__
+        name = func.__qualname__
+        duration = provider_call_duration.labels(provider, method)
+        in_flight = provider_calls_in_flight.labels(provider, method)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            in_flight.inc()
+            token = current_operation.set(method)
+            started = time.perf_counter()
+            try:
+                with span(name):
+                    return await func(*args, **kwargs)
+            except Exception as e:
+                provider_errors.labels(
+                    provider, method, type(e).__name__
+                ).inc()
+                raise
+            finally:
+                current_operation.reset(token)
+                in_flight.dec()
+                duration.observe(time.perf_counter() - started)
+
+        return wrapper
+
+    return decorate
@@ -0,0 +1,187 @@
+"""
+Pre-created object pool module.
+Provider objects (e.g. checkout sessions) created ahead of demand.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+
+logger = logging.getLogger(__name__)
+
+# Creates one object; returns it with its expiry (Unix time)
+Factory = Callable[[], Awaitable[tuple[Any, float]]]
+
+
+class PrecreatedPool:
+    """
+    FIFO pool of pre-created objects, refilled in the background.
+
+    ``take`` is O(1): it pops the oldest object, skipping any that expire
+    within ``min_remaining`` seconds (all objects have similar lifetimes,
+    so the oldest is also the closest to expiry). When the pool drops
+    below ``low_watermark`` a background task refills it to ``size``,
+    ``concurrency`` creations at a time, backing off while creation
+    fails. Callers fall back to creating on demand when ``take`` returns
+    None.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        create: Factory,
+        size: int = 10,
+        low_watermark: int | None = None,
+        min_remaining: float = 3600.0,
+        concurrency: int = 2,
+        retry_max_delay: float = 60.0,
+    ):
+        """
+        Initialize an empty pool.
+
+        Args:
+            name: Name used in logs.
+            create: Coroutine function creating one object.
+            size: Objects kept ready.
+            low_watermark: Refill when fewer remain (default: half).
+            min_remaining: Seconds of validity an object must have left.
+            concurrency: Objects created in parallel while refilling.
+            retry_max_delay: Upper bound of the backoff after failures.
+        """
+        self.name = name
+        self.create = create
+        self.size = size
+        self.low_watermark = (
+            size // 2 if low_watermark is None else low_watermark
+        )
+        self.min_remaining = min_remaining
+        self.concurrency = concurrency
+        self.retry_max_delay = retry_max_delay
+        self._items: deque[tuple[float, Any]] = deque()
+        self._refill_needed = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+        self.hits = 0
+        self.misses = 0
+        self.created = 0
+        self.expired = 0
+        self.errors = 0
+
+    def take(self) -> Any | None:
+        """
+        Take the oldest valid object.
+
+        Returns:
+            An object, or None if the pool is empty.
+        """
+        cutoff = time.time() + self.min_remaining
+        while self._items:
+            expires_at, item = self._items.popleft()
+            if expires_at > cutoff:
+                self.hits += 1
+                self._check_level()
+                return item
+            self.expired += 1
+
+        self.misses += 1
+        self._check_level()
+        return None
+
+    def start(self) -> None:
+        """Start the background refill task and fill the pool."""
+        if self._task is None and self.size > 0:
+            self._task = asyncio.create_task(self._refill())
+            self._refill_needed.set()
+
+    async def stop(self) -> None:
+        """Stop refilling; pooled objects are left to expire."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        """
+        Get pool level and counters.
+
+        Returns:
+            Dict with available objects, size, hit rate and counters.
+        """
+        takes = self.hits + self.misses
+        return {
+            "available": len(self._items),
+            "size": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / takes, 4) if takes else 0.0,
+            "created": self.created,
+            "expired": self.expired,
+            "errors": self.errors,
+        }
+
+    def _check_level(self) -> None:
+        """Wake the refill task if the pool is running low."""
+        if len(self._items) < self.low_watermark:
+            self._refill_needed.set()
+
+    async def _refill(self) -> None:
+        """Top the pool up whenever it runs low or objects near expiry."""
+        failures = 0
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._refill_needed.wait(), self.min_remaining / 4
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._refill_needed.clear()
+            self._drop_expiring()
+
+            while len(self._items) < self.size:
+                batch = min(self.concurrency, self.size - len(self._items))
+                results = await asyncio.gather(
+                    *(self.create() for _ in range(batch)),
+                    return_exceptions=True,
+                )
+                errors = [
+                    result for result in results
+                    if isinstance(result, BaseException)
+                ]
+                created = sorted(
+                    (
+                        result for result in results
+                        if not isinstance(result, BaseException)
+                    ),
+                    key=lambda result: result[1],
+                )
+                for item, expires_at in created:
+                    self._items.append((expires_at, item))
+                self.created += len(created)
+
+                if not errors:
+                    failures = 0
+                    continue
+
+                self.errors += len(errors)
+                failures += 1
+                delay = min(2**failures, self.retry_max_delay)
+                logger.warning(
+                    "Refilling %s pool failed, retrying in %.0fs: %r",
+                    self.name,
+                    delay,
+                    errors[0],
+                )
+                await asyncio.sleep(delay)
+
+    def _drop_expiring(self) -> None:
+        """Discard objects too close to expiry to hand out."""
+        cutoff = time.time() + self.min_remaining
+        while self._items and self._items[0][0] <= cutoff:
+            self._items.popleft()
+            self.expired += 1
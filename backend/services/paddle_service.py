@@ -5,43 +5,297 @@ Handles all Paddle-related operations for subscriptions.
 import hashlib
 import hmac
 import logging
+import time
+from collections.abc import Mapping
+from datetime import datetime
 
-from paddle_billing import Client, Environment, Options
+import httpx
 
 from backend.config import settings
+from backend.services.cache import CacheBackend, provider_cache, read_through
+from backend.services.http_pool import HttpPool, http_pool
+from backend.services.circuit_breaker import (
+    CircuitBreakers,
+    circuit_breakers,
+)
+from backend.services.deadline import enforce
+from backend.services.event_views import ObjectView
+from backend.services.metrics import current_operation, instrument
+from backend.services.rate_limit import ProviderRateLimiter
+from backend.services.singleflight import SingleFlight, provider_flights
+from backend.services.subscription_store import (
+    SubscriptionStore,
+    subscription_store,
+)
+from backend.services.tracing import KIND_CLIENT, span
+
 
 
 logger = logging.getLogger(__name__)
 
+PADDLE_API_URLS = {
+    "sandbox": "https://sandbox-api.paddle.com",
+    "production": "https://api.paddle.com",
+}
+
+
+FINAL_STATUSES = frozenset({"canceled", "completed"})
+
+
+class PaddleAPIError(Exception):
+    """Error response returned by the Paddle REST API."""
+
+    def __init__(self, status_code: int, code: str, detail: str):
+        super().__init__(f"{code}: {detail}" if code else detail)
+        self.status_code = status_code
+        self.code = code
+        self.detail = detail
+
+
+class PaddleSignatureError(ValueError):
+    """Paddle-Signature header is malformed, stale or does not match."""
+
+
+class PaddleWebhookVerifier:
+    """
+    Verifier for the Paddle-Signature webhook header.
+
+    Paddle signs ``<ts>:<raw body>`` with HMAC-SHA256; the header has the
+    form ``ts=<timestamp>;h1=<signature>`` and may carry several ``h1``
+    values while a secret is being rotated. The header is parsed once and
+    the body is hashed as bytes, without decoding or copying it. HMAC
+    objects are keyed once per secret and copied for each request.
+    """
+
+    def __init__(self, secrets: list[str], tolerance: int = 300):
+        """
+        Initialize the verifier.
+
+        Args:
+            secrets: Active webhook secrets (several during rotation).
+            tolerance: Maximum age of the signature timestamp in seconds.
+        """
+        self.tolerance = tolerance
+        self._keyed = [
+            hmac.new(secret.encode("utf-8"), digestmod=hashlib.sha256)
+            for secret in secrets
+            if secret
+        ]
+
+    def verify(
+        self,
+        payload: bytes | memoryview,
+        signature_header: str,
+        now: float | None = None,
+    ) -> None:
+        """
+        Verify a webhook payload against its Paddle-Signature header.
+
+        Args:
+            payload: Raw request body.
+            signature_header: Paddle-Signature header value.
+            now: Current time (defaults to ``time.time()``).
+
+        Raises:
+            PaddleSignatureError: If the header is malformed, the timestamp
+                is outside the tolerance or no signature matches.
+        """
+        timestamp = None
+        signatures = []
+
+        for part in signature_header.split(";"):
+            name, _, value = part.partition("=")
+            if name == "ts":
+                timestamp = value
+            elif name == "h1":
+                signatures.append(value)
+
+        if not timestamp or not signatures:
+            raise PaddleSignatureError("Invalid signature format")
+
+        try:
+            signed_at = int(timestamp)
+        except ValueError as e:
+            raise PaddleSignatureError("Invalid signature timestamp") from e
+
+        now = time.time() if now is None else now
+        if abs(now - signed_at) > self.tolerance:
+            raise PaddleSignatureError("Signature timestamp outside tolerance")
+
+        prefix = timestamp.encode("ascii") + b":"
+        for keyed in self._keyed:
+            mac = keyed.copy()
+            mac.update(prefix)
+            mac.update(payload)
+            expected = mac.hexdigest()
+
+            for signature in signatures:
+                if hmac.compare_digest(expected, signature):
+                    return
+
+        raise PaddleSignatureError("No matching signature")
+
+
+class AsyncPaddleService:
+    """
+    Async Paddle Billing service.
 
-class PaddleService:
-    """Service class for Paddle Billing operations."""
+    Talks to the Paddle REST API directly through the HTTP pool's
+    ``paddle`` client (HTTP/2, keep-alive, bounded pool) and returns
+    plain dicts.
+    """
 
-    def __init__(self):
-        """Initialize Paddle client."""
+    # Operation whose circuit breaker gates provider-neutral checkouts
+    checkout_operation = "create_transaction"
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport | None = None,
+        cache: CacheBackend | None = None,
+        flights: SingleFlight | None = None,
+        pool: HttpPool | None = None,
+        rate_limiter: ProviderRateLimiter | None = None,
+        breakers: CircuitBreakers | None = None,
+        store: SubscriptionStore | None = None,
+    ):
+        """
+        Initialize the service; the HTTP client is built lazily.
+
+        With ``rate_limiter``, every API request goes through it; with
+        ``breakers``, requests fail fast while their operation's breaker
+        is open; with ``store``, subscriptions changed through the API
+        are written to the local store without waiting for the webhook.
+        """
+        self._transport = transport
         self._client = None
+        self.cache = cache
+        self.flights = flights or SingleFlight()
+        self.pool = pool or HttpPool()
+        self.rate_limiter = rate_limiter
+        self.breakers = breakers
+        self.store = store
 
     @property
-    def client(self) -> Client:
-        """Lazy initialization of Paddle client."""
+    def client(self) -> httpx.AsyncClient:
+        """Lazy initialization of the pooled HTTP client."""
         if self._client is None:
             if not settings.PADDLE_API_KEY:
                 raise ValueError("PADDLE_API_KEY is not configured")
 
             environment = (
-                Environment.SANDBOX
+                "sandbox"
                 if settings.PADDLE_ENVIRONMENT == "sandbox"
-                else Environment.PRODUCTION
+                else "production"
             )
 
-            self._client = Client(
-                settings.PADDLE_API_KEY,
-                options=Options(environment),
+            self._client = self.pool.client(
+                "paddle",
+                base_url=PADDLE_API_URLS[environment],
+                headers={
+                    "Authorization": f"Bearer {settings.PADDLE_API_KEY}",
+                    "Content-Type": "application/json",
+                },
+                http2=True,
+                transport=self._transport,
             )
 
         return self._client
 
-    def create_customer(self, email: str, name: str | None = None) -> dict:
+    async def warm_up(self) -> dict | None:
+        """
+        Open connections to the Paddle API ahead of the first request.
+
+        Returns:
+            Warm-up result, or None if Paddle is not configured.
+        """
+        if not settings.PADDLE_API_KEY:
+            return None
+
+        self.client  # creates the pool's paddle client
+        return await self.pool.warm("paddle", "/")
+
+    async def close(self) -> None:
+        """Close the pooled HTTP client."""
+        if self._client is not None:
+            await self.pool.close("paddle")
+            self._client = None
+
+    def stats(self) -> dict:
+        """
+        Get service statistics.
+
+        Returns:
+            Dict with whether the HTTP client is open and rate limit
+            statistics.
+        """
+        return {
+            "client_open": self._client is not None,
+            "rate_limit": (
+                self.rate_limiter.stats() if self.rate_limiter else None
+            ),
+        }
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        json: dict | None = None,
+    ) -> dict:
+        """
+        Send a request to the Paddle API and return its ``data`` member.
+
+        Raises:
+            PaddleAPIError: If Paddle responds with an error status.
+            ProviderRateLimitError: If Paddle keeps rate limiting.
+            CircuitOpenError: If the operation's breaker is open.
+            DeadlineExceededError: If the request deadline passes.
+        """
+        operation = current_operation.get() or "other"
+
+        async def send() -> httpx.Response:
+            with span(
+                "paddle.http",
+                KIND_CLIENT,
+                **{"http.request.method": method, "url.path": path},
+            ):
+                return await self.client.request(method, path, json=json)
+
+        async def attempt() -> httpx.Response:
+            if self.breakers is None:
+                return await send()
+            return await self.breakers.get("paddle", operation).call(
+                send, failed=lambda response: response.is_server_error
+            )
+
+        async with enforce(f"paddle {operation}"):
+            if self.rate_limiter is None:
+                response = await attempt()
+            else:
+                response = await self.rate_limiter.send(
+                    method,
+                    attempt,
+                    lambda response: (response.status_code, response.headers),
+                )
+
+        if response.is_error:
+            try:
+                error = response.json().get("error", {})
+            except ValueError:
+                error = {}
+            raise PaddleAPIError(
+                response.status_code,
+                error.get("code", ""),
+                error.get("detail", response.reason_phrase),
+            )
+
+        return response.json()["data"]
+
+    @instrument("paddle")
+    async def create_customer(
+        self,
+        email: str,
+        name: str | None = None,
+    ) -> dict:
         """
         Create a Paddle customer.
 
@@ -58,17 +312,18 @@ class PaddleService:
         if name:
             customer_data["name"] = name
 
-        customer = self.client.customers.create(**customer_data)
+        customer = await self._request("POST", "/customers", customer_data)
 
-        logger.info("Paddle customer created: %s", customer.id)
+        logger.info("Paddle customer created: %s", customer["id"])
 
         return {
-            "id": customer.id,
-            "email": customer.email,
-            "name": getattr(customer, "name", None),
+            "id": customer["id"],
+            "email": customer.get("email"),
+            "name": customer.get("name"),
         }
 
-    def create_transaction(
+    @instrument("paddle")
+    async def create_transaction(
         self,
         price_id: str | None = None,
         customer_id: str | None = None,
@@ -96,7 +351,6 @@ class PaddleService:
             customer_id or customer_email,
         )
 
-        # Build transaction data
         transaction_data = {
             "items": [
                 {
@@ -106,80 +360,118 @@ class PaddleService:
             ],
         }
 
-        # Add customer info if provided
         if customer_id:
             transaction_data["customer_id"] = customer_id
         elif customer_email:
             transaction_data["customer"] = {"email": customer_email}
 
-        transaction = self.client.transactions.create(**transaction_data)
+        transaction = await self._request(
+            "POST", "/transactions", transaction_data
+        )
 
-        logger.info("Paddle transaction created: %s", transaction.id)
+        logger.info("Paddle transaction created: %s", transaction["id"])
 
         return {
-            "transaction_id": transaction.id,
-            "status": str(transaction.status),
-            "customer_id": getattr(transaction, "customer_id", None),
+            "transaction_id": transaction["id"],
+            "status": transaction.get("status"),
+            "customer_id": transaction.get("customer_id"),
         }
 
-    def get_transaction(self, transaction_id: str) -> dict:
+    async def create_checkout(
+        self,
+        customer_email: str | None = None,
+    ) -> dict:
+        """
+        Create a checkout for the provider-neutral checkout API.
+
+        Args:
+            customer_email: Customer email for a new customer (optional).
+
+        Returns:
+            Dict with transaction data for Paddle.js checkout.
+        """
+        return await self.create_transaction(customer_email=customer_email)
+
+    @staticmethod
+    def is_caller_error(error: Exception) -> bool:
+        """
+        Check whether a checkout error was caused by the request.
+
+        Args:
+            error: Error raised by ``create_checkout()``.
+
+        Returns:
+            True for Paddle 4xx responses (invalid customer or price data).
+        """
+        return isinstance(error, PaddleAPIError) and error.status_code < 500
+
+    @instrument("paddle")
+    async def get_transaction(self, transaction_id: str) -> dict:
         """
         Get transaction details.
 
+        Results are served from the provider cache when possible, and
+        concurrent lookups of the same transaction share one API call.
+
         Args:
             transaction_id: Paddle Transaction ID.
 
         Returns:
             Dict with transaction details.
         """
-        transaction = self.client.transactions.get(transaction_id)
 
-        return {
-            "id": transaction.id,
-            "status": str(transaction.status),
-            "customer_id": getattr(transaction, "customer_id", None),
-            "subscription_id": getattr(transaction, "subscription_id", None),
-        }
+        async def load() -> dict:
+            transaction = await self._request(
+                "GET", f"/transactions/{transaction_id}"
+            )
+            return {
+                "id": transaction["id"],
+                "status": transaction.get("status"),
+                "customer_id": transaction.get("customer_id"),
+                "subscription_id": transaction.get("subscription_id"),
+            }
+
+        key = ("paddle", "transaction", transaction_id)
+
+        return await read_through(
+            self.cache,
+            key,
+            lambda: self.flights.do(key, load),
+            ttl=_object_ttl,
+        )
 
-    def get_subscription(self, subscription_id: str) -> dict:
+    @instrument("paddle")
+    async def get_subscription(self, subscription_id: str) -> dict:
         """
         Get subscription details.
 
+        Results are served from the provider cache when possible, and
+        concurrent lookups of the same subscription share one API call.
+
         Args:
             subscription_id: Paddle Subscription ID.
 
         Returns:
             Dict with subscription details.
         """
-        subscription = self.client.subscriptions.get(subscription_id)
 
-        billing_period = getattr(subscription, "current_billing_period", None)
+        async def load() -> dict:
+            subscription = await self._request(
+                "GET", f"/subscriptions/{subscription_id}"
+            )
+            return subscription_to_dict(subscription)
 
-        return {
-            "id": subscription.id,
-            "status": str(subscription.status),
-            "customer_id": getattr(subscription, "customer_id", None),
-            "current_billing_period": {
-                "starts_at": (
-                    billing_period.starts_at.isoformat()
-                    if billing_period and hasattr(billing_period, "starts_at")
-                    else None
-                ),
-                "ends_at": (
-                    billing_period.ends_at.isoformat()
-                    if billing_period and hasattr(billing_period, "ends_at")
-                    else None
-                ),
-            },
-            "next_billed_at": (
-                subscription.next_billed_at.isoformat()
-                if hasattr(subscription, "next_billed_at")
-                and subscription.next_billed_at
-                else None
-            ),
-        }
+        key = ("paddle", "subscription", subscription_id)
 
-    def cancel_subscription(
+        return await read_through(
+            self.cache,
+            key,
+            lambda: self.flights.do(key, load),
+            ttl=_object_ttl,
+        )
+
+    @instrument("paddle")
+    async def cancel_subscription(
         self,
         subscription_id: str,
         effective_from: str = "next_billing_period",
@@ -197,30 +489,41 @@ class PaddleService:
         """
         logger.info("Cancelling Paddle subscription: %s", subscription_id)
 
-        subscription = self.client.subscriptions.cancel(
-            subscription_id,
-            effective_from=effective_from,
+        subscription = await self._request(
+            "POST",
+            f"/subscriptions/{subscription_id}/cancel",
+            {"effective_from": effective_from},
         )
 
         logger.info(
             "Paddle subscription cancelled: %s, status: %s",
             subscription_id,
-            subscription.status,
+            subscription.get("status"),
         )
 
-        scheduled_change = getattr(subscription, "scheduled_change", None)
+        if self.store is not None and subscription.get("updated_at"):
+            # get_subscription reads the store first; versioned like the
+            # webhooks, so an older delivery cannot roll the cancel back
+            self.store.upsert(
+                "paddle",
+                "subscription",
+                subscription["id"],
+                subscription_to_dict(subscription),
+                datetime.fromisoformat(subscription["updated_at"]).timestamp(),
+            )
+        if self.cache is not None:
+            self.cache.invalidate(("paddle", "subscription", subscription_id))
+
+        scheduled_change = subscription.get("scheduled_change")
 
         return {
-            "id": subscription.id,
-            "status": str(subscription.status),
+            "id": subscription["id"],
+            "status": subscription.get("status"),
             "scheduled_change": (
                 {
-                    "action": str(scheduled_change.action),
-                    "effective_at": (
-                        scheduled_change.effective_at.isoformat()
-                        if hasattr(scheduled_change, "effective_at")
-                        and scheduled_change.effective_at
-                        else None
+                    "action": scheduled_change.get("action"),
+                    "effective_at": _isoformat(
+                        scheduled_change.get("effective_at")
                     ),
                 }
                 if scheduled_change
@@ -228,76 +531,66 @@ class PaddleService:
             ),
         }
 
-    @staticmethod
-    def verify_webhook_signature(
-        payload: bytes,
-        signature: str,
-        timestamp: str,
-        secret: str | None = None,
-    ) -> bool:
-        """
-        Verify Paddle webhook signature.
-
-        Paddle uses HMAC-SHA256 to sign webhooks.
-        Signature format: ts=<timestamp>;h1=<signature>
-
-        Args:
-            payload: Raw request body bytes.
-            signature: Paddle-Signature header value.
-            timestamp: Timestamp from the signature header.
-            secret: Webhook secret (defaults to settings).
-
-        Returns:
-            True if signature is valid, False otherwise.
-        """
-        secret = secret or settings.PADDLE_WEBHOOK_SECRET
-
-        if not secret:
-            logger.warning(
-                "PADDLE_WEBHOOK_SECRET not configured, skipping verification"
-            )
-            return True
-
-        # Build the signed payload
-        signed_payload = f"{timestamp}:{payload.decode('utf-8')}"
-
-        # Compute expected signature
-        expected_signature = hmac.new(
-            secret.encode("utf-8"),
-            signed_payload.encode("utf-8"),
-            hashlib.sha256,
-        ).hexdigest()
-
-        # Extract h1 signature from header
-        # Format: ts=<timestamp>;h1=<signature>
-        try:
-            sig_parts = dict(
-                part.split("=", 1) for part in signature.split(";")
-            )
-            received_signature = sig_parts.get("h1", "")
-        except (ValueError, AttributeError):
-            logger.error("Invalid signature format")
-            return False
-
-        # Compare signatures
-        return hmac.compare_digest(expected_signature, received_signature)
-
-    @staticmethod
-    def parse_webhook_signature(signature_header: str) -> tuple[str, str]:
-        """
-        Parse Paddle-Signature header.
-
-        Args:
-            signature_header: The Paddle-Signature header value.
-
-        Returns:
-            Tuple of (timestamp, signature).
-        """
-        parts = dict(
-            part.split("=", 1) for part in signature_header.split(";")
-        )
-        return parts.get("ts", ""), parts.get("h1", "")
-
 
-# Singleton instance
-paddle_service = PaddleService()
+def _object_ttl(data: dict) -> float:
+    """Cache objects in a final state longer than live ones."""
+    if data.get("status") in FINAL_STATUSES:
+        return settings.PROVIDER_CACHE_FINAL_TTL
+    return settings.PROVIDER_CACHE_TTL
+
+
+def _isoformat(value: str | None) -> str | None:
+    """Normalize a Paddle RFC 3339 timestamp to ``datetime.isoformat``."""
+    if not value:
+        return None
+    return datetime.fromisoformat(value).isoformat()
+
+
+def subscription_to_dict(subscription: Mapping | ObjectView) -> dict:
+    """
+    Shape a raw Paddle subscription payload like get_subscription.
+
+    Args:
+        subscription: Subscription object from the API or a webhook.
+
+    Returns:
+        Dict with subscription details.
+    """
+    billing_period = subscription.get("current_billing_period") or {}
+
+    return {
+        "id": subscription["id"],
+        "status": subscription.get("status"),
+        "customer_id": subscription.get("customer_id"),
+        "current_billing_period": {
+            "starts_at": _isoformat(billing_period.get("starts_at")),
+            "ends_at": _isoformat(billing_period.get("ends_at")),
+        },
+        "next_billed_at": _isoformat(subscription.get("next_billed_at")),
+    }
+
+
+# Singleton instances
+paddle_webhook_verifier = PaddleWebhookVerifier(
+    [
+        secret.strip()
+        for secret in settings.PADDLE_WEBHOOK_SECRET.split(",")
+        if secret.strip()
+    ],
+    tolerance=settings.PADDLE_WEBHOOK_TOLERANCE,
+)
+async_paddle_service = AsyncPaddleService(
+    cache=provider_cache,
+    flights=provider_flights,
+    pool=http_pool,
+    rate_limiter=ProviderRateLimiter(
+        "paddle",
+        read_rate=settings.PADDLE_RATE_LIMIT_READ,
+        write_rate=settings.PADDLE_RATE_LIMIT_WRITE,
+        burst=settings.PADDLE_RATE_LIMIT_BURST,
+        max_retries=settings.RATE_LIMIT_MAX_RETRIES,
+        max_wait=settings.RATE_LIMIT_MAX_WAIT,
+    ),
+    breakers=circuit_breakers,
+    store=subscription_store,
+)
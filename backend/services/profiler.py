@@ -0,0 +1,223 @@
+"""
+Profiler module.
+On-demand stack sampling and tracemalloc snapshots of the running process.
+"""
+import logging
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from itertools import count
+
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another one runs."""
+
+
+class StackSampler:
+    """
+    Statistical profiler sampling the stacks of all threads.
+
+    The sampling thread reads ``sys._current_frames()`` at a fixed
+    interval, so the profiled code runs unmodified; the event loop shows
+    up as ``MainThread`` and thread pool work under its worker names.
+    Results are collapsed stacks (``thread;outer;...;inner count`` per
+    line), the input format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, max_seconds: float = 60.0):
+        """
+        Initialize the sampler.
+
+        Args:
+            max_seconds: Upper bound for a profile's duration.
+        """
+        self.max_seconds = max_seconds
+        self._running = threading.Lock()
+
+        self.profiles = 0
+
+    def sample(self, seconds: float, interval: float = 0.005) -> str:
+        """
+        Sample all threads for a while and collapse the stacks.
+
+        Blocks the calling thread for ``seconds``; call it from a worker
+        thread (e.g. ``asyncio.to_thread``), never from the event loop.
+
+        Args:
+            seconds: Profile duration (capped at ``max_seconds``).
+            interval: Seconds between samples.
+
+        Returns:
+            Collapsed stacks, most frequent first.
+
+        Raises:
+            ProfilerBusyError: If a profile is already running.
+        """
+        if not self._running.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+
+        try:
+            stacks = self._collect(min(seconds, self.max_seconds), interval)
+        finally:
+            self._running.release()
+
+        self.profiles += 1
+        return "".join(
+            f"{stack} {samples}\n" for stack, samples in stacks.most_common()
+        )
+
+    def _collect(self, seconds: float, interval: float) -> Counter:
+        """Count identical stacks seen at each sampling tick."""
+        stacks: Counter = Counter()
+        own_thread = threading.get_ident()
+        deadline = time.monotonic() + seconds
+
+        while time.monotonic() < deadline:
+            names = {
+                thread.ident: thread.name for thread in threading.enumerate()
+            }
+            for ident, frame in sys._current_frames().items():
+                if ident == own_thread:
+                    continue
+                stacks[_collapse(names.get(ident, str(ident)), frame)] += 1
+            time.sleep(interval)
+
+        return stacks
+
+    @property
+    def running(self) -> bool:
+        """Whether a profile is in progress."""
+        return self._running.locked()
+
+
+class MemorySnapshots:
+    """
+    Numbered ``tracemalloc`` snapshots and diffs between them.
+
+    Tracing starts with the first snapshot and slows allocations down
+    noticeably, so stop it once done.
+    """
+
+    def __init__(self, frames: int = 10, keep: int = 10):
+        """
+        Initialize the store.
+
+        Args:
+            frames: Stack frames recorded per allocation.
+            keep: Snapshots kept; older ones are dropped.
+        """
+        self.frames = frames
+        self.keep = keep
+        self._snapshots: dict[int, tracemalloc.Snapshot] = {}
+        self._ids = count(1)
+
+    def take(self) -> dict:
+        """
+        Take a snapshot, starting tracing if needed.
+
+        Returns:
+            Dict with the snapshot ID and traced memory in bytes.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            logger.warning(
+                "tracemalloc started with %d frames", self.frames
+            )
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            )
+        )
+        snapshot_id = next(self._ids)
+        self._snapshots[snapshot_id] = snapshot
+        while len(self._snapshots) > self.keep:
+            del self._snapshots[min(self._snapshots)]
+
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "id": snapshot_id,
+            "traced_bytes": current,
+            "peak_bytes": peak,
+        }
+
+    def diff(
+        self,
+        base_id: int,
+        target_id: int,
+        group_by: str = "lineno",
+        limit: int = 25,
+    ) -> list[dict]:
+        """
+        Compare two snapshots.
+
+        Args:
+            base_id: Earlier snapshot ID.
+            target_id: Later snapshot ID.
+            group_by: "filename", "lineno" or "traceback".
+            limit: Number of entries returned.
+
+        Returns:
+            Largest allocation changes, by absolute size difference.
+
+        Raises:
+            KeyError: If a snapshot ID is unknown.
+        """
+        base = self._snapshots[base_id]
+        target = self._snapshots[target_id]
+
+        return [
+            {
+                "location": [
+                    f"{frame.filename}:{frame.lineno}"
+                    for frame in stat.traceback
+                ],
+                "size_diff": stat.size_diff,
+                "size": stat.size,
+                "count_diff": stat.count_diff,
+                "count": stat.count,
+            }
+            for stat in target.compare_to(base, group_by)[:limit]
+        ]
+
+    def stop(self) -> None:
+        """Stop tracing and drop all snapshots."""
+        self._snapshots.clear()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def stats(self) -> dict:
+        """
+        Get tracing state.
+
+        Returns:
+            Dict with tracing flag, snapshot IDs and traced memory.
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "snapshots": sorted(self._snapshots),
+            "traced_bytes": current,
+            "peak_bytes": peak,
+        }
+
+
+def _collapse(thread_name: str, frame) -> str:
+    """Render a frame's stack as ``thread;outer;...;inner``."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_qualname} ({code.co_filename})")
+        frame = frame.f_back
+    names.append(thread_name)
+    return ";".join(reversed(names))
+
+
+stack_sampler = StackSampler()
+memory_snapshots = MemorySnapshots()
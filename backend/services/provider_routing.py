@@ -0,0 +1,281 @@
+"""
+Provider routing module.
+Routes new checkouts to the healthier, faster payment provider.
+"""
+import logging
+import random
+import time
+from typing import Any
+
+from fastapi import HTTPException
+
+from backend.config import settings
+from backend.services.circuit_breaker import CircuitBreakers, circuit_breakers
+from backend.services.metrics import checkout_failovers, checkout_routed
+
+
+logger = logging.getLogger(__name__)
+
+# Smoothing of the per-provider latency and error averages
+DECAY = 0.1
+# Latencies below this are treated as equal, so a pooled checkout taking
+# a millisecond does not take all traffic from a healthy provider
+MIN_LATENCY = 0.05
+
+
+class NoProviderAvailableError(Exception):
+    """No payment provider could create a checkout."""
+
+
+class CheckoutRejectedError(Exception):
+    """A provider rejected the checkout request itself (e.g. bad data)."""
+
+    def __init__(self, provider: str, error: Exception):
+        super().__init__(str(error))
+        self.provider = provider
+
+
+class ProviderHealth:
+    """Recent checkout latency and error rate of one provider."""
+
+    __slots__ = ("weight", "latency", "error_rate", "routed", "failures")
+
+    def __init__(self, weight: float):
+        self.weight = weight
+        self.latency: float | None = None
+        self.error_rate = 0.0
+        self.routed = 0
+        self.failures = 0
+
+    def record(self, latency: float, ok: bool) -> None:
+        """Fold a checkout attempt into the averages."""
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += (latency - self.latency) * DECAY
+        self.error_rate += ((0.0 if ok else 1.0) - self.error_rate) * DECAY
+        if not ok:
+            self.failures += 1
+
+    def score(self, default_latency: float) -> float:
+        """Routing weight: configured weight, success rate and speed."""
+        latency = max(
+            self.latency if self.latency is not None else default_latency,
+            MIN_LATENCY,
+        )
+        return self.weight * (1.0 - self.error_rate) ** 2 / latency
+
+
+class ProviderSelector:
+    """
+    Chooses the provider for each new checkout and fails over between
+    them.
+
+    Each checkout goes to a provider picked at random in proportion to
+    its score: the configured weight, times the squared success rate,
+    divided by the recent latency of its checkout creation. So traffic
+    shifts toward the faster, healthier provider while the other keeps
+    enough to be measured. A preferred provider (the visitor's explicit
+    or sticky choice) is tried first. Providers whose checkout breaker is
+    open are tried last, and a failed attempt moves on to the next
+    provider.
+    """
+
+    def __init__(
+        self,
+        weights: dict[str, float] | None = None,
+        breakers: CircuitBreakers | None = None,
+    ):
+        """
+        Initialize the selector; providers are added with ``register``.
+
+        Args:
+            weights: Weight per provider (default 1); 0 keeps a provider
+                for failover and explicit choice only.
+            breakers: Circuit breakers consulted before routing.
+        """
+        self.weights = weights or {}
+        self.breakers = breakers
+        self._services: dict[str, Any] = {}
+        self._health: dict[str, ProviderHealth] = {}
+
+    def register(self, name: str, service: Any) -> None:
+        """
+        Make a provider available for checkouts.
+
+        Args:
+            name: Provider name.
+            service: Async service with ``create_checkout()``,
+                ``is_caller_error()`` and a ``checkout_operation`` name.
+        """
+        self._services[name] = service
+        self._health[name] = ProviderHealth(self.weights.get(name, 1.0))
+
+    @property
+    def providers(self) -> list[str]:
+        """Registered provider names."""
+        return list(self._services)
+
+    def candidates(self, preferred: str | None = None) -> list[str]:
+        """
+        Order the providers for one checkout.
+
+        Args:
+            preferred: Provider to try first if it is healthy.
+
+        Returns:
+            Provider names in the order to try them.
+        """
+        healthy = [name for name in self._services if not self._open(name)]
+        order = []
+        if preferred in healthy:
+            order.append(preferred)
+            healthy.remove(preferred)
+
+        scores = self._scores(healthy)
+        weighted = [name for name in healthy if scores[name] > 0]
+        if weighted:
+            pick = random.choices(
+                weighted, weights=[scores[name] for name in weighted]
+            )[0]
+            order.append(pick)
+            healthy.remove(pick)
+
+        order.extend(sorted(healthy, key=scores.get, reverse=True))
+        order.extend(name for name in self._services if name not in order)
+        return order
+
+    async def create_checkout(
+        self,
+        customer_email: str | None = None,
+        preferred: str | None = None,
+    ) -> tuple[str, dict]:
+        """
+        Create a checkout with the best available provider.
+
+        Args:
+            customer_email: Customer's email address (optional).
+            preferred: Provider to try first if it is healthy.
+
+        Returns:
+            The provider used and its checkout data.
+
+        Raises:
+            NoProviderAvailableError: If no provider is registered.
+            HTTPException: If the request is invalid (4xx), without
+                failover.
+            CheckoutRejectedError: If a provider rejected the request
+                data, without failover.
+            Exception: The last provider's error if every provider failed.
+        """
+        candidates = self.candidates(preferred)
+        if not candidates:
+            raise NoProviderAvailableError("No payment provider configured")
+
+        reason = "preferred" if candidates[0] == preferred else "weighted"
+        error: Exception | None = None
+        for name in candidates:
+            health = self._health[name]
+            started = time.perf_counter()
+            try:
+                checkout = await self._services[name].create_checkout(
+                    customer_email
+                )
+            except HTTPException as e:
+                if e.status_code < 500:
+                    # The request itself was rejected, not the provider
+                    raise
+                error = e
+            except Exception as e:
+                if self._services[name].is_caller_error(e):
+                    # Another provider would reject it too; the provider
+                    # is healthy, so its score is left alone
+                    raise CheckoutRejectedError(name, e) from e
+                error = e
+            else:
+                health.record(time.perf_counter() - started, ok=True)
+                health.routed += 1
+                checkout_routed.labels(name, reason).inc()
+                return name, checkout
+
+            health.record(time.perf_counter() - started, ok=False)
+            checkout_failovers.labels(name).inc()
+            logger.warning(
+                "Checkout with %s failed, trying next provider: %s",
+                name,
+                str(error),
+            )
+            reason = "failover"
+
+        raise error
+
+    def stats(self) -> dict:
+        """
+        Get per-provider routing state.
+
+        Returns:
+            Dict of provider to weight, latency (ms), error rate, current
+            share of new checkouts, breaker state and counters.
+        """
+        names = list(self._services)
+        scores = self._scores(
+            [name for name in names if not self._open(name)]
+        )
+        total = sum(scores.values())
+
+        providers = {}
+        for name in names:
+            health = self._health[name]
+            providers[name] = {
+                "weight": health.weight,
+                "latency_ms": (
+                    None
+                    if health.latency is None
+                    else round(health.latency * 1000, 1)
+                ),
+                "error_rate": round(health.error_rate, 4),
+                "share": (
+                    round(scores.get(name, 0.0) / total, 4) if total else 0.0
+                ),
+                "breaker_open": self._open(name),
+                "routed": health.routed,
+                "failures": health.failures,
+            }
+        return providers
+
+    def _open(self, name: str) -> bool:
+        """Whether the provider's checkout breaker is failing fast."""
+        if self.breakers is None:
+            return False
+        operation = self._services[name].checkout_operation
+        return self.breakers.is_open(name, operation)
+
+    def _scores(self, names: list[str]) -> dict[str, float]:
+        """Scores of the given providers."""
+        latencies = [
+            self._health[name].latency
+            for name in names
+            if self._health[name].latency is not None
+        ]
+        # Unmeasured providers get the best known latency, so they are
+        # tried and measured
+        default = min(latencies, default=1.0)
+        return {
+            name: self._health[name].score(default) for name in names
+        }
+
+
+def _parse_weights(value: str) -> dict[str, float]:
+    """Parse ``name=weight`` pairs separated by commas."""
+    weights = {}
+    for pair in value.split(","):
+        name, _, weight = pair.partition("=")
+        if name.strip():
+            weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+provider_selector = ProviderSelector(
+    weights=_parse_weights(settings.CHECKOUT_PROVIDER_WEIGHTS),
+    breakers=circuit_breakers,
+)
@@ -0,0 +1,267 @@
+"""
+Provider rate limit module.
+Token buckets per provider and endpoint class, with 429-aware retries.
+"""
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from typing import TypeVar
+
+from fastapi import HTTPException
+
+from backend.services.deadline import remaining
+from backend.services.metrics import (
+    provider_rate_limit_wait,
+    provider_throttled,
+)
+from backend.services.tracing import span
+
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar("R")
+
+# Endpoint classes: providers limit reads and writes separately
+READ = "read"
+WRITE = "write"
+
+
+class ProviderRateLimitError(HTTPException):
+    """A provider call cannot be made within its rate limit (503)."""
+
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(
+            status_code=503,
+            detail=f"{provider} is rate limiting requests, retry later",
+            headers={"Retry-After": str(max(1, round(retry_after)))},
+        )
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Token bucket admitting ``rate`` requests per second, in bursts of up
+    to ``burst``.
+
+    ``reserve`` always takes a token, letting the balance go negative;
+    the caller then waits for its turn, so waiting requests are spaced
+    ``1 / rate`` apart in arrival order instead of all retrying at once.
+    ``pause`` stops all requests, e.g. for a provider's ``Retry-After``.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate: Tokens added per second.
+            burst: Bucket capacity.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def reserve(self) -> float:
+        """
+        Take a token.
+
+        Returns:
+            Seconds to wait before using it.
+        """
+        now = time.monotonic()
+        self.tokens = min(
+            self.burst, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+        self.tokens -= 1
+        delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(delay, self.paused_until - now)
+
+    def cancel(self) -> None:
+        """Return a reserved token that will not be used."""
+        self.tokens += 1
+
+    def pause(self, seconds: float) -> None:
+        """
+        Admit nothing for a while, then resume without a burst.
+
+        Args:
+            seconds: Pause length.
+        """
+        self.paused_until = max(
+            self.paused_until, time.monotonic() + seconds
+        )
+        self.tokens = min(self.tokens, 0.0)
+
+    def paused_for(self) -> float:
+        """Seconds until the current pause ends (0 if not paused)."""
+        return max(0.0, self.paused_until - time.monotonic())
+
+
+class ProviderRateLimiter:
+    """
+    Client-side rate limits of one provider, shared by every route.
+
+    Each call takes a token from its endpoint class's bucket (GET is a
+    read, everything else a write), waiting up to ``max_wait`` seconds
+    (or until the request deadline) for it. A 429 response pauses the
+    bucket for the provider's ``Retry-After`` (or an exponential backoff
+    without one) and the call is retried after an extra random jitter, up
+    to ``max_retries`` times.
+    Calls that cannot be made in time raise ProviderRateLimitError.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        read_rate: float,
+        write_rate: float,
+        burst: int | None = None,
+        max_retries: int = 3,
+        max_wait: float = 5.0,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            provider: Provider name, for metrics and errors.
+            read_rate: Read requests per second.
+            write_rate: Write requests per second.
+            burst: Bucket capacity (default: one second of requests).
+            max_retries: Retries of a throttled (429) request.
+            max_wait: Longest wait for a token before giving up.
+            base_delay: First backoff without ``Retry-After``.
+            max_delay: Longest backoff.
+        """
+        self.provider = provider
+        self.buckets = {
+            READ: TokenBucket(read_rate, burst or max(1, int(read_rate))),
+            WRITE: TokenBucket(write_rate, burst or max(1, int(write_rate))),
+        }
+        self.max_retries = max_retries
+        self.max_wait = max_wait
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self.calls = 0
+        self.delayed = 0
+        self.throttled = 0
+        self.retries = 0
+        self.rejected = 0
+
+    async def send(
+        self,
+        method: str,
+        request: Callable[[], Awaitable[R]],
+        status: Callable[[R], tuple[int, Mapping[str, str]]],
+    ) -> R:
+        """
+        Make a provider request within the rate limit.
+
+        Args:
+            method: HTTP method, which selects the endpoint class.
+            request: Sends the request and returns the response.
+            status: Gets a response's status code and headers.
+
+        Returns:
+            The first response that is not a 429.
+
+        Raises:
+            ProviderRateLimitError: If no token is available within
+                ``max_wait``, or the provider still answers 429 after the
+                retries.
+        """
+        endpoint_class = READ if method.upper() == "GET" else WRITE
+        bucket = self.buckets[endpoint_class]
+        self.calls += 1
+
+        for attempt in range(self.max_retries + 1):
+            await self._wait(bucket, endpoint_class)
+            response = await request()
+
+            status_code, headers = status(response)
+            if status_code != 429:
+                return response
+
+            self.throttled += 1
+            provider_throttled.labels(self.provider, endpoint_class).inc()
+            backoff = min(self.base_delay * 2**attempt, self.max_delay)
+            retry_after = _retry_after(headers)
+            bucket.pause(backoff if retry_after is None else retry_after)
+            if attempt == self.max_retries:
+                break
+
+            self.retries += 1
+            logger.warning(
+                "%s rate limited a %s request, retrying (attempt %d)",
+                self.provider,
+                endpoint_class,
+                attempt + 1,
+            )
+            # Jitter spreads the retries of concurrent callers
+            await asyncio.sleep(random.uniform(0, backoff))
+
+        self.rejected += 1
+        raise ProviderRateLimitError(self.provider, bucket.paused_for())
+
+    def stats(self) -> dict:
+        """
+        Get rate limit configuration and counters.
+
+        Returns:
+            Dict with per-class rates and counts of calls, calls delayed
+            by the limiter, 429 responses, retries and rejected calls.
+        """
+        return {
+            "rates": {
+                name: bucket.rate for name, bucket in self.buckets.items()
+            },
+            "calls": self.calls,
+            "delayed": self.delayed,
+            "throttled": self.throttled,
+            "retries": self.retries,
+            "rejected": self.rejected,
+        }
+
+    async def _wait(self, bucket: TokenBucket, endpoint_class: str) -> None:
+        """Wait for a token, or raise if that would take too long."""
+        delay = bucket.reserve()
+        max_wait = self.max_wait
+        left = remaining()
+        if left is not None:
+            max_wait = min(max_wait, left)
+        if delay > max_wait:
+            bucket.cancel()
+            self.rejected += 1
+            raise ProviderRateLimitError(self.provider, delay)
+        if delay <= 0:
+            return
+
+        self.delayed += 1
+        started = time.perf_counter()
+        with span(
+            f"{self.provider}.rate_limit", endpoint_class=endpoint_class
+        ):
+            await asyncio.sleep(delay)
+            # A 429 may have paused the bucket meanwhile
+            while (paused := bucket.paused_for()) > 0:
+                await asyncio.sleep(paused)
+        provider_rate_limit_wait.labels(
+            self.provider, endpoint_class
+        ).observe(time.perf_counter() - started)
+
+
+def _retry_after(headers: Mapping[str, str]) -> float | None:
+    """Seconds from a ``Retry-After`` header, if it holds a number."""
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,82 @@
+"""
+Single-flight module.
+Coalesces concurrent identical provider reads into one in-flight call.
+"""
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Group of in-flight calls keyed by request identity.
+
+    The first caller for a key starts the call as a task; callers arriving
+    while it runs await the same task and share its result or error.
+    The task is shielded, so one caller being cancelled (e.g. a closed
+    browser tab) does not cancel the call for the others.
+    """
+
+    def __init__(self):
+        """Initialize an empty group."""
+        self._calls: dict[Hashable, asyncio.Task] = {}
+
+        self.calls = 0
+        self.shared = 0
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Run ``fn`` once for all concurrent callers with the same key.
+
+        Args:
+            key: Identity of the request (e.g. provider, kind and ID).
+            fn: Coroutine function performing the call.
+
+        Returns:
+            Result of the shared call.
+        """
+        task = self._calls.get(key)
+
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self.shared += 1
+
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        """
+        Get coalescing statistics.
+
+        Returns:
+            Dict with calls started, callers that shared a call and the
+            number of calls currently in flight.
+        """
+        return {
+            "calls": self.calls,
+            "shared": self.shared,
+            "in_flight": len(self._calls),
+        }
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        """Remove a finished call so the next caller starts a new one."""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+        # Mark the error as retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
+
+
+provider_flights = SingleFlight()
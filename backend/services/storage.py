@@ -0,0 +1,48 @@
+"""
+Local storage helpers.
+Opens the SQLite databases used for durable local state.
+"""
+import sqlite3
+from pathlib import Path
+
+from backend.config import settings
+
+
+def database_path(name: str) -> Path:
+    """
+    Get the path of a database file inside DATA_DIR.
+
+    Args:
+        name: Database file name.
+
+    Returns:
+        Absolute path to the database file.
+    """
+    return Path(settings.DATA_DIR) / name
+
+
+def connect(path: str | Path) -> sqlite3.Connection:
+    """
+    Open a SQLite database in WAL mode.
+
+    WAL with ``synchronous=NORMAL`` keeps commits durable across process
+    crashes while avoiding an fsync per transaction.
+
+    Args:
+        path: Database file path (parent directories are created).
+
+    Returns:
+        Open SQLite connection in autocommit mode.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    connection = sqlite3.connect(
+        path,
+        isolation_level=None,
+        check_same_thread=False,
+    )
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+
+    return connection
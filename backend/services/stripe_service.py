@@ -3,26 +3,290 @@ Stripe service module.
 Handles all Stripe-related operations.
 """
 import logging
+import ssl
+import time
+from collections.abc import Awaitable, Iterator
+from contextlib import contextmanager
+from urllib.parse import urlsplit
 
+import httpx
 import stripe
 
 from backend.config import settings
+from backend.services.cache import CacheBackend, provider_cache, read_through
+from backend.services.customer_index import (
+    CustomerIndex,
+    customer_index,
+    normalize_email,
+)
+from backend.services.http_pool import HttpPool, http_pool
+from backend.services.circuit_breaker import (
+    CircuitBreakers,
+    circuit_breakers,
+)
+from backend.services.deadline import enforce
+from backend.services.metrics import current_operation, instrument
+from backend.services.object_pool import PrecreatedPool
+from backend.services.rate_limit import ProviderRateLimiter
+from backend.services.singleflight import SingleFlight, provider_flights
+from backend.services.tracing import KIND_CLIENT, span
 
 
 logger = logging.getLogger(__name__)
 
+FINAL_SESSION_STATUSES = frozenset({"complete", "expired"})
+
 # Initialize Stripe with the secret key
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
 
+def _checkout_session_params(
+    customer_email: str | None = None,
+    price_id: str | None = None,
+    trial_period_days: int | None = None,
+) -> dict:
+    """Build the parameters of a subscription Checkout Session."""
+    price_id = price_id or settings.STRIPE_PRICE_ID
+    trial_period_days = trial_period_days or settings.TRIAL_PERIOD_DAYS
+
+    success_url = (
+        f"{settings.FRONTEND_URL}/welcome.html"
+        f"?session_id={{CHECKOUT_SESSION_ID}}"
+    )
+    cancel_url = f"{settings.FRONTEND_URL}/payment.html?status=canceled"
+
+    session_params = {
+        "mode": "subscription",
+        "line_items": [
+            {
+                "price": price_id,
+                "quantity": 1,
+            }
+        ],
+        "subscription_data": {
+            "trial_period_days": trial_period_days,
+        },
+        "success_url": success_url,
+        "cancel_url": cancel_url,
+    }
+
+    if customer_email:
+        session_params["customer_email"] = customer_email
+
+    return session_params
+
+
+@contextmanager
+def _timed(timings: dict[str, float], leg: str) -> Iterator[None]:
+    """Add the duration of the block (ms) to ``timings[leg]``."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        timings[leg] = timings.get(leg, 0.0) + elapsed
+
+
+def _request_options(idempotency_key: str | None) -> dict:
+    """Build per-request options carrying an idempotency key."""
+    return {"idempotency_key": idempotency_key} if idempotency_key else {}
+
+
+def _derived_key(idempotency_key: str | None, step: str) -> str | None:
+    """Derive a distinct key for one step of a multi-call operation."""
+    return f"{idempotency_key}:{step}" if idempotency_key else None
+
+
 class StripeService:
-    """Service class for Stripe operations."""
+    """Stripe helpers that need no API call."""
 
     @staticmethod
-    def create_checkout_session(
+    def verify_webhook_signature(payload: bytes, sig_header: str) -> None:
+        """
+        Verify a webhook signature without constructing the event.
+
+        Args:
+            payload: Raw request body.
+            sig_header: Stripe-Signature header value.
+
+        Raises:
+            stripe.error.SignatureVerificationError: If the signature or
+                its timestamp is invalid.
+        """
+        stripe.WebhookSignature.verify_header(
+            payload.decode("utf-8"),
+            sig_header,
+            settings.STRIPE_WEBHOOK_SECRET,
+            stripe.Webhook.DEFAULT_TOLERANCE,
+        )
+
+
+class TracedHTTPXClient(stripe.HTTPXClient):
+    """
+    HTTPX client that traces each Stripe API request attempt.
+
+    Requests go through the given ``httpx.AsyncClient`` (the HTTP pool's
+    ``stripe`` client) instead of one the SDK creates with its own,
+    short keep-alive defaults. They are bounded by the request deadline,
+    then pass ``rate_limiter`` and the current operation's circuit
+    breaker if given.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient | None = None,
+        rate_limiter: ProviderRateLimiter | None = None,
+        breakers: CircuitBreakers | None = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        if client is not None:
+            self._client_async = client
+        self.rate_limiter = rate_limiter
+        self.breakers = breakers
+
+    async def request_async(self, method, url, headers, post_data=None):
+        operation = current_operation.get() or "other"
+
+        async def send():
+            with span(
+                "stripe.http",
+                KIND_CLIENT,
+                **{
+                    "http.request.method": method.upper(),
+                    "url.path": urlsplit(url).path,
+                },
+            ):
+                return await super(TracedHTTPXClient, self).request_async(
+                    method, url, headers, post_data
+                )
+
+        # Responses are (content, status code, headers) tuples
+        async def attempt():
+            if self.breakers is None:
+                return await send()
+            return await self.breakers.get("stripe", operation).call(
+                send, failed=lambda response: response[1] >= 500
+            )
+
+        async with enforce(f"stripe {operation}"):
+            if self.rate_limiter is None:
+                return await attempt()
+            return await self.rate_limiter.send(
+                method,
+                attempt,
+                lambda response: (response[1], response[2]),
+            )
+
+
+class AsyncStripeService:
+    """
+    Async Stripe service.
+
+    Uses the SDK's ``*_async`` methods over one shared ``httpx.AsyncClient``
+    so that Stripe round trips never block the event loop.
+    """
+
+    # Operation whose circuit breaker gates provider-neutral checkouts
+    checkout_operation = "create_checkout_session"
+
+    def __init__(
+        self,
+        http_client: stripe.HTTPClient | None = None,
+        cache: CacheBackend | None = None,
+        flights: SingleFlight | None = None,
+        customers: CustomerIndex | None = None,
+        pool: HttpPool | None = None,
+        session_pool_size: int = 0,
+        session_pool_low_watermark: int | None = None,
+        session_min_remaining: float = 3600.0,
+        rate_limiter: ProviderRateLimiter | None = None,
+        breakers: CircuitBreakers | None = None,
+    ):
+        """
+        Initialize the service; the Stripe client is built lazily.
+
+        Without ``http_client``, requests go through the pool's
+        ``stripe`` client. With ``session_pool_size``, anonymous
+        Checkout Sessions are pre-created once ``warm_up`` runs. With
+        ``rate_limiter`` and ``breakers``, pooled requests are rate
+        limited and fail fast while an operation's breaker is open.
+        """
+        self._http_client = http_client
+        self._client = None
+        self.cache = cache
+        self.flights = flights or SingleFlight()
+        self.customers = customers
+        self.pool = pool or HttpPool()
+        self.rate_limiter = rate_limiter
+        self.breakers = breakers
+        self.session_pool = PrecreatedPool(
+            "checkout session",
+            self._create_pooled_session,
+            size=session_pool_size,
+            low_watermark=session_pool_low_watermark,
+            min_remaining=session_min_remaining,
+        )
+
+    @property
+    def client(self) -> stripe.StripeClient:
+        """Lazy initialization of the Stripe client."""
+        if self._client is None:
+            http_client = self._http_client or TracedHTTPXClient(
+                self.pool.client(
+                    "stripe",
+                    verify=ssl.create_default_context(
+                        cafile=stripe.ca_bundle_path
+                    ),
+                ),
+                timeout=self.pool.timeout,
+                rate_limiter=self.rate_limiter,
+                breakers=self.breakers,
+            )
+
+            self._client = stripe.StripeClient(
+                settings.STRIPE_SECRET_KEY,
+                http_client=http_client,
+            )
+
+        return self._client
+
+    async def warm_up(self) -> dict | None:
+        """
+        Open connections to the Stripe API ahead of the first request.
+
+        Also starts filling the Checkout Session pool.
+
+        Returns:
+            Warm-up result, or None if Stripe is not configured or a
+            custom HTTP client is used.
+        """
+        if not settings.STRIPE_SECRET_KEY:
+            return None
+
+        warmup = None
+        if self._http_client is None:
+            self.client  # creates the pool's stripe client
+            warmup = await self.pool.warm("stripe", stripe.api_base)
+
+        self.session_pool.start()
+        return warmup
+
+    async def close(self) -> None:
+        """Stop the session pool and close the HTTP client."""
+        await self.session_pool.stop()
+        if self._http_client is not None:
+            await self._http_client.close_async()
+        await self.pool.close("stripe")
+        self._client = None
+
+    @instrument("stripe")
+    async def create_checkout_session(
+        self,
         customer_email: str | None = None,
         price_id: str | None = None,
         trial_period_days: int | None = None,
+        idempotency_key: str | None = None,
     ) -> stripe.checkout.Session:
         """
         Create a Stripe Checkout Session for subscription.
@@ -31,126 +295,282 @@ class StripeService:
             customer_email: Customer's email address (optional).
             price_id: Stripe Price ID for the subscription.
             trial_period_days: Number of trial days before charging.
+            idempotency_key: Key forwarded to Stripe (optional).
 
         Returns:
             Stripe Checkout Session object.
         """
-        price_id = price_id or settings.STRIPE_PRICE_ID
-        trial_period_days = trial_period_days or settings.TRIAL_PERIOD_DAYS
-
-        success_url = (
-            f"{settings.FRONTEND_URL}/welcome.html"
-            f"?session_id={{CHECKOUT_SESSION_ID}}"
-        )
-        cancel_url = f"{settings.FRONTEND_URL}/payment.html?status=canceled"
-
-        session_params = {
-            "mode": "subscription",
-            "line_items": [
-                {
-                    "price": price_id,
-                    "quantity": 1,
-                }
-            ],
-            "subscription_data": {
-                "trial_period_days": trial_period_days,
-            },
-            "success_url": success_url,
-            "cancel_url": cancel_url,
-        }
-
-        if customer_email:
-            session_params["customer_email"] = customer_email
+        session_params = _checkout_session_params(
+            customer_email=customer_email,
+            price_id=price_id,
+            trial_period_days=trial_period_days,
+        )
 
         logger.info("Creating checkout session for email: %s", customer_email)
 
-        checkout_session = stripe.checkout.Session.create(**session_params)
+        checkout_session = await self.client.checkout.sessions.create_async(
+            params=session_params,
+            options=_request_options(idempotency_key),
+        )
 
         logger.info("Checkout session created: %s", checkout_session.id)
 
         return checkout_session
 
+    async def get_checkout_session(
+        self,
+        customer_email: str | None = None,
+    ) -> tuple[stripe.checkout.Session, bool]:
+        """
+        Get a Checkout Session for a redirect, from the pool if possible.
+
+        Pooled sessions are anonymous and use the default price and
+        trial, so sessions for a known email are always created.
+
+        Args:
+            customer_email: Customer's email address (optional).
+
+        Returns:
+            The session, and whether it came from the pool.
+        """
+        if customer_email is None:
+            checkout_session = self.session_pool.take()
+            if checkout_session is not None:
+                return checkout_session, True
+
+        checkout_session = await self.create_checkout_session(
+            customer_email=customer_email,
+        )
+        return checkout_session, False
+
+    async def create_checkout(
+        self,
+        customer_email: str | None = None,
+    ) -> dict:
+        """
+        Create a checkout for the provider-neutral checkout API.
+
+        Args:
+            customer_email: Customer's email address (optional).
+
+        Returns:
+            Dict with the Checkout Session ID and the URL to redirect to.
+        """
+        checkout_session, _ = await self.get_checkout_session(
+            customer_email=customer_email,
+        )
+        return {"id": checkout_session.id, "url": checkout_session.url}
+
     @staticmethod
-    def create_customer(email: str) -> stripe.Customer:
+    def is_caller_error(error: Exception) -> bool:
+        """
+        Check whether a checkout error was caused by the request.
+
+        Args:
+            error: Error raised by ``create_checkout()``.
+
+        Returns:
+            True for invalid request and card errors.
+        """
+        return isinstance(
+            error, (stripe.error.InvalidRequestError, stripe.error.CardError)
+        )
+
+    async def _create_pooled_session(
+        self,
+    ) -> tuple[stripe.checkout.Session, float]:
+        """Create an anonymous session for the pool, with its expiry."""
+        checkout_session = await self.create_checkout_session()
+        return checkout_session, float(checkout_session.expires_at)
+
+    def stats(self) -> dict:
+        """
+        Get service statistics.
+
+        Returns:
+            Dict with Checkout Session pool and rate limit statistics.
+        """
+        return {
+            "session_pool": self.session_pool.stats(),
+            "rate_limit": (
+                self.rate_limiter.stats() if self.rate_limiter else None
+            ),
+        }
+
+    @instrument("stripe")
+    async def create_customer(
+        self,
+        email: str,
+        payment_method_id: str | None = None,
+        idempotency_key: str | None = None,
+    ) -> stripe.Customer:
         """
         Create a Stripe Customer.
 
         Args:
             email: Customer's email address.
+            payment_method_id: PaymentMethod to attach on creation
+                (optional).
+            idempotency_key: Key forwarded to Stripe (optional).
 
         Returns:
             Stripe Customer object.
         """
         logger.info("Creating Stripe customer for email: %s", email)
 
-        customer = stripe.Customer.create(email=email)
+        customer_params = {"email": email}
+        if payment_method_id:
+            customer_params["payment_method"] = payment_method_id
+
+        customer = await self.client.customers.create_async(
+            params=customer_params,
+            options=_request_options(idempotency_key),
+        )
 
         logger.info("Customer created: %s", customer.id)
 
+        if self.customers is not None:
+            self.customers.add(
+                "stripe",
+                email,
+                customer.id,
+                customer.get("created") or time.time(),
+            )
+
         return customer
 
-    @staticmethod
-    def create_setup_intent(customer_id: str) -> stripe.SetupIntent:
+    @instrument("stripe")
+    async def get_or_create_customer(
+        self,
+        email: str,
+        idempotency_key: str | None = None,
+        owned_customer_id: str | None = None,
+    ) -> str:
+        """
+        Get the customer ID for an email, creating the customer if needed.
+
+        A customer indexed for the email is only reused when the caller
+        has proven it owns it, so knowing an email is not enough to get a
+        SetupIntent for someone else's customer. Concurrent retries of
+        one request (same email, idempotency key and owner) share one
+        create.
+
+        Args:
+            email: Customer's email address.
+            idempotency_key: Key forwarded to Stripe (optional).
+            owned_customer_id: Customer the request is authenticated for
+                (optional).
+
+        Returns:
+            Stripe Customer ID.
+        """
+        if self._owns(email, owned_customer_id):
+            logger.info("Reusing Stripe customer %s", owned_customer_id)
+            return owned_customer_id
+
+        customer = await self._create_customer_once(
+            email,
+            idempotency_key=idempotency_key,
+            owned_customer_id=owned_customer_id,
+        )
+
+        return customer.id
+
+    @instrument("stripe")
+    async def list_customers(
+        self,
+        limit: int = 100,
+        starting_after: str | None = None,
+    ) -> stripe.ListObject:
+        """
+        List one page of customers, newest first.
+
+        Args:
+            limit: Page size (max 100).
+            starting_after: Customer ID to continue after.
+
+        Returns:
+            Stripe list object with ``data`` and ``has_more``.
+        """
+        params = {"limit": limit}
+        if starting_after:
+            params["starting_after"] = starting_after
+
+        return await self.client.customers.list_async(params=params)
+
+    @instrument("stripe")
+    async def create_setup_intent(
+        self,
+        customer_id: str,
+        idempotency_key: str | None = None,
+    ) -> stripe.SetupIntent:
         """
         Create a SetupIntent for saving payment method.
 
         Args:
             customer_id: Stripe Customer ID.
+            idempotency_key: Request's idempotency key; the SetupIntent is
+                created with a key derived from it (optional).
 
         Returns:
             Stripe SetupIntent object.
         """
         logger.info("Creating setup intent for customer: %s", customer_id)
 
-        setup_intent = stripe.SetupIntent.create(
-            customer=customer_id,
-            payment_method_types=["card"],
+        setup_intent = await self.client.setup_intents.create_async(
+            params={
+                "customer": customer_id,
+                "payment_method_types": ["card"],
+            },
+            options=_request_options(
+                _derived_key(idempotency_key, "setup_intent")
+            ),
         )
 
         logger.info("SetupIntent created: %s", setup_intent.id)
 
         return setup_intent
 
-    @staticmethod
-    def create_subscription(
+    @instrument("stripe")
+    async def create_subscription(
+        self,
         customer_id: str,
         price_id: str,
         payment_method_id: str,
         trial_period_days: int | None = None,
+        timings: dict[str, float] | None = None,
+        idempotency_key: str | None = None,
     ) -> stripe.Subscription:
         """
         Create a subscription with a saved payment method.
 
+        The payment method is set as the subscription's default instead of
+        modifying the customer, and it is only attached when Stripe reports
+        that it is not attached yet. Payment methods confirmed through a
+        SetupIntent for this customer are already attached, so the common
+        path is a single Stripe call.
+
         Args:
             customer_id: Stripe Customer ID.
             price_id: Stripe Price ID.
             payment_method_id: Stripe PaymentMethod ID.
             trial_period_days: Number of trial days.
+            timings: Optional dict collecting per-call durations (ms).
+            idempotency_key: Key forwarded to Stripe (optional).
 
         Returns:
             Stripe Subscription object.
         """
         trial_period_days = trial_period_days or settings.TRIAL_PERIOD_DAYS
-
-        # Attach payment method to customer (if not already attached)
-        try:
-            stripe.PaymentMethod.attach(
-                payment_method_id,
-                customer=customer_id,
-            )
-            logger.info("Payment method %s attached to customer %s",
-                        payment_method_id, customer_id)
-        except stripe.error.InvalidRequestError as e:
-            # Payment method might already be attached
-            if "already been attached" not in str(e):
-                raise
-            logger.info("Payment method %s already attached", payment_method_id)
-
-        # Set as default payment method
-        stripe.Customer.modify(
-            customer_id,
-            invoice_settings={"default_payment_method": payment_method_id},
-        )
+        timings = {} if timings is None else timings
+
+        subscription_params = {
+            "customer": customer_id,
+            "items": [{"price": price_id}],
+            "trial_period_days": trial_period_days,
+            "default_payment_method": payment_method_id,
+            "expand": ["latest_invoice.payment_intent"],
+        }
 
         logger.info(
             "Creating subscription for customer: %s with price: %s",
@@ -158,69 +578,243 @@ class StripeService:
             price_id,
         )
 
-        subscription = stripe.Subscription.create(
-            customer=customer_id,
-            items=[{"price": price_id}],
-            trial_period_days=trial_period_days,
-            expand=["latest_invoice.payment_intent"],
-        )
+        try:
+            with _timed(timings, "create_subscription"):
+                subscription = await self.client.subscriptions.create_async(
+                    params=subscription_params,
+                    options=_request_options(idempotency_key),
+                )
+        except stripe.error.InvalidRequestError as e:
+            if e.param != "default_payment_method":
+                raise
+
+            # Payment method is not attached to this customer yet
+            with _timed(timings, "attach_payment_method"):
+                await self._attach_payment_method(
+                    payment_method_id, customer_id
+                )
+
+            # The first attempt failed, so retry under a distinct key
+            with _timed(timings, "create_subscription"):
+                subscription = await self.client.subscriptions.create_async(
+                    params=subscription_params,
+                    options=_request_options(
+                        _derived_key(idempotency_key, "retry")
+                    ),
+                )
 
         logger.info("Subscription created: %s", subscription.id)
 
         return subscription
 
-    @staticmethod
-    def construct_webhook_event(
-        payload: bytes,
-        sig_header: str,
-    ) -> stripe.Event:
+    @instrument("stripe")
+    async def subscribe(
+        self,
+        email: str,
+        payment_method_id: str,
+        price_id: str | None = None,
+        trial_period_days: int | None = None,
+        idempotency_key: str | None = None,
+        owned_customer_id: str | None = None,
+    ) -> tuple[str, stripe.Subscription]:
         """
-        Construct and verify a webhook event.
+        Create a subscription for an email and payment method in one go.
+
+        Replaces the create-setup-intent + create-subscription sequence for
+        payment methods that already exist (Apple Pay / Google Pay). A new
+        customer is created with the payment method attached, so at most
+        two Stripe calls are made; known customers the caller owns need
+        one.
 
         Args:
-            payload: Raw request body.
-            sig_header: Stripe-Signature header value.
+            email: Customer's email address.
+            payment_method_id: Stripe PaymentMethod ID.
+            price_id: Stripe Price ID (defaults to STRIPE_PRICE_ID).
+            trial_period_days: Number of trial days.
+            idempotency_key: Key forwarded to Stripe (optional).
+            owned_customer_id: Customer the request is authenticated for
+                (optional); the email's indexed customer is only reused
+                if it is this one.
 
         Returns:
-            Verified Stripe Event object.
+            Tuple of (customer ID, Stripe Subscription object).
         """
-        return stripe.Webhook.construct_event(
-            payload,
-            sig_header,
-            settings.STRIPE_WEBHOOK_SECRET,
+        price_id = price_id or settings.STRIPE_PRICE_ID
+        timings: dict[str, float] = {}
+        started = time.perf_counter()
+
+        if self._owns(email, owned_customer_id):
+            customer_id = owned_customer_id
+        else:
+            with _timed(timings, "create_customer"):
+                customer = await self._create_customer_once(
+                    email,
+                    payment_method_id=payment_method_id,
+                    idempotency_key=idempotency_key,
+                    owned_customer_id=owned_customer_id,
+                )
+            customer_id = customer.id
+
+        subscription = await self.create_subscription(
+            customer_id=customer_id,
+            price_id=price_id,
+            payment_method_id=payment_method_id,
+            trial_period_days=trial_period_days,
+            timings=timings,
+            idempotency_key=_derived_key(idempotency_key, "subscription"),
         )
 
-    @staticmethod
-    def cancel_subscription(subscription_id: str) -> stripe.Subscription:
+        logger.info(
+            "Checkout pipeline for %s took %.1fms: %s",
+            customer_id,
+            (time.perf_counter() - started) * 1000,
+            ", ".join(f"{leg}={ms:.1f}ms" for leg, ms in timings.items()),
+        )
+
+        return customer_id, subscription
+
+    def _owns(self, email: str, owned_customer_id: str | None) -> bool:
+        """Whether the caller's customer is one indexed for the email."""
+        return (
+            self.customers is not None
+            and owned_customer_id is not None
+            and self.customers.has("stripe", email, owned_customer_id)
+        )
+
+    async def _create_customer_once(
+        self,
+        email: str,
+        payment_method_id: str | None = None,
+        idempotency_key: str | None = None,
+        owned_customer_id: str | None = None,
+    ) -> stripe.Customer:
+        """
+        Create a customer, sharing the create between retries.
+
+        Only concurrent requests from the same caller (same idempotency
+        key and owner cookie) share a create. Without either there is no
+        way to tell a retry from another browser, so each such request
+        creates its own customer.
+        """
+
+        def create() -> Awaitable[stripe.Customer]:
+            return self.create_customer(
+                email,
+                payment_method_id=payment_method_id,
+                idempotency_key=_derived_key(idempotency_key, "customer"),
+            )
+
+        if idempotency_key is None and owned_customer_id is None:
+            return await create()
+        return await self.flights.do(
+            (
+                "stripe",
+                "create_customer",
+                normalize_email(email),
+                idempotency_key,
+                owned_customer_id,
+            ),
+            create,
+        )
+
+    async def _attach_payment_method(
+        self,
+        payment_method_id: str,
+        customer_id: str,
+    ) -> None:
+        """Attach a payment method, tolerating one already attached."""
+        try:
+            await self.client.payment_methods.attach_async(
+                payment_method_id,
+                params={"customer": customer_id},
+            )
+            logger.info("Payment method %s attached to customer %s",
+                        payment_method_id, customer_id)
+        except stripe.error.InvalidRequestError as e:
+            # Payment method might already be attached
+            if "already been attached" not in str(e):
+                raise
+            logger.info("Payment method %s already attached", payment_method_id)
+
+    @instrument("stripe")
+    async def cancel_subscription(
+        self,
+        subscription_id: str,
+        idempotency_key: str | None = None,
+    ) -> stripe.Subscription:
         """
         Cancel a subscription.
 
         Args:
             subscription_id: Stripe Subscription ID.
+            idempotency_key: Key forwarded to Stripe (optional).
 
         Returns:
             Cancelled Stripe Subscription object.
         """
         logger.info("Cancelling subscription: %s", subscription_id)
 
-        subscription = stripe.Subscription.delete(subscription_id)
+        subscription = await self.client.subscriptions.cancel_async(
+            subscription_id,
+            options=_request_options(idempotency_key),
+        )
 
         logger.info("Subscription cancelled: %s", subscription_id)
 
         return subscription
 
-    @staticmethod
-    def get_session(session_id: str) -> stripe.checkout.Session:
+    @instrument("stripe")
+    async def get_session(self, session_id: str) -> stripe.checkout.Session:
         """
         Retrieve a Checkout Session by ID.
 
+        Results are served from the provider cache when possible, and
+        concurrent lookups of the same session share one Stripe call.
+
         Args:
             session_id: Stripe Checkout Session ID.
 
         Returns:
             Stripe Checkout Session object.
         """
-        return stripe.checkout.Session.retrieve(session_id)
+        key = ("stripe", "checkout_session", session_id)
+
+        return await read_through(
+            self.cache,
+            key,
+            lambda: self.flights.do(
+                key,
+                lambda: self.client.checkout.sessions.retrieve_async(
+                    session_id
+                ),
+            ),
+            ttl=_session_ttl,
+        )
+
+
+def _session_ttl(session: stripe.checkout.Session) -> float:
+    """Cache completed or expired sessions longer than open ones."""
+    if session.get("status") in FINAL_SESSION_STATUSES:
+        return settings.PROVIDER_CACHE_FINAL_TTL
+    return settings.PROVIDER_CACHE_TTL
 
 
 stripe_service = StripeService()
+async_stripe_service = AsyncStripeService(
+    cache=provider_cache,
+    flights=provider_flights,
+    customers=customer_index,
+    pool=http_pool,
+    session_pool_size=settings.CHECKOUT_POOL_SIZE,
+    session_pool_low_watermark=settings.CHECKOUT_POOL_LOW_WATERMARK,
+    session_min_remaining=settings.CHECKOUT_POOL_MIN_REMAINING,
+    rate_limiter=ProviderRateLimiter(
+        "stripe",
+        read_rate=settings.STRIPE_RATE_LIMIT_READ,
+        write_rate=settings.STRIPE_RATE_LIMIT_WRITE,
+        burst=settings.STRIPE_RATE_LIMIT_BURST,
+        max_retries=settings.RATE_LIMIT_MAX_RETRIES,
+        max_wait=settings.RATE_LIMIT_MAX_WAIT,
+    ),
+    breakers=circuit_breakers,
+)
@@ -0,0 +1,124 @@
+"""
+Subscription store module.
+Local materialized view of provider objects, kept up to date by webhooks.
+"""
+import json
+import logging
+from pathlib import Path
+
+from backend.services.storage import connect, database_path
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS provider_objects (
+    provider TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    version REAL NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (provider, kind, id)
+) WITHOUT ROWID;
+"""
+
+# Only overwrite a row with data from an event that is not older than it,
+# so late or out-of-order webhook deliveries never roll state back.
+UPSERT = """
+INSERT INTO provider_objects (provider, kind, id, version, data)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (provider, kind, id) DO UPDATE
+SET version = excluded.version, data = excluded.data
+WHERE excluded.version >= provider_objects.version
+"""
+
+
+class SubscriptionStore:
+    """
+    Local store of subscriptions, customers and transactions.
+
+    Objects are keyed by (provider, kind, id), where kind is one of
+    "subscription", "customer", "transaction" or "checkout_session".
+    Each row carries the timestamp of the event that produced it and is
+    only replaced by data from an event at least as recent.
+    """
+
+    def __init__(self, path: str | Path):
+        """Initialize the store; the database is opened lazily."""
+        self.path = Path(path)
+        self._connection = None
+
+    @property
+    def connection(self):
+        """Lazy initialization of the store database."""
+        if self._connection is None:
+            self._connection = connect(self.path)
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def close(self) -> None:
+        """Close the store database."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def upsert(
+        self,
+        provider: str,
+        kind: str,
+        object_id: str,
+        data: dict,
+        version: float,
+    ) -> bool:
+        """
+        Insert or update an object unless the stored copy is newer.
+
+        Args:
+            provider: Provider name.
+            kind: Object kind.
+            object_id: Provider object ID.
+            data: Object data as returned by the read endpoints.
+            version: Event timestamp (seconds since the epoch).
+
+        Returns:
+            True if the object was written, False if a newer one exists.
+        """
+        cursor = self.connection.execute(
+            UPSERT,
+            (provider, kind, object_id, version, json.dumps(data)),
+        )
+
+        if cursor.rowcount == 0:
+            logger.info(
+                "Ignoring stale %s %s %s (version %s)",
+                provider,
+                kind,
+                object_id,
+                version,
+            )
+            return False
+
+        return True
+
+    def get(self, provider: str, kind: str, object_id: str) -> dict | None:
+        """
+        Get a stored object.
+
+        Args:
+            provider: Provider name.
+            kind: Object kind.
+            object_id: Provider object ID.
+
+        Returns:
+            Object data, or None if it is not stored locally.
+        """
+        row = self.connection.execute(
+            "SELECT data FROM provider_objects "
+            "WHERE provider = ? AND kind = ? AND id = ?",
+            (provider, kind, object_id),
+        ).fetchone()
+
+        return json.loads(row[0]) if row else None
+
+
+subscription_store = SubscriptionStore(database_path("subscriptions.sqlite3"))
@@ -0,0 +1,318 @@
+"""
+Tracing module.
+Per-request span trees for Server-Timing and OTLP JSON file export.
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from backend.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+
+# Innermost open span of the current request, set by TracingMiddleware
+current_span: ContextVar["Span | None"] = ContextVar(
+    "current_span", default=None
+)
+
+
+class Span:
+    """
+    Timed operation within a request trace.
+
+    Children opened while this span is current (including in tasks
+    started from it) are attached to it, forming the request's timing
+    tree.
+    """
+
+    __slots__ = (
+        "name", "kind", "attributes", "trace_id", "span_id",
+        "parent_id", "children", "start_ns", "duration_ns", "error",
+        "_started",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str | None = None,
+        parent_id: str = "",
+        kind: int = KIND_INTERNAL,
+        attributes: dict | None = None,
+    ):
+        """
+        Start the span.
+
+        Args:
+            name: Operation name.
+            trace_id: Trace to join; a new trace is started if omitted.
+            parent_id: Parent span ID ("" for a root span).
+            kind: OTLP span kind.
+            attributes: Span attributes.
+        """
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.trace_id = trace_id or os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.children: list[Span] = []
+        self.start_ns = time.time_ns()
+        self.duration_ns: int | None = None
+        self.error: str | None = None
+        self._started = time.perf_counter_ns()
+
+    @property
+    def duration_ms(self) -> float:
+        """Duration so far (or in total, once finished) in ms."""
+        duration_ns = self.duration_ns
+        if duration_ns is None:
+            duration_ns = time.perf_counter_ns() - self._started
+        return duration_ns / 1e6
+
+    @property
+    def description(self) -> str:
+        """Name followed by attribute values, for display."""
+        return " ".join([self.name, *map(str, self.attributes.values())])
+
+    def finish(self) -> None:
+        """Record the end time."""
+        if self.duration_ns is None:
+            self.duration_ns = time.perf_counter_ns() - self._started
+
+    def walk(self) -> Iterator["Span"]:
+        """Yield this span and its descendants, depth first."""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def to_otlp(self) -> dict:
+        """Convert to an OTLP JSON span."""
+        duration_ns = self.duration_ns or 0
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.start_ns + duration_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+        }
+        if self.error:
+            span["status"] = {"code": 2, "message": self.error}
+        return span
+
+
+@contextmanager
+def span(
+    name: str,
+    kind: int = KIND_INTERNAL,
+    **attributes,
+) -> Iterator[Span | None]:
+    """
+    Time a block as a child of the current span.
+
+    Outside a traced request (e.g. webhook workers, scripts) this does
+    nothing and yields None.
+
+    Args:
+        name: Operation name.
+        kind: OTLP span kind.
+        **attributes: Span attributes.
+    """
+    parent = current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    child = Span(name, parent.trace_id, parent.span_id, kind, attributes)
+    parent.children.append(child)
+    token = current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.error = type(e).__name__
+        raise
+    finally:
+        child.finish()
+        current_span.reset(token)
+
+
+def server_timing(root: Span, max_entries: int = 20) -> str:
+    """
+    Render a request's span tree as a ``Server-Timing`` header value.
+
+    Lists ``total``, ``app`` (time not covered by the root's direct
+    children, i.e. validation and our own code) and every finished span
+    depth first, up to ``max_entries``.
+
+    Args:
+        root: The request's root span.
+        max_entries: Maximum number of spans listed.
+
+    Returns:
+        Header value.
+    """
+    total = root.duration_ms
+    covered = sum(
+        child.duration_ms for child in root.children
+        if child.duration_ns is not None
+    )
+    entries = [
+        f"total;dur={total:.1f}",
+        f'app;desc="own code";dur={max(total - covered, 0.0):.1f}',
+    ]
+
+    for item in root.walk():
+        if item is root or item.duration_ns is None:
+            continue
+        if len(entries) - 2 >= max_entries:
+            break
+        entry = _token(item.name)
+        description = item.description.replace('"', "'")
+        if description != entry:
+            entry += f';desc="{description}"'
+        entries.append(f"{entry};dur={item.duration_ms:.1f}")
+
+    return ", ".join(entries)
+
+
+class FileSpanExporter:
+    """
+    Append finished traces to a file as OTLP JSON, one trace per line.
+
+    Traces are serialized and written by a background thread, so
+    exporting never blocks the event loop. The thread is started on the
+    first export.
+    """
+
+    def __init__(self, path: Path | str, service_name: str = "backend"):
+        """
+        Initialize the exporter.
+
+        Args:
+            path: Output file (JSON Lines); "" disables exporting.
+            service_name: ``service.name`` resource attribute.
+        """
+        self.path = path
+        self.service_name = service_name
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+
+        self.exported = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether an output file is configured."""
+        return bool(self.path)
+
+    def export(self, root: Span) -> None:
+        """Queue a finished trace for writing."""
+        if not self.enabled:
+            return
+
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="span-exporter", daemon=True
+            )
+            self._thread.start()
+
+        self._queue.put(root)
+
+    def stats(self) -> dict:
+        """
+        Get export counters.
+
+        Returns:
+            Dict with the output path and exported/failed trace counts.
+        """
+        return {
+            "path": str(self.path),
+            "exported": self.exported,
+            "errors": self.errors,
+        }
+
+    def close(self) -> None:
+        """Write queued traces and stop the background thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        """Write traces until ``close`` queues the stop marker."""
+        with open(self.path, "a", encoding="utf-8") as output:
+            while (root := self._queue.get()) is not None:
+                try:
+                    output.write(json.dumps(self._document(root)) + "\n")
+                    output.flush()
+                    self.exported += 1
+                except Exception:
+                    self.errors += 1
+                    logger.exception("Failed to export trace")
+
+    def _document(self, root: Span) -> dict:
+        """Build the OTLP JSON document for one trace."""
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": _otlp_value(self.service_name),
+                            }
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": __name__},
+                            "spans": [
+                                item.to_otlp() for item in root.walk()
+                            ],
+                        }
+                    ],
+                }
+            ]
+        }
+
+
+def _otlp_value(value) -> dict:
+    """Wrap an attribute value as an OTLP AnyValue."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _token(name: str) -> str:
+    """Reduce a span name to a Server-Timing metric name token."""
+    return "".join(
+        char if char.isalnum() or char in "._-" else "_" for char in name
+    )
+
+
+span_exporter = FileSpanExporter(
+    settings.TRACE_EXPORT_PATH,
+    service_name="phonecleanerplus-backend",
+)
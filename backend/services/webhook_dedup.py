@@ -0,0 +1,215 @@
+"""
+Webhook de-duplication module.
+Remembers provider event IDs so retried deliveries are dropped early.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from backend.config import settings
+from backend.services.storage import connect, database_path
+
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen_events (
+    provider TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    received_at REAL,
+    PRIMARY KEY (provider, event_id)
+) WITHOUT ROWID;
+"""
+
+# Created after the migration below, as older tables lack the column
+INDEX = """
+CREATE INDEX IF NOT EXISTS seen_events_received
+    ON seen_events (received_at);
+"""
+
+# Seconds between deletions of expired event IDs
+PRUNE_INTERVAL = 3600
+
+
+class EventDeduplicator:
+    """
+    Idempotency index keyed by provider event ID.
+
+    Recently seen IDs live in a bounded in-memory LRU; every ID is also
+    persisted to an on-disk set, so duplicates are recognised after a
+    restart or once they fall out of the LRU. Providers stop retrying a
+    delivery after a few days, so once started, IDs older than
+    ``retention`` seconds are deleted from disk every hour.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        cache_size: int = 100_000,
+        retention: float = 7 * 24 * 3600,
+    ):
+        """Initialize the index; the database is opened lazily."""
+        self.path = Path(path)
+        self.cache_size = cache_size
+        self.retention = retention
+
+        self._connection = None
+        self._recent: OrderedDict[tuple[str, str], None] = OrderedDict()
+        self._pruner: asyncio.Task | None = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.pruned = 0
+
+    @property
+    def connection(self):
+        """Lazy initialization of the index database."""
+        if self._connection is None:
+            self._connection = connect(self.path)
+            self._connection.executescript(SCHEMA)
+            columns = {
+                row[1]
+                for row in self._connection.execute(
+                    "PRAGMA table_info(seen_events)"
+                )
+            }
+            if "received_at" not in columns:
+                # IDs recorded before received_at existed expire from now
+                self._connection.execute(
+                    "ALTER TABLE seen_events ADD COLUMN received_at REAL"
+                )
+                self._connection.execute(
+                    "UPDATE seen_events SET received_at = ?", (time.time(),)
+                )
+            self._connection.executescript(INDEX)
+        return self._connection
+
+    async def start(self) -> None:
+        """Start deleting expired event IDs in the background."""
+        if self._pruner is None:
+            self._pruner = asyncio.create_task(
+                self._prune_periodically(), name="webhook-dedup-pruner"
+            )
+
+    async def stop(self) -> None:
+        """Stop deleting expired event IDs."""
+        if self._pruner is not None:
+            self._pruner.cancel()
+            await asyncio.gather(self._pruner, return_exceptions=True)
+            self._pruner = None
+
+    def prune(self) -> int:
+        """
+        Delete event IDs received more than ``retention`` seconds ago.
+
+        Returns:
+            Number of event IDs deleted.
+        """
+        cursor = self.connection.execute(
+            "DELETE FROM seen_events WHERE received_at < ?",
+            (time.time() - self.retention,),
+        )
+        self.pruned += cursor.rowcount
+        if cursor.rowcount:
+            logger.info("Pruned %d expired webhook event IDs", cursor.rowcount)
+        return cursor.rowcount
+
+    def close(self) -> None:
+        """Close the index database."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def seen(self, provider: str, event_id: str) -> bool:
+        """
+        Check whether an event has already been accepted.
+
+        Args:
+            provider: Provider name.
+            event_id: Provider event ID.
+
+        Returns:
+            True if the event ID was recorded before.
+        """
+        key = (provider, event_id)
+
+        if key in self._recent:
+            self._recent.move_to_end(key)
+            self.memory_hits += 1
+            return True
+
+        row = self.connection.execute(
+            "SELECT 1 FROM seen_events WHERE provider = ? AND event_id = ?",
+            key,
+        ).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return False
+
+        self.disk_hits += 1
+        self._remember(key)
+        return True
+
+    def add(self, provider: str, event_id: str) -> None:
+        """
+        Record an accepted event ID.
+
+        Args:
+            provider: Provider name.
+            event_id: Provider event ID.
+        """
+        key = (provider, event_id)
+        self.connection.execute(
+            "INSERT OR IGNORE INTO seen_events "
+            "(provider, event_id, received_at) VALUES (?, ?, ?)",
+            (*key, time.time()),
+        )
+        self._remember(key)
+
+    def stats(self) -> dict:
+        """
+        Get lookup statistics.
+
+        Returns:
+            Dict with memory/disk hits, misses, hit rate, LRU size and
+            pruned IDs.
+        """
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "cached": len(self._recent),
+            "pruned": self.pruned,
+        }
+
+    async def _prune_periodically(self) -> None:
+        """Prune expired event IDs every PRUNE_INTERVAL seconds."""
+        while True:
+            try:
+                self.prune()
+            except Exception:
+                logger.exception("Pruning webhook event IDs failed")
+            await asyncio.sleep(PRUNE_INTERVAL)
+
+    def _remember(self, key: tuple[str, str]) -> None:
+        """Insert a key into the LRU, evicting the oldest when full."""
+        self._recent[key] = None
+        self._recent.move_to_end(key)
+
+        if len(self._recent) > self.cache_size:
+            self._recent.popitem(last=False)
+
+
+webhook_dedup = EventDeduplicator(
+    database_path("webhook_dedup.sqlite3"),
+    cache_size=settings.WEBHOOK_DEDUP_CACHE_SIZE,
+    retention=settings.WEBHOOK_DEDUP_RETENTION,
+)
@@ -0,0 +1,479 @@
+"""
+Webhook ingestion queue module.
+Durably stores verified webhook payloads and processes them in the background.
+"""
+import asyncio
+import inspect
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+from backend.config import settings
+from backend.services.event_views import WebhookEvent, parse_event
+from backend.services.metrics import (
+    webhook_failures,
+    webhook_lag,
+    webhook_processing_duration,
+)
+from backend.services.storage import connect, database_path
+from backend.services.webhook_scheduler import KeyedScheduler
+
+
+logger = logging.getLogger(__name__)
+
+EventProcessor = Callable[[WebhookEvent], Awaitable[None] | None]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS webhook_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    provider TEXT NOT NULL,
+    event_id TEXT,
+    event_type TEXT,
+    ordering_key TEXT,
+    payload BLOB NOT NULL,
+    received_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    last_error TEXT
+);
+DROP INDEX IF EXISTS webhook_events_ready;
+CREATE INDEX IF NOT EXISTS webhook_events_pending
+    ON webhook_events (status, id);
+"""
+
+
+class WebhookQueue:
+    """
+    Durable at-least-once queue for webhook events.
+
+    Route handlers append the raw payload to a SQLite WAL log and return
+    immediately. A feeder task drains the log in arrival order and hands
+    each event to a KeyedScheduler keyed by the event's customer or
+    subscription, so events for one customer are processed in order while
+    different customers are processed in parallel by ``workers`` tasks.
+    A customer with ``key_limit`` events already buffered is skipped until
+    half of them are done, and when the scheduler is full the feeder stops
+    claiming altogether; either way events wait durably in the log.
+    Failed events are retried with exponential backoff until
+    ``max_attempts`` is reached, after which they are kept as ``dead``
+    for inspection.
+
+    While a failed event waits for its retry, later events of its key are
+    not started: those already scheduled are put back in the log, and no
+    more are claimed until the retry succeeds or the event goes dead, so
+    a retry never lands behind newer events for the same customer. Events
+    without an ordering key are keyed by their row and never wait on each
+    other.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        workers: int = 4,
+        capacity: int = 1000,
+        key_limit: int = 32,
+        max_attempts: int = 8,
+        retry_base_delay: float = 1.0,
+        retry_max_delay: float = 300.0,
+        poll_interval: float = 1.0,
+    ):
+        """Initialize the queue; the database is opened lazily."""
+        self.path = Path(path)
+        self.workers = workers
+        self.key_limit = key_limit
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.poll_interval = poll_interval
+        self.scheduler = KeyedScheduler(workers=workers, capacity=capacity)
+
+        self._connection = None
+        self._processors: dict[str, EventProcessor] = {}
+        self._in_flight: set[int] = set()
+        self._held: set[str] = set()
+        # Ordering key to the row of its failed event awaiting a retry
+        self._retrying: dict[str, int] = {}
+        self._feeder: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+
+        self.enqueued = 0
+        self.processed = 0
+        self.retries = 0
+        self.dead = 0
+
+    @property
+    def connection(self):
+        """Lazy initialization of the queue database."""
+        if self._connection is None:
+            self._connection = connect(self.path)
+            self._connection.executescript(SCHEMA)
+
+            # Queues created before events carried an ordering key
+            columns = {
+                row[1]
+                for row in self._connection.execute(
+                    "PRAGMA table_info(webhook_events)"
+                )
+            }
+            if "ordering_key" not in columns:
+                self._connection.execute(
+                    "ALTER TABLE webhook_events ADD COLUMN ordering_key TEXT"
+                )
+        return self._connection
+
+    def register_processor(self, provider: str, processor: EventProcessor):
+        """
+        Register the function that processes events of a provider.
+
+        Args:
+            provider: Provider name ("stripe" or "paddle").
+            processor: Sync or async callable taking the parsed event.
+        """
+        self._processors[provider] = processor
+
+    def enqueue(
+        self,
+        provider: str,
+        event_id: str | None,
+        event_type: str | None,
+        payload: bytes,
+        ordering_key: str | None = None,
+    ) -> int:
+        """
+        Durably append a webhook payload to the queue.
+
+        Args:
+            provider: Provider name.
+            event_id: Provider event ID (for logging and inspection).
+            event_type: Provider event type.
+            payload: Raw, already verified request body.
+            ordering_key: Customer or subscription the event belongs to;
+                events with the same key are processed in order.
+
+        Returns:
+            Queue row ID of the stored event.
+        """
+        now = time.time()
+        if ordering_key is not None:
+            ordering_key = f"{provider}:{ordering_key}"
+        cursor = self.connection.execute(
+            "INSERT INTO webhook_events "
+            "(provider, event_id, event_type, ordering_key, payload, "
+            "received_at, next_attempt_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (provider, event_id, event_type, ordering_key, payload, now, now),
+        )
+        self.enqueued += 1
+
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+        return cursor.lastrowid
+
+    async def start(self) -> None:
+        """Start draining; pending events from earlier runs resume."""
+        if self._feeder is not None:
+            return
+
+        # Events claimed by a run that stopped before finishing them
+        self.connection.execute(
+            "UPDATE webhook_events SET status = 'pending' "
+            "WHERE status = 'processing'"
+        )
+        # Keys whose earlier events failed keep waiting for their retries
+        self._retrying = dict(
+            self.connection.execute(
+                "SELECT ordering_key, MIN(id) FROM webhook_events "
+                "WHERE status = 'pending' AND attempts > 0 "
+                "AND ordering_key IS NOT NULL GROUP BY ordering_key"
+            ).fetchall()
+        )
+
+        self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        await self.scheduler.start()
+        self._feeder = asyncio.create_task(
+            self._feed(), name="webhook-feeder"
+        )
+        logger.info("Webhook queue started with %d workers", self.workers)
+
+    async def stop(self) -> None:
+        """Stop draining; unfinished events stay pending."""
+        if self._feeder is not None:
+            self._feeder.cancel()
+            await asyncio.gather(self._feeder, return_exceptions=True)
+            self._feeder = None
+        await self.scheduler.stop()
+        self._in_flight.clear()
+        self._held.clear()
+        self._retrying.clear()
+
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def stats(self) -> dict:
+        """
+        Get queue depth, lag and counters.
+
+        Returns:
+            Dict with pending depth, in-flight count, lag of the oldest
+            pending event in seconds, dead letters and counters.
+        """
+        depth, oldest = self.connection.execute(
+            "SELECT COUNT(*), MIN(received_at) FROM webhook_events "
+            "WHERE status IN ('pending', 'processing')"
+        ).fetchone()
+
+        return {
+            "depth": depth,
+            "in_flight": len(self._in_flight),
+            "lag_seconds": round(time.time() - oldest, 3) if oldest else 0.0,
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "retries": self.retries,
+            "dead": self.dead,
+            "scheduler": self.scheduler.stats(),
+        }
+
+    def _claim(self, limit: int) -> list[tuple]:
+        """
+        Claim the oldest ready events, marking them ``processing``.
+
+        Events of held keys are left for later; skipping all of a key's
+        events keeps them in order when they are claimed. Of a key waiting
+        for a retry, only the failed event is claimed.
+        """
+        held = tuple(self._held)
+        retrying = tuple(self._retrying)
+        retry_ids = tuple(self._retrying.values())
+
+        rows = self.connection.execute(
+            "SELECT id, provider, ordering_key, payload, attempts, "
+            "received_at "
+            "FROM webhook_events "
+            "WHERE status = 'pending' AND next_attempt_at <= ? "
+            "AND IFNULL(ordering_key, '') "
+            f"NOT IN ({','.join('?' * len(held))}) "
+            "AND (IFNULL(ordering_key, '') "
+            f"NOT IN ({','.join('?' * len(retrying))}) "
+            f"OR id IN ({','.join('?' * len(retry_ids))})) "
+            "ORDER BY id LIMIT ?",
+            (time.time(), *held, *retrying, *retry_ids, limit),
+        ).fetchall()
+
+        if rows:
+            ids = [row[0] for row in rows]
+            self.connection.execute(
+                "UPDATE webhook_events SET status = 'processing' "
+                f"WHERE id IN ({','.join('?' * len(ids))})",
+                ids,
+            )
+            self._in_flight.update(ids)
+
+        return rows
+
+    async def _feed(self) -> None:
+        """Hand ready events to the scheduler in arrival order."""
+        while True:
+            # Cleared before claiming so wakeups during the batch count
+            self._wakeup.clear()
+
+            rows = self._claim(self.workers * 4)
+            deferred = set()
+            released = []
+            for row in rows:
+                if not await self._schedule(*row, deferred):
+                    released.append(row[0])
+            if released:
+                self._release(released)
+
+            # Nothing new to start: wait for an event or a key to resume
+            if len(released) == len(rows):
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), self.poll_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _schedule(
+        self,
+        row_id: int,
+        provider: str,
+        ordering_key: str | None,
+        payload: bytes,
+        attempts: int,
+        received_at: float,
+        deferred: set[str],
+    ) -> bool:
+        """
+        Parse a claimed event and queue it behind its ordering key.
+
+        A key reaching ``key_limit`` buffered events is held back until
+        its backlog halves. Once a key is held, its remaining events in
+        the batch are deferred too (``deferred``), so they cannot overtake
+        each other if the key is resumed mid-batch. Events without an
+        ordering key are keyed by their row.
+
+        Returns:
+            False if the event should be released for a later batch.
+        """
+        try:
+            event = parse_event(provider, payload)
+        except Exception as e:
+            self._record_failure(row_id, attempts + 1, e, ordering_key)
+            self._in_flight.discard(row_id)
+            return True
+
+        key = ordering_key
+        if key is None:
+            key = (
+                f"{provider}:{event.ordering_key}"
+                if event.ordering_key is not None
+                else f"{provider}:#{row_id}"
+            )
+        if (
+            key in deferred
+            or key in self._held
+            or self._waits_for_retry(key, row_id)
+        ):
+            deferred.add(key)
+            return False
+
+        await self.scheduler.submit(
+            key,
+            lambda: self._process(row_id, event, attempts, key, received_at),
+        )
+        if self.scheduler.backlog(key) >= self.key_limit:
+            self._held.add(key)
+        return True
+
+    def _release(self, row_ids: list[int]) -> None:
+        """Return claimed events to the pending set."""
+        self._in_flight.difference_update(row_ids)
+        self.connection.execute(
+            "UPDATE webhook_events SET status = 'pending' "
+            f"WHERE id IN ({','.join('?' * len(row_ids))})",
+            row_ids,
+        )
+
+    async def _process(
+        self,
+        row_id: int,
+        event: WebhookEvent,
+        attempts: int,
+        key: str,
+        received_at: float,
+    ) -> None:
+        """Run the provider processor and record the outcome."""
+        if self._waits_for_retry(key, row_id):
+            # An earlier event of the key failed after this was scheduled
+            self._release([row_id])
+            self._resume(key)
+            return
+
+        webhook_lag.labels(event.provider).observe(time.time() - received_at)
+        started = time.perf_counter()
+        try:
+            processor = self._processors[event.provider]
+            result = processor(event)
+            if inspect.isawaitable(result):
+                await result
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            webhook_failures.labels(event.provider, event.type).inc()
+            self._record_failure(row_id, attempts + 1, e, key)
+            return
+        finally:
+            webhook_processing_duration.labels(
+                event.provider, event.type
+            ).observe(time.perf_counter() - started)
+            self._in_flight.discard(row_id)
+            self._resume(key)
+
+        self.connection.execute(
+            "DELETE FROM webhook_events WHERE id = ?", (row_id,)
+        )
+        self.processed += 1
+        self._retried(key, row_id)
+
+    def _waits_for_retry(self, key: str, row_id: int) -> bool:
+        """Whether an earlier event of the key is waiting for a retry."""
+        retry_id = self._retrying.get(key)
+        return retry_id is not None and row_id > retry_id
+
+    def _retried(self, key: str | None, row_id: int) -> None:
+        """Let the key's later events run once its failed event is done."""
+        if key is not None and self._retrying.get(key) == row_id:
+            del self._retrying[key]
+            self._wakeup.set()
+
+    def _resume(self, key: str) -> None:
+        """Stop holding a key back once its backlog has halved."""
+        # The backlog still counts the finishing event
+        if (
+            key in self._held
+            and self.scheduler.backlog(key) <= self.key_limit // 2 + 1
+        ):
+            self._held.discard(key)
+            self._wakeup.set()
+
+    def _record_failure(
+        self,
+        row_id: int,
+        attempts: int,
+        error: Exception,
+        key: str | None = None,
+    ) -> None:
+        """
+        Schedule a retry with backoff, or dead-letter the event.
+
+        Until then the key's later events wait (see ``_waits_for_retry``).
+        """
+        if attempts >= self.max_attempts:
+            self.dead += 1
+            logger.error(
+                "Webhook event %s failed %d times, giving up: %s",
+                row_id,
+                attempts,
+                error,
+            )
+            self.connection.execute(
+                "UPDATE webhook_events SET status = 'dead', attempts = ?, "
+                "last_error = ? WHERE id = ?",
+                (attempts, repr(error), row_id),
+            )
+            self._retried(key, row_id)
+            return
+
+        self.retries += 1
+        delay = min(
+            self.retry_base_delay * 2 ** (attempts - 1),
+            self.retry_max_delay,
+        )
+        logger.warning(
+            "Webhook event %s failed (attempt %d), retrying in %.1fs: %s",
+            row_id,
+            attempts,
+            delay,
+            error,
+        )
+        self.connection.execute(
+            "UPDATE webhook_events SET status = 'pending', attempts = ?, "
+            "next_attempt_at = ?, last_error = ? WHERE id = ?",
+            (attempts, time.time() + delay, repr(error), row_id),
+        )
+        if key is not None:
+            self._retrying.setdefault(key, row_id)
+
+
+webhook_queue = WebhookQueue(
+    database_path("webhook_queue.sqlite3"),
+    workers=settings.WEBHOOK_WORKERS,
+    capacity=settings.WEBHOOK_SCHEDULER_CAPACITY,
+    key_limit=settings.WEBHOOK_KEY_BACKLOG,
+    max_attempts=settings.WEBHOOK_MAX_ATTEMPTS,
+)
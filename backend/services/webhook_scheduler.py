@@ -0,0 +1,145 @@
+"""
+Webhook scheduler module.
+Runs jobs in order per key and in parallel across keys.
+"""
+import asyncio
+import logging
+from collections import deque
+from collections.abc import Awaitable, Callable, Hashable
+
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[None]]
+
+
+class KeyedScheduler:
+    """
+    Worker pool that keeps jobs with the same key in submission order.
+
+    Each key has its own FIFO of pending jobs. Keys with work wait in a
+    shared ready queue; a worker takes the next ready key, runs one job
+    and, if the key has more, puts it back at the end of the ready queue.
+    A key is therefore never run by two workers at once, while a hot key
+    gets one job in turn with every other key instead of holding a worker
+    until its backlog is drained.
+
+    At most ``capacity`` jobs are buffered; ``submit`` waits for a free
+    slot, which pushes back on whoever feeds the scheduler. Feeders that
+    can defer work (like the webhook queue, whose events wait on disk)
+    should also hold back keys with a long ``backlog``, so one hot key
+    cannot fill the buffer and stall everyone else.
+    """
+
+    def __init__(self, workers: int = 4, capacity: int = 1000):
+        """Initialize the scheduler; workers start with ``start``."""
+        self.workers = workers
+        self.capacity = capacity
+
+        self._pending: dict[Hashable, deque[Job]] = {}
+        self._ready: asyncio.Queue | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._busy = 0
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+
+    async def start(self) -> None:
+        """Start the worker pool."""
+        if self._tasks:
+            return
+
+        self._ready = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.capacity)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"webhook-lane-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Stop the worker pool, dropping jobs that have not started."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._pending.clear()
+        self._busy = 0
+
+    async def submit(self, key: Hashable, job: Job) -> None:
+        """
+        Queue a job behind earlier jobs with the same key.
+
+        Waits while the scheduler already buffers ``capacity`` jobs.
+
+        Args:
+            key: Ordering key, e.g. a customer or subscription ID.
+            job: Coroutine function to run; errors are logged, so jobs
+                should handle their own failures.
+        """
+        await self._slots.acquire()
+        self.submitted += 1
+
+        jobs = self._pending.get(key)
+        if jobs is None:
+            self._pending[key] = deque((job,))
+            self._ready.put_nowait(key)
+        else:
+            # The key is already ready or running; its worker requeues it
+            jobs.append(job)
+
+    def backlog(self, key: Hashable) -> int:
+        """Get the number of buffered jobs for a key, including one running."""
+        jobs = self._pending.get(key)
+        return len(jobs) if jobs else 0
+
+    def stats(self) -> dict:
+        """
+        Get scheduler statistics.
+
+        Returns:
+            Dict with worker count, busy workers, buffered jobs, keys with
+            buffered work, the longest per-key backlog and counters.
+        """
+        buffered = sum(len(jobs) for jobs in self._pending.values())
+
+        return {
+            "workers": self.workers,
+            "busy": self._busy,
+            "buffered": buffered,
+            "capacity": self.capacity,
+            "keys": len(self._pending),
+            "max_key_backlog": max(
+                (len(jobs) for jobs in self._pending.values()), default=0
+            ),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+    async def _worker(self) -> None:
+        """Run one job of the next ready key until cancelled."""
+        while True:
+            key = await self._ready.get()
+            jobs = self._pending[key]
+            job = jobs[0]
+
+            self._busy += 1
+            try:
+                await job()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.error("Scheduled job for %s failed: %s", key, e)
+            finally:
+                self._busy -= 1
+                jobs.popleft()
+                self._slots.release()
+                self.completed += 1
+
+            if jobs:
+                self._ready.put_nowait(key)
+            else:
+                del self._pending[key]
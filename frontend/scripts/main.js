@@ -695,27 +695,12 @@ window.addEventListener('load', function () {
     const paymentMethod = paymentEvent.paymentMethod;
 
     try {
-      // Шаг 1: Создаём клиента и SetupIntent на бэкенде
-      const setupResponse = await fetch(`${API_BASE_URL}/api/stripe/create-setup-intent`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ email: payerEmail }),
-      });
-
-      if (!setupResponse.ok) {
-        throw new Error('Failed to create setup intent');
-      }
-
-      const setupData = await setupResponse.json();
-      const { customerId, priceId } = setupData;
-
-      // Шаг 2: Создаём подписку с полученным payment method
-      const subscriptionResponse = await fetch(`${API_BASE_URL}/api/stripe/create-subscription`, {
+      // Создаём клиента и подписку одним запросом к бэкенду
+      const subscriptionResponse = await fetch(`${API_BASE_URL}/api/stripe/subscribe`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
-          customer_id: customerId,
-          price_id: priceId,
+          email: payerEmail,
           payment_method_id: paymentMethod.id,
         }),
       });